@@ -0,0 +1,193 @@
+"""
+セル番地、列名と、列番号、行番号の相互変換を高速に行う関数を定義する。
+列名と列番号の対応はExcelの全列（A～XFD）について表を作成して参照し、
+セル番地、セル範囲の解析は正規表現で行ったうえで結果を保存して再利用する。
+utilsの同名の処理は、この関数を呼び出す。
+"""
+from functools import lru_cache
+import re
+import string
+from typing import Dict, List, Tuple
+
+# Excelで使用できる最大の列番号（XFD列）
+MAX_COLUMN_NUM = 16384
+# 解析結果を保存するセル番地、セル範囲の数の上限
+ADDRESS_CACHE_SIZE = 65536
+
+_CELL_ADDRESS_PATTERN = re.compile(r'\$?([A-Z]{1,3})\$?([0-9]+)')
+_RANGE_ADDRESS_PATTERN = re.compile(r'\$?([A-Z]{1,3})\$?([0-9]+)(?::\$?([A-Z]{1,3})\$?([0-9]+))?')
+
+# 列番号をindexとする列名のlist型と、列名をkeyとする列番号のdict型（初めて使用する時点で作成）
+_column_letter_list: List[str] = []
+_column_num_dict: Dict[str, int] = {}
+
+def _build_column_table() -> None:
+    """概要
+    A～XFD列について、列番号と列名の対応表を作成する。
+
+    Returns
+    ----------
+    None
+    """
+    global _column_letter_list, _column_num_dict
+    u = string.ascii_uppercase
+    letter_list = [''] + list(u) + [a + b for a in u for b in u] \
+        + [a + b + c for a in u for b in u for c in u]
+    _column_letter_list = letter_list[:MAX_COLUMN_NUM + 1]
+    _column_num_dict = {letter: num for num, letter in enumerate(_column_letter_list) if num != 0}
+    return
+
+def column_letter(num: int) -> str:
+    """概要
+    列番号を列名に変換する。例：1→A、16384→XFD
+
+    Parameters
+    ----------
+    num: int
+        1以上MAX_COLUMN_NUM以下の列番号を表すint型。それ以外の値はValueErrorを返す。
+
+    Returns
+    ----------
+    letter: str
+        列名を表すstr型。
+    """
+    if not _column_letter_list:
+        _build_column_table()
+    if not 1 <= num <= MAX_COLUMN_NUM:
+        raise ValueError('列番号は1以上{}以下で指定してください。:{}'.format(MAX_COLUMN_NUM, num))
+    return _column_letter_list[num]
+
+def column_num(letter: str) -> int:
+    """概要
+    列名を列番号に変換する。例：A→1、XFD→16384
+    表に含まれない列名は1文字ずつ計算する。''は0を返す。
+
+    Parameters
+    ----------
+    letter: str
+        大文字のアルファベットからなる列名を表すstr型。それ以外の文字を含む場合はValueErrorを返す。
+
+    Returns
+    ----------
+    num: int
+        列番号を表すint型。
+    """
+    if not _column_num_dict:
+        _build_column_table()
+    num = _column_num_dict.get(letter)
+    if num is not None:
+        return num
+    num = 0
+    for i, s in enumerate(reversed(letter)):
+        if 'A' <= s <= 'Z':
+            num += (ord(s) - 64) * (26 ** i)
+        else:
+            raise ValueError('次の文字を列番号に変更できません。:{}'.format(letter))
+    return num
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def parse_cell_letter(address: str) -> Tuple[str, str]:
+    """概要
+    セル番地を列名、行名のstr型に分解する。'$'は無視する。例：$A$1→(A, 1)
+
+    Parameters
+    ----------
+    address: str
+        セル番地を表すstr型。
+
+    Returns
+    ----------
+    t: Tuple[str, str]
+        ({列名}, {行名})からなるtuple型。
+    """
+    m = _CELL_ADDRESS_PATTERN.fullmatch(address)
+    if m is not None:
+        return (m.group(1), m.group(2))
+    # 正規表現に一致しない番地は、アルファベットを列名、残りを行名とみなす
+    address = address.replace('$', '')
+    letter = ''.join(s for s in address if 'A' <= s <= 'Z')
+    row_letter = address.replace(letter, '')
+    try:
+        int(row_letter)
+    except ValueError:
+        raise ValueError('次のアドレスが不適です。:{}'.format(address))
+    return (letter, row_letter)
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def parse_cell(address: str) -> Tuple[int, int]:
+    """概要
+    セル番地を列番号、行番号のint型に変換する。'$'は無視する。例：$A$1→(1, 1)
+
+    Parameters
+    ----------
+    address: str
+        セル番地を表すstr型。
+
+    Returns
+    ----------
+    t: Tuple[int, int]
+        ({列番号}, {行番号})からなるtuple型。
+    """
+    letter, row_letter = parse_cell_letter(address)
+    return (column_num(letter), int(row_letter))
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def parse_range(address: str) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """概要
+    セル範囲を左上のセル、右下のセルそれぞれの列番号、行番号のint型に変換する。
+    セル番地が与えられた場合は、同じセルを左上、右下のセルとする。例：A1:B2→((1, 1), (2, 2))
+
+    Parameters
+    ----------
+    address: str
+        セル範囲またはセル番地を表すstr型。':'が2つ以上含まれる場合はValueErrorを返す。
+
+    Returns
+    ----------
+    t: Tuple[Tuple[int, int], Tuple[int, int]]
+        (({左上のセルの列番号}, {左上のセルの行番号}), ({右下のセルの列番号}, {右下のセルの行番号}))
+        からなるtuple型。
+    """
+    m = _RANGE_ADDRESS_PATTERN.fullmatch(address)
+    if m is not None:
+        first_loc = (column_num(m.group(1)), int(m.group(2)))
+        if m.group(3) is None:
+            return (first_loc, first_loc)
+        return (first_loc, (column_num(m.group(3)), int(m.group(4))))
+    address = address.replace('$', '')
+    cell_list = address.split(':')
+    if len(cell_list) > 2:
+        raise ValueError('次のセル範囲に:が2つ以上含まれます。{}'.format(address))
+    return (parse_cell(cell_list[0]), parse_cell(cell_list[-1]))
+
+def format_cell(col_num: int, row_num: int) -> str:
+    """概要
+    列番号、行番号をセル番地に変換する。例：(1, 1)→A1
+
+    Parameters
+    ----------
+    col_num: int
+        列番号を表すint型。
+
+    row_num: int
+        行番号を表すint型。
+
+    Returns
+    ----------
+    address: str
+        セル番地を表すstr型。
+    """
+    return column_letter(col_num) + str(row_num)
+
+def clear_cache() -> None:
+    """概要
+    保存したセル番地、セル範囲の解析結果を削除する。
+
+    Returns
+    ----------
+    None
+    """
+    parse_cell_letter.cache_clear()
+    parse_cell.cache_clear()
+    parse_range.cache_clear()
+    return
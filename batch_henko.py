@@ -0,0 +1,356 @@
+"""
+複数のプロジェクト計画書（計画変更届）の組み合わせに対して、
+差分の赤字表示を複数のプロセス（comの場合は複数のスレッドとExcel）で並行して行う関数を定義する。
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import sys
+import time
+import traceback
+from typing import List, NamedTuple, Optional
+from check_henko import make_diff_red
+from excel_pool import ExcelPool
+import forest_matching
+import workbook_backend
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+# マニフェストに記載する列名（キー名）
+_TARGET_KEY = 'target'
+_REFERRED_KEY = 'referred'
+_SAVE_PATH_KEY = 'save_path'
+
+class BatchJob(NamedTuple):
+    """概要
+    差分の赤字表示を行う1組のファイルを示す。
+
+    Attributes
+    ----------
+    target_file_path: str
+        差分の赤字表示を行うファイルのパス。
+
+    referred_file_path: str
+        差分を参照するファイルのパス。
+
+    save_path: str
+        保存先のパス。''の場合はmake_diff_redの既定の保存先に保存する。
+    """
+    target_file_path: str
+    referred_file_path: str
+    save_path: str = ''
+
+class BatchResult(NamedTuple):
+    """概要
+    1組のファイルに対する差分の赤字表示の結果を示す。
+
+    Attributes
+    ----------
+    job: BatchJob
+        処理したファイルの組み合わせ。
+
+    status: str
+        成功した場合はok、失敗した場合はerror。
+
+    elapsed: float
+        処理に要した秒数。
+
+    message: str
+        失敗した場合のエラーの内容。成功した場合は''。
+    """
+    job: BatchJob
+    status: str
+    elapsed: float
+    message: str = ''
+
+def load_manifest(manifest_path: str) -> List[BatchJob]:
+    """概要
+    差分の赤字表示を行うファイルの組み合わせを記載したマニフェストを読み込む。
+    CSVの場合は1行目に列名（target, referred, save_path）を、JSONの場合は
+    同じキーを持つオブジェクトのリストを記載する。save_pathは省略できる。
+
+    Parameters
+    ----------
+    manifest_path: str
+        拡張子が.csvまたは.jsonのマニフェストのパス。それ以外の拡張子はValueErrorを返す。
+
+    Returns
+    ----------
+    job_list: List[BatchJob]
+        マニフェストに記載された順にBatchJobを格納したlist型。
+    """
+    ext = os.path.splitext(manifest_path)[1].lower()
+    if ext == '.csv':
+        with open(manifest_path, encoding='utf-8-sig', newline='') as f:
+            record_list = list(csv.DictReader(f))
+    elif ext == '.json':
+        with open(manifest_path, encoding='utf-8') as f:
+            record_list = json.load(f)
+    else:
+        raise ValueError('マニフェストには.csvまたは.jsonのファイルを指定してください。')
+    job_list = []
+    for i, record in enumerate(record_list):
+        if not record.get(_TARGET_KEY) or not record.get(_REFERRED_KEY):
+            raise ValueError('マニフェストの{}件目に{}または{}が記載されていません。'.format(
+                i + 1, _TARGET_KEY, _REFERRED_KEY))
+        job_list.append(BatchJob(record[_TARGET_KEY], record[_REFERRED_KEY],
+                                 record.get(_SAVE_PATH_KEY) or ''))
+    return job_list
+
+def pair_directory(target_dir: str, referred_dir: str, output_dir: str = '') -> List[BatchJob]:
+    """概要
+    2つのフォルダに含まれるエクセルファイルのうち、同じファイル名を持つもの同士を組み合わせる。
+
+    Parameters
+    ----------
+    target_dir: str
+        差分の赤字表示を行うファイルを格納したフォルダのパス。
+
+    referred_dir: str
+        差分を参照するファイルを格納したフォルダのパス。
+
+    output_dir: str
+        保存先のフォルダのパス。''の場合はmake_diff_redの既定の保存先に保存する。デフォルトは''。
+
+    Returns
+    ----------
+    job_list: List[BatchJob]
+        ファイル名の順にBatchJobを格納したlist型。
+    """
+    job_list = []
+    for file_name in sorted(os.listdir(target_dir)):
+        # Excelが作成する一時ファイルは対象外とする
+        if not file_name.endswith('.xlsx') or file_name.startswith('~$'):
+            continue
+        referred_file_path = os.path.join(referred_dir, file_name)
+        if not os.path.isfile(referred_file_path):
+            continue
+        save_path = os.path.join(output_dir, file_name) if output_dir != '' else ''
+        job_list.append(BatchJob(os.path.join(target_dir, file_name), referred_file_path, save_path))
+    return job_list
+
+def _run_job(job: BatchJob, engine: str, match_method: str,
+             excel_pool: Optional[ExcelPool] = None) -> BatchResult:
+    """概要
+    1組のファイルに対して差分の赤字表示を行い、結果を返す。例外は結果に格納して返す。
+
+    Parameters
+    ----------
+    job: BatchJob
+        処理するファイルの組み合わせ。
+
+    engine: str
+        make_diff_redのengineに渡すstr型。
+
+    match_method: str
+        make_diff_redのmatch_methodに渡すstr型。
+
+    excel_pool: Optional[ExcelPool]
+        アプリケーションを借りるExcelPool。Noneの場合はmake_diff_redの中で起動する。
+        デフォルトはNone。
+
+    Returns
+    ----------
+    result: BatchResult
+        処理の結果。
+    """
+    start = time.perf_counter()
+    try:
+        if excel_pool is None:
+            make_diff_red(job.target_file_path, job.referred_file_path,
+                          save_path=job.save_path, engine=engine, match_method=match_method)
+        else:
+            with excel_pool.session() as app:
+                make_diff_red(job.target_file_path, job.referred_file_path,
+                              save_path=job.save_path, match_method=match_method, app=app)
+    except Exception:
+        return BatchResult(job, STATUS_ERROR, time.perf_counter() - start, traceback.format_exc())
+    return BatchResult(job, STATUS_OK, time.perf_counter() - start)
+
+def _print_result(result: BatchResult, done_num: int, job_num: int) -> None:
+    """概要
+    1組のファイルに対する処理の結果を標準出力に表示する。
+
+    Parameters
+    ----------
+    result: BatchResult
+        表示する処理の結果。
+
+    done_num: int
+        処理を終えたファイルの組み合わせの数。
+
+    job_num: int
+        すべてのファイルの組み合わせの数。
+
+    Returns
+    ----------
+    None
+    """
+    print('[{}/{}] {} {:.2f}s {}'.format(done_num, job_num, result.status, result.elapsed,
+                                        result.job.target_file_path), flush=True)
+    if result.status == STATUS_ERROR:
+        print(result.message, file=sys.stderr, flush=True)
+
+def _init_com_thread() -> None:
+    """概要
+    スレッドでCOMを初期化する。ExcelPoolのアプリケーションはスレッドをまたいで貸し出すため、
+    すべてのスレッドをマルチスレッドアパートメントとして初期化する。
+
+    Returns
+    ----------
+    None
+    """
+    import pythoncom
+    pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+    return
+
+def _run_parallel(executor: concurrent.futures.Executor, job_list: List[BatchJob], engine: str,
+                  match_method: str, excel_pool: Optional[ExcelPool] = None) -> List[BatchResult]:
+    """概要
+    executorにより、複数のファイルの組み合わせに対して差分の赤字表示を並行して行う。
+
+    Parameters
+    ----------
+    executor: concurrent.futures.Executor
+        処理を行うProcessPoolExecutorまたはThreadPoolExecutor。
+
+    job_list: List[BatchJob]
+        処理するファイルの組み合わせを格納したlist型。
+
+    engine, match_method: str
+        make_diff_redのengine、match_methodに渡すstr型。
+
+    excel_pool: Optional[ExcelPool]
+        アプリケーションを借りるExcelPool。デフォルトはNone。
+
+    Returns
+    ----------
+    result_list: List[BatchResult]
+        job_listと同じ順に処理の結果を格納したlist型。
+    """
+    result_list = [None] * len(job_list)
+    future_dict = {executor.submit(_run_job, job, engine, match_method, excel_pool): i
+                   for i, job in enumerate(job_list)}
+    for done_num, future in enumerate(concurrent.futures.as_completed(future_dict), 1):
+        i = future_dict[future]
+        try:
+            result_list[i] = future.result()
+        except Exception:
+            # ワーカーのプロセスが異常終了した場合
+            result_list[i] = BatchResult(job_list[i], STATUS_ERROR, 0.0, traceback.format_exc())
+        _print_result(result_list[i], done_num, len(job_list))
+    return result_list
+
+def run_batch(job_list: List[BatchJob], engine: str = workbook_backend.ENGINE_OPENPYXL,
+              max_workers: Optional[int] = None,
+              match_method: str = forest_matching.MATCH_GREEDY) -> List[BatchResult]:
+    """概要
+    複数のファイルの組み合わせに対して、差分の赤字表示を複数のプロセスで並行して行う。
+    いずれかの組み合わせで失敗した場合も、残りの組み合わせの処理を続ける。
+
+    Parameters
+    ----------
+    job_list: List[BatchJob]
+        処理するファイルの組み合わせを格納したlist型。
+
+    engine: str
+        make_diff_redのengineに渡すstr型。comの場合はプロセスの代わりにmax_workers個のスレッドで
+        並行して処理し、スレッドと同じ数のExcelを起動してExcelPoolにより使い回す。デフォルトはopenpyxl。
+
+    max_workers: Optional[int]
+        並行して処理を行うプロセス（comの場合はスレッドとExcel）の数。Noneの場合はCPUのコア数とする。
+        デフォルトはNone。
+
+    match_method: str
+        make_diff_redのmatch_methodに渡すstr型。デフォルトはgreedy。
+
+    Returns
+    ----------
+    result_list: List[BatchResult]
+        job_listと同じ順に処理の結果を格納したlist型。
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError('max_workersには1以上の値を指定してください。')
+    if max_workers == 1 or len(job_list) <= 1:
+        result_list = [None] * len(job_list)
+        excel_pool = ExcelPool(engine=engine) if engine == workbook_backend.ENGINE_COM else None
+        try:
+            for i, job in enumerate(job_list):
+                result_list[i] = _run_job(job, engine, match_method, excel_pool)
+                _print_result(result_list[i], i + 1, len(job_list))
+        finally:
+            if excel_pool is not None:
+                excel_pool.close()
+        return result_list
+    if engine == workbook_backend.ENGINE_COM:
+        worker_num = min(max_workers, len(job_list))
+        excel_pool = ExcelPool(size=worker_num, engine=engine)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=worker_num,
+                                                   initializer=_init_com_thread) as executor:
+            try:
+                return _run_parallel(executor, job_list, engine, match_method, excel_pool)
+            finally:
+                # Excelは、COMを初期化したスレッドから終了させる
+                executor.submit(excel_pool.close).result()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return _run_parallel(executor, job_list, engine, match_method)
+
+def write_report(result_list: List[BatchResult], report_path: str) -> None:
+    """概要
+    処理の結果をCSVファイルに書き出す。
+
+    Parameters
+    ----------
+    result_list: List[BatchResult]
+        処理の結果を格納したlist型。
+
+    report_path: str
+        書き出すCSVファイルのパス。
+
+    Returns
+    ----------
+    None
+    """
+    with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([_TARGET_KEY, _REFERRED_KEY, _SAVE_PATH_KEY, 'status', 'elapsed', 'message'])
+        for result in result_list:
+            writer.writerow([result.job.target_file_path, result.job.referred_file_path,
+                             result.job.save_path, result.status, '{:.3f}'.format(result.elapsed),
+                             result.message])
+    return
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--manifest', type = str, default = '', help = 'ManifestPath(.csv/.json)')
+    parser.add_argument('--target-dir', type = str, default = '', help = 'TargetDirectory')
+    parser.add_argument('--referred-dir', type = str, default = '', help = 'ReferredDirectory')
+    parser.add_argument('--output-dir', type = str, default = '', help = 'OutputDirectory')
+    parser.add_argument('--engine', type = str, default = workbook_backend.ENGINE_OPENPYXL,
+                        choices = [workbook_backend.ENGINE_COM, workbook_backend.ENGINE_OPENPYXL],
+                        help = 'Backend')
+    parser.add_argument('--workers', type = int, default = None, help = 'MaxWorkers')
+    parser.add_argument('--match-method', type = str, default = forest_matching.MATCH_GREEDY,
+                        choices = [forest_matching.MATCH_GREEDY, forest_matching.MATCH_OPTIMAL],
+                        help = 'ForestMatchingMethod')
+    parser.add_argument('--report', type = str, default = '', help = 'ReportPath(.csv)')
+    args = parser.parse_args()
+    if args.manifest != '':
+        job_list = load_manifest(args.manifest)
+    elif args.target_dir != '' and args.referred_dir != '':
+        job_list = pair_directory(args.target_dir, args.referred_dir, args.output_dir)
+    else:
+        parser.error('--manifestまたは--target-dirと--referred-dirを指定してください。')
+    start = time.perf_counter()
+    result_list = run_batch(job_list, args.engine, args.workers, args.match_method)
+    error_num = sum(result.status == STATUS_ERROR for result in result_list)
+    print('{} files, {} ok, {} error, {:.2f}s'.format(
+        len(result_list), len(result_list) - error_num, error_num, time.perf_counter() - start))
+    if args.report != '':
+        write_report(result_list, args.report)
+    sys.exit(1 if error_num > 0 else 0)
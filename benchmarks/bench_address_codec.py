@@ -0,0 +1,94 @@
+"""
+utilsのセル番地、列名の変換処理について、1回あたりの処理時間を計測する。
+解析結果を保存する処理（address_codec）がある場合は、保存した結果を削除した直後（cold）と
+同じ番地を繰り返し変換した場合（warm）をそれぞれ計測する。
+
+python benchmarks/bench_address_codec.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+try:
+    import address_codec
+except ImportError:
+    address_codec = None
+
+def _clear_cache() -> None:
+    if address_codec is not None:
+        address_codec.clear_cache()
+    return
+
+def _ns_per_call(func: Callable, arg_list: List, repeat: int, cold: bool) -> float:
+    """概要
+    arg_listのすべての要素に対してfuncを呼び出し、1回あたりの処理時間の最小値を返す。
+
+    Parameters
+    ----------
+    func: Callable
+        計測する関数。
+
+    arg_list: List
+        funcに与える引数を格納したlist型。要素がtuple型の場合は展開して与える。
+
+    repeat: int
+        計測を繰り返す回数。
+
+    cold: bool
+        計測の前に保存した解析結果を削除するか否かを示すbool型。
+
+    Returns
+    ----------
+    ns: float
+        1回あたりの処理時間（ナノ秒）。
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if cold:
+            _clear_cache()
+        start = time.perf_counter()
+        if isinstance(arg_list[0], tuple):
+            for arg in arg_list:
+                func(*arg)
+        else:
+            for arg in arg_list:
+                func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best / len(arg_list) * 1e9
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type = int, default = 5, help = 'RepeatNum')
+    args = parser.parse_args()
+    # モニタリング計画（K4:AQ53）と同程度の範囲のセルを対象とする
+    col_num_list = list(range(1, 703))
+    loc_list = [(c, r) for c in range(11, 44) for r in range(4, 54)]
+    cell_list = [utils.toAlpha3(c) + str(r) for c, r in loc_list]
+    abs_cell_list = ['${}${}'.format(utils.toAlpha3(c), r) for c, r in loc_list]
+    range_list = ['{}:{}'.format(cell, utils.toAlpha3(c + 2) + str(r + 3))
+                  for cell, (c, r) in zip(cell_list, loc_list)]
+    alpha_list = [utils.toAlpha3(c) for c in col_num_list]
+    case_list = [
+        ('toAlpha3', utils.toAlpha3, col_num_list),
+        ('from_alpha_to_num', utils.from_alpha_to_num, alpha_list),
+        ('from_cell_address_to_column_row_letter', utils.from_cell_address_to_column_row_letter,
+         cell_list),
+        ('from_cell_address_to_column_row_int', utils.from_cell_address_to_column_row_int, cell_list),
+        ('from_cell_address_to_column_row_int($)', utils.from_cell_address_to_column_row_int,
+         abs_cell_list),
+        ('from_range_address_to_column_row_int', utils.from_range_address_to_column_row_int,
+         range_list),
+        ('from_column_row_int_to_cell_address', utils.from_column_row_int_to_cell_address, loc_list),
+        ('move_range_address', utils.move_range_address, [(r, 1, 1) for r in range_list]),
+        ('get_max_range', utils.get_max_range, list(zip(range_list, reversed(range_list)))),
+        ('relative_range_address_loc', utils.relative_range_address_loc,
+         [(r, (11, 4)) for r in range_list]),
+    ]
+    for name, func, arg_list in case_list:
+        cold_ns = _ns_per_call(func, arg_list, args.repeat, True)
+        warm_ns = _ns_per_call(func, arg_list, args.repeat, False)
+        print('{:<42} cold {:8.0f} ns  warm {:8.0f} ns'.format(name, cold_ns, warm_ns))
@@ -0,0 +1,75 @@
+"""
+settingsのインポートに要する時間と、各テーブルを初めて参照した際に要する時間を計測する。
+インポートに要する時間はpython -X importtimeの出力から求める。
+
+python benchmarks/bench_settings_import.py [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TABLE_NAME_LIST = ['COPY_CELL_ADDRESS_DICT', 'COMPARE_CELL_ADDRESS_DICT',
+                    'COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT', 'CHECK_TEXT_CELL_DICT']
+
+def _import_time_us(module_name: str) -> Tuple[int, int]:
+    """概要
+    新たなプロセスでモジュールをインポートし、-X importtimeが出力する時間を返す。
+
+    Parameters
+    ----------
+    module_name: str
+        インポートするモジュール名。
+
+    Returns
+    ----------
+    t: Tuple[int, int]
+        モジュール自身の処理に要した時間と、依存するモジュールを含む累積の時間（マイクロ秒）。
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module_name],
+                            cwd=_ROOT_DIR, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        col_list = [col.strip() for col in line.split('|')]
+        if len(col_list) == 3 and col_list[2] == module_name:
+            return int(col_list[0].split(':')[-1]), int(col_list[1])
+    raise ValueError('{}のインポート時間を取得できませんでした。'.format(module_name))
+
+def _table_access_time_s(table_name: str) -> float:
+    """概要
+    新たなプロセスでsettingsをインポートし、テーブルを初めて参照した際に要する時間を返す。
+
+    Parameters
+    ----------
+    table_name: str
+        参照するテーブル名。
+
+    Returns
+    ----------
+    elapsed: float
+        テーブルの参照に要した時間（秒）。
+    """
+    code = ('import time, settings; s = time.perf_counter(); settings.{}; '
+            'print(time.perf_counter() - s)').format(table_name)
+    result = subprocess.run([sys.executable, '-c', code], cwd=_ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def _summary(value_list: List[float]) -> str:
+    return 'min {:8.2f}  median {:8.2f}'.format(min(value_list), statistics.median(value_list))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type = int, default = 20, help = 'RepeatNum')
+    args = parser.parse_args()
+    for module_name in ['utils', 'constants', 'settings']:
+        us_list = [_import_time_us(module_name) for _ in range(args.repeat)]
+        print('import {:<40} [ms] self {}  cumulative {}'.format(
+            module_name, _summary([us[0] / 1000 for us in us_list]),
+            _summary([us[1] / 1000 for us in us_list])))
+    for table_name in _TABLE_NAME_LIST:
+        s_list = [_table_access_time_s(table_name) * 1000 for _ in range(args.repeat)]
+        print('access {:<40} [ms] {}'.format(table_name, _summary(s_list)))
@@ -0,0 +1,267 @@
+"""
+make_workbookで作成した合成したエクセルファイルを使用して、差分の確認の各段階
+（compare.perform、check_*の各関数、find_text_diff）と、make_diff_red、copy_keikaku_value全体の
+処理時間を規模ごとに計測する。Excelを使用せずにopenpyxlのバックエンドで計測する。
+結果はコミットのハッシュ値とともにJSON Lines形式で追記し、直前に記録した別のコミットの結果との比を表示する。
+
+python benchmarks/bench_stages.py [--scale small medium] [--repeat 3] [--output benchmarks/results.jsonl]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from check_henko import make_diff_red
+import check_calc_sheets
+import check_info_sheets
+import check_rsh_sheets
+import compare
+import compare_text_value
+from constants import KeikakuSheet
+from copy_keikaku import copy_keikaku_value
+import diff_cache
+import settings
+import workbook_backend
+import make_workbook
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DEFAULT_OUTPUT_PATH = os.path.join(_ROOT_DIR, 'benchmarks', 'results.jsonl')
+
+# 規模ごとのmake_workbook.make_value_dictの引数
+SCALE_DICT = {
+    'small': {'forest_num': 50, 'species_num': 5, 'text_length': 50},
+    'medium': {'forest_num': 300, 'species_num': 15, 'text_length': 300},
+    'large': {'forest_num': 1500, 'species_num': 40, 'text_length': 1500},
+}
+
+# シートごとに差分を確認する関数
+_CHECK_FUNC_LIST = [
+    (KeikakuSheet.IKUSEI_INFO, check_info_sheets.check_cell_address_list_ikusei_info),
+    (KeikakuSheet.TENNEN_INFO, check_info_sheets.check_cell_address_list_tennen_info),
+    (KeikakuSheet.IN_PJ_EMISSION_INFO, check_info_sheets.check_cell_address_list_in_pj_emission_info),
+    (KeikakuSheet.OUT_PJ_INFO, check_info_sheets.check_cell_address_list_out_pj_info),
+    (KeikakuSheet.IKUSEI_RSH, check_rsh_sheets.check_cell_address_list_ikusei_rsh),
+    (KeikakuSheet.TENNEN_RSH, check_rsh_sheets.check_cell_address_list_tennen_rsh),
+    (KeikakuSheet.IKUSEI_CALCULATION, check_calc_sheets.check_cell_address_list_ikusei_calc),
+    (KeikakuSheet.TENNEN_CALCULATION, check_calc_sheets.check_cell_address_list_tennen_calc),
+]
+
+def _git_commit() -> Tuple[Optional[str], bool]:
+    """概要
+    計測したコードのコミットのハッシュ値と、コミットされていない変更の有無を返す。
+
+    Returns
+    ----------
+    t: Tuple[Optional[str], bool]
+        ハッシュ値（gitを使用できない場合はNone）と、変更の有無を示すbool型。
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=_ROOT_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                cwd=_ROOT_DIR, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, status.strip() != ''
+
+def _time_s(func: Callable, repeat: int, setup: Optional[Callable] = None) -> List[float]:
+    """概要
+    funcをrepeat回呼び出し、それぞれの処理時間を返す。funcが表示する内容は出力しない。
+
+    Parameters
+    ----------
+    func: Callable
+        計測する引数のない関数。
+
+    repeat: int
+        計測を繰り返す回数。
+
+    setup: Optional[Callable]
+        計測の前に毎回呼び出す引数のない関数。処理時間に含めない。デフォルトはNone。
+
+    Returns
+    ----------
+    s_list: List[float]
+        処理時間（秒）を格納したlist型。
+    """
+    s_list = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            s_list.append(time.perf_counter() - start)
+    return s_list
+
+def _text_pair_list(referred_value_dict: make_workbook.ValueDict,
+                    target_value_dict: make_workbook.ValueDict) -> List[Tuple[str, str]]:
+    """概要
+    文字列の差分を確認するセルのうち、値の異なるものの（変更後、変更前）の組を返す。
+
+    Returns
+    ----------
+    l: List[Tuple[str, str]]
+        （変更後の文字列、変更前の文字列）を格納したlist型。
+    """
+    l = []
+    for sheet_name, address_list in settings.CHECK_TEXT_CELL_DICT.items():
+        for loc in make_workbook._iter_loc(address_list):
+            target_text = target_value_dict[sheet_name].get(loc)
+            referred_text = referred_value_dict[sheet_name].get(loc)
+            if target_text != referred_text:
+                l.append((target_text, referred_text))
+    return l
+
+def run_scale(scale_name: str, repeat: int, mixed_rate: float, edit_rate: float, seed: int,
+              work_dir: str) -> Dict[str, List[float]]:
+    """概要
+    1つの規模について合成したファイルを作成し、各段階の処理時間を計測する。
+
+    Parameters
+    ----------
+    scale_name: str
+        SCALE_DICTのkey。
+
+    repeat: int
+        計測を繰り返す回数。
+
+    mixed_rate, edit_rate: float
+        混交林の行の割合、値を変更するセルの割合。
+
+    seed: int
+        乱数のシード。
+
+    work_dir: str
+        作成したファイルを保存するフォルダのパス。
+
+    Returns
+    ----------
+    stage_dict: Dict[str, List[float]]
+        段階名をkeyに、処理時間（秒）のlist型をvalueに持つdict型。
+    """
+    referred_path = os.path.join(work_dir, '{}_referred.xlsx'.format(scale_name))
+    target_path = os.path.join(work_dir, '{}_target.xlsx'.format(scale_name))
+    save_path = os.path.join(work_dir, '{}_saved.xlsx'.format(scale_name))
+    referred_value_dict, target_value_dict = make_workbook.make_workbook_pair(
+        referred_path, target_path, mixed_rate=mixed_rate, edit_rate=edit_rate, seed=seed,
+        **SCALE_DICT[scale_name])
+
+    stage_dict = {}
+    app = workbook_backend.dispatch(workbook_backend.ENGINE_OPENPYXL)
+    target_wb = app.Workbooks.Open(target_path, 0, True)
+    referred_wb = app.Workbooks.Open(referred_path, 0, True)
+    ws_dict = {sheet_name: (target_wb.Sheets(sheet_name.value), referred_wb.Sheets(sheet_name.value))
+               for sheet_name in KeikakuSheet}
+
+    def _perform():
+        # 赤字表示を行わず、確認の結果のみを求める
+        for sheet_name, address_list in settings.COMPARE_CELL_ADDRESS_DICT.items():
+            compare.perform(sheet_name, *ws_dict[sheet_name], address_list, 'check',
+                            sheet_diff=compare.SheetDiff(sheet_name))
+    stage_dict['compare.perform'] = _time_s(_perform, repeat, compare_text_value.clear_wakati_cache)
+    for sheet_name, func in _CHECK_FUNC_LIST:
+        stage_dict['{}.{}'.format(func.__module__, func.__name__)] = _time_s(
+            lambda: func(*ws_dict[sheet_name]), repeat)
+    text_pair_list = _text_pair_list(referred_value_dict, target_value_dict)
+    stage_dict['compare_text_value.find_text_diff'] = _time_s(
+        lambda: [compare_text_value.find_text_diff(*pair) for pair in text_pair_list], repeat,
+        compare_text_value.clear_wakati_cache)
+    target_wb.Close(False)
+    referred_wb.Close(False)
+    app.Quit()
+
+    stage_dict['make_diff_red'] = _time_s(
+        lambda: make_diff_red(target_path, referred_path, save_path=save_path,
+                              engine=workbook_backend.ENGINE_OPENPYXL,
+                              cache_mode=diff_cache.CACHE_BYPASS),
+        repeat, compare_text_value.clear_wakati_cache)
+    stage_dict['copy_keikaku_value'] = _time_s(
+        lambda: copy_keikaku_value(target_path, referred_path, save_path=save_path,
+                                   engine=workbook_backend.ENGINE_OPENPYXL), repeat)
+    return stage_dict
+
+def _load_previous(output_path: str, scale_name: str, commit: Optional[str]) -> Optional[Dict]:
+    """概要
+    記録した結果のうち、同じ規模で別のコミットについて最後に記録したものを返す。
+
+    Parameters
+    ----------
+    output_path: str
+        結果を記録したファイルパス。
+
+    scale_name: str
+        規模の名前。
+
+    commit: Optional[str]
+        計測したコミットのハッシュ値。
+
+    Returns
+    ----------
+    record: Optional[Dict]
+        記録した結果。存在しない場合はNone。
+    """
+    previous = None
+    try:
+        with open(output_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('scale') == scale_name and record.get('commit') != commit:
+                    previous = record
+    except OSError:
+        return None
+    return previous
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', nargs = '+', choices = list(SCALE_DICT), default = ['small', 'medium'],
+                        help = 'ScaleName')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'RepeatNum')
+    parser.add_argument('--mixed-rate', type = float, default = 0.3, help = 'MixedForestRate')
+    parser.add_argument('--edit-rate', type = float, default = 0.05, help = 'EditRate')
+    parser.add_argument('--seed', type = int, default = 0, help = 'Seed')
+    parser.add_argument('--output', default = _DEFAULT_OUTPUT_PATH, help = 'OutputPath')
+    args = parser.parse_args()
+    commit, is_dirty = _git_commit()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale_name in args.scale:
+            stage_dict = run_scale(scale_name, args.repeat, args.mixed_rate, args.edit_rate,
+                                   args.seed, work_dir)
+            previous = _load_previous(args.output, scale_name, commit)
+            record = {
+                'commit': commit,
+                'dirty': is_dirty,
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'scale': scale_name,
+                'params': dict(SCALE_DICT[scale_name], mixed_rate=args.mixed_rate,
+                               edit_rate=args.edit_rate, seed=args.seed),
+                'repeat': args.repeat,
+                'stages': {name: {'min': min(s_list), 'median': statistics.median(s_list)}
+                           for name, s_list in stage_dict.items()},
+            }
+            print('[{}] commit {}{}'.format(scale_name, (commit or '-')[:10],
+                                            ' (dirty)' if is_dirty else ''))
+            for name, result in record['stages'].items():
+                line = '{:<68} [ms] min {:9.2f}  median {:9.2f}'.format(
+                    name, result['min'] * 1000, result['median'] * 1000)
+                if previous is not None and name in previous['stages']:
+                    line += '  x{:.2f} vs {}'.format(
+                        result['min'] / previous['stages'][name]['min'], (previous['commit'] or '-')[:10])
+                print(line)
+            with open(args.output, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
@@ -0,0 +1,355 @@
+"""
+処理時間の計測に使用する、プロジェクト計画書と同じシート構成の合成したエクセルファイルを作成する。
+値を記入するセル番地はsettingsの各テーブル、各シートのパラメータに従い、林地の数、混交林の行の割合、
+樹種＋地位の列の数、文字列の長さ、変更するセルの割合を指定できる。
+Excelを使用せずにopenpyxlで保存するため、Linuxでも作成できる。
+
+python benchmarks/make_workbook.py 変更前.xlsx 変更後.xlsx [--forest-num 100] [--mixed-rate 0.3]
+    [--species-num 5] [--text-length 100] [--edit-rate 0.05] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import openpyxl
+from constants import ChangeFlag, KeikakuSheet
+import address_codec
+import settings
+
+# シートごとに、(列番号, 行番号)をkeyに、セルの値をvalueに持つdict型
+ValueDict = Dict[KeikakuSheet, Dict[Tuple[int, int], object]]
+
+# 幹材積量算定シートに記入する林齢の数
+AGE_NUM = 100
+
+_SENTENCE_LIST = [
+    '本プロジェクトは森林経営計画に基づき間伐および再造林を実施する。',
+    '対象地は町有林であり、路網の整備により搬出の効率化を図る。',
+    'モニタリングは5年ごとに行い、その結果を管理台帳に記録する。',
+    '今日は良い天気です。明日は雨でしょう。',
+    '伐採後の植栽にはスギおよびヒノキの苗木を使用する。',
+    '森林の保護のため、巡視を年2回以上実施する。',
+]
+_INSERT_TEXT_LIST = ['（変更）', '速やかに', '新たに', '追加で届け出た区域について、', '令和6年度から']
+_SHORT_VALUE_LIST = ['有', '無', 'abc', '株式会社森林', '○', '1']
+_SPECIES_LIST = ['スギ', 'ヒノキ', 'マツ', 'カラマツ', 'トドマツ', 'エゾマツ', '広葉樹']
+_RANK_NUM = 5
+
+# 情報記入シートと、そのパラメータ
+_INFO_SHEET_PARAMS_LIST = [
+    (KeikakuSheet.IKUSEI_INFO, settings.IKUSEI_INFO_PARAMS),
+    (KeikakuSheet.TENNEN_INFO, settings.TENNEN_INFO_PARAMS),
+    (KeikakuSheet.IN_PJ_EMISSION_INFO, settings.IN_PJ_EMISSION_INFO_PARAMS),
+    (KeikakuSheet.OUT_PJ_INFO, settings.OUT_PJ_INFO_PARAMS),
+]
+_RSH_SHEET_PARAMS_LIST = [
+    (KeikakuSheet.IKUSEI_RSH, settings.IKUSEI_RSH_PARAMS),
+    (KeikakuSheet.TENNEN_RSH, settings.TENNEN_RSH_PARAMS),
+]
+_CALC_SHEET_PARAMS_LIST = [
+    (KeikakuSheet.IKUSEI_CALCULATION, settings.IKUSEI_CALCULATION_PARAMS),
+    (KeikakuSheet.TENNEN_CALCULATION, settings.TENNEN_CALCULATION_PARAMS),
+]
+
+def _iter_loc(address_list: List[str]) -> Iterator[Tuple[int, int]]:
+    """概要
+    セル番地または範囲に含まれるセルの(列番号, 行番号)を順に返す。
+
+    Parameters
+    ----------
+    address_list: List[str]
+        セル番地または範囲を示すstr型を格納したlist型。
+
+    Returns
+    ----------
+    loc: Iterator[Tuple[int, int]]
+        (列番号, 行番号)からなるtuple型。
+    """
+    for address in address_list:
+        (c1, r1), (c2, r2) = address_codec.parse_range(address)
+        for c in range(c1, c2 + 1):
+            for r in range(r1, r2 + 1):
+                yield (c, r)
+
+def _make_text(rnd: random.Random, text_length: int) -> str:
+    """概要
+    文章を連結して、指定した長さの文字列を作成する。
+
+    Parameters
+    ----------
+    rnd: random.Random
+        使用する乱数生成器。
+
+    text_length: int
+        文字列の長さを示すint型。
+
+    Returns
+    ----------
+    text: str
+        作成した文字列。
+    """
+    text = ''
+    while len(text) < text_length:
+        text += rnd.choice(_SENTENCE_LIST)
+    return text[:text_length]
+
+def _species_rank_list(species_num: int) -> List[str]:
+    """概要
+    樹種＋地位名をspecies_num個作成する。樹種と地位の組み合わせを使い切った場合は番号を付ける。
+
+    Parameters
+    ----------
+    species_num: int
+        樹種＋地位名の数を示すint型。
+
+    Returns
+    ----------
+    l: List[str]
+        樹種＋地位名を格納したlist型。
+    """
+    l = []
+    for i in range(species_num):
+        species = _SPECIES_LIST[i % len(_SPECIES_LIST)]
+        rank = i // len(_SPECIES_LIST) % _RANK_NUM + 1
+        suffix = i // (len(_SPECIES_LIST) * _RANK_NUM)
+        l.append('{}{}'.format(species, rank) + ('_{}'.format(suffix) if suffix else ''))
+    return l
+
+def make_value_dict(forest_num: int = 100, mixed_rate: float = 0.3, species_num: int = 5,
+                    text_length: int = 100, seed: int = 0) -> ValueDict:
+    """概要
+    変更前のプロジェクト計画書に記入する値を作成する。
+
+    Parameters
+    ----------
+    forest_num: int
+        情報記入シートに記入する林地情報の行数、および吸収量算定シートに記入する数式の行数。
+        デフォルトは100。
+
+    mixed_rate: float
+        林地情報の行のうち、直前の行と同じ林地名を持つ（混交林の）行の割合。デフォルトは0.3。
+
+    species_num: int
+        幹材積量算定シートに記入する樹種＋地位の列の数。デフォルトは5。
+
+    text_length: int
+        文字列の差分を確認するセルに記入する文字列の長さ。デフォルトは100。
+
+    seed: int
+        乱数のシード。デフォルトは0。
+
+    Returns
+    ----------
+    value_dict: ValueDict
+        シートごとに、(列番号, 行番号)をkeyに、セルの値をvalueに持つdict型。
+    """
+    if forest_num < 0 or species_num < 0 or text_length < 0:
+        raise ValueError('forest_num、species_num、text_lengthには0以上の値を指定してください。')
+    if not 0 <= mixed_rate <= 1:
+        raise ValueError('mixed_rateには0以上1以下の値を指定してください。')
+    rnd = random.Random(seed)
+    value_dict: ValueDict = {sheet_name: {} for sheet_name in KeikakuSheet}
+
+    # 値を比較、書き写すセル
+    for address_dict in (settings.COPY_CELL_ADDRESS_DICT, settings.COMPARE_CELL_ADDRESS_DICT):
+        for sheet_name, address_list in address_dict.items():
+            d = value_dict[sheet_name]
+            for loc in _iter_loc(address_list):
+                if loc not in d:
+                    d[loc] = rnd.choice(_SHORT_VALUE_LIST) if rnd.random() < 0.5 \
+                        else rnd.randint(0, 9999)
+    for sheet_name, address_list in settings.CHECK_TEXT_CELL_DICT.items():
+        d = value_dict[sheet_name]
+        for loc in _iter_loc(address_list):
+            d[loc] = _make_text(rnd, text_length)
+    # 変更の有無を記入するセル
+    for sheet_name, address_dict in settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT.items():
+        d = value_dict[sheet_name]
+        for loc in _iter_loc(list(address_dict.keys())):
+            d.setdefault(loc, rnd.randint(0, 9999))
+        for loc in _iter_loc(list(address_dict.values())):
+            d[loc] = ChangeFlag.NOT_CHANGED.value
+
+    # 情報記入シート
+    for sheet_name, params in _INFO_SHEET_PARAMS_LIST:
+        d = value_dict[sheet_name]
+        for loc in _iter_loc(params.OUT_OF_PATTERN_CELL_LIST):
+            d[loc] = rnd.randint(0, 9999)
+        forest_name_col_list = [address_codec.column_num(c) for c in params.FOREST_NAME_COL_LIST]
+        check_col_list = [address_codec.column_num(c) for c in params.CHECK_COL_LIST]
+        value_col_list = [c for c in check_col_list if c not in forest_name_col_list]
+        forest_name = (0.0, 0.0)
+        for i in range(forest_num):
+            r = params.ROW_OFFSET + 1 + i
+            # 林地名は林班、小班の2つの値から構成し、混交林は直前の行と同じ林地名とする
+            if i == 0 or rnd.random() >= mixed_rate:
+                forest_name = (float(forest_name[0] + 1), float(rnd.randint(1, 20)))
+            d[(forest_name_col_list[0], r)] = forest_name[0]
+            d[(forest_name_col_list[1], r)] = forest_name[1]
+            for c in value_col_list:
+                d[(c, r)] = rnd.randint(0, 50)
+
+    # 幹材積量算定シート
+    for sheet_name, params in _RSH_SHEET_PARAMS_LIST:
+        d = value_dict[sheet_name]
+        for loc in _iter_loc(params.OUT_OF_PATTERN_CELL_LIST):
+            d[loc] = rnd.randint(0, 9999)
+        c0, species_row = address_codec.parse_cell(params.SPECIES_RANK_REF_CELL_ADDRESS)
+        for k, species_rank in enumerate(_species_rank_list(species_num)):
+            c = c0 + k * params.COL_INTERVAL
+            d[(c, species_row)] = species_rank
+            growth = rnd.uniform(0.5, 5.0)
+            for age in range(1, AGE_NUM + 1):
+                d[(c, params.ROW_OFFSET + age)] = round(growth * age, 1)
+
+    # 吸収量算定シート
+    for sheet_name, params in _CALC_SHEET_PARAMS_LIST:
+        d = value_dict[sheet_name]
+        for col in params.CHECK_COL_LIST:
+            c = address_codec.column_num(col)
+            for i in range(forest_num):
+                r = params.ROW_OFFSET + 1 + i
+                d[(c, r)] = '=ROUND(O{r}*P{r}/{n},2)'.format(r=r, n=rnd.randint(1, 9))
+    return value_dict
+
+def _edit_value(rnd: random.Random, value):
+    """概要
+    セルの値を変更した値を返す。
+
+    Parameters
+    ----------
+    rnd: random.Random
+        使用する乱数生成器。
+
+    value
+        変更する値。
+
+    Returns
+    ----------
+    value
+        変更した値。
+    """
+    if isinstance(value, str) and value.startswith('='):
+        return value + '+1'
+    if isinstance(value, str) and len(value) > 10:
+        # 文章の一部に語句を挿入し、一部を削除する
+        pos = rnd.randint(0, len(value))
+        value = value[:pos] + rnd.choice(_INSERT_TEXT_LIST) + value[pos:]
+        pos = rnd.randint(0, len(value) - 1)
+        return value[:pos] + value[pos + rnd.randint(1, 5):]
+    if isinstance(value, str):
+        return value + '（変更）'
+    return value + 1
+
+def edit_value_dict(value_dict: ValueDict, edit_rate: float = 0.05, seed: int = 1) -> ValueDict:
+    """概要
+    変更前の値を受け取り、一部のセルの値を変更した変更後の値を返す。
+    混交林の林地情報は、一部の行の順序を入れ替える。受け取った値は変更しない。
+
+    Parameters
+    ----------
+    value_dict: ValueDict
+        make_value_dictにより作成した変更前の値。
+
+    edit_rate: float
+        値を変更するセルの割合。デフォルトは0.05。
+
+    seed: int
+        乱数のシード。デフォルトは1。
+
+    Returns
+    ----------
+    edited_value_dict: ValueDict
+        変更後の値。
+    """
+    if not 0 <= edit_rate <= 1:
+        raise ValueError('edit_rateには0以上1以下の値を指定してください。')
+    rnd = random.Random(seed)
+    edited_value_dict: ValueDict = {}
+    for sheet_name, d in value_dict.items():
+        edited_value_dict[sheet_name] = {loc: _edit_value(rnd, value) if rnd.random() < edit_rate
+                                         else value for loc, value in d.items()}
+    # 同じ林地名を持つ隣り合う行を入れ替え、林地情報の対応付けが必要な状態にする
+    for sheet_name, params in _INFO_SHEET_PARAMS_LIST:
+        d = edited_value_dict[sheet_name]
+        forest_name_col_list = [address_codec.column_num(c) for c in params.FOREST_NAME_COL_LIST[:2]]
+        check_col_list = [address_codec.column_num(c) for c in params.CHECK_COL_LIST]
+        r = params.ROW_OFFSET + 1
+        while (forest_name_col_list[0], r + 1) in d:
+            name1 = [d.get((c, r)) for c in forest_name_col_list]
+            name2 = [d.get((c, r + 1)) for c in forest_name_col_list]
+            if name1 == name2 and rnd.random() < edit_rate:
+                for c in check_col_list:
+                    v1, v2 = d.pop((c, r), None), d.pop((c, r + 1), None)
+                    if v2 is not None:
+                        d[(c, r)] = v2
+                    if v1 is not None:
+                        d[(c, r + 1)] = v1
+                r += 1
+            r += 1
+    return edited_value_dict
+
+def save_workbook(value_dict: ValueDict, file_path: str) -> None:
+    """概要
+    値をKeikakuSheetのすべてのシートを持つエクセルファイルに保存する。
+
+    Parameters
+    ----------
+    value_dict: ValueDict
+        シートごとに、(列番号, 行番号)をkeyに、セルの値をvalueに持つdict型。
+
+    file_path: str
+        保存するファイルパス。
+
+    Returns
+    ----------
+    None
+    """
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_name in KeikakuSheet:
+        ws = wb.create_sheet(sheet_name.value)
+        for (c, r), value in value_dict.get(sheet_name, {}).items():
+            ws.cell(r, c).value = value
+    wb.save(file_path)
+    return
+
+def make_workbook_pair(referred_file_path: str, target_file_path: str, forest_num: int = 100,
+                       mixed_rate: float = 0.3, species_num: int = 5, text_length: int = 100,
+                       edit_rate: float = 0.05, seed: int = 0) -> Tuple[ValueDict, ValueDict]:
+    """概要
+    変更前（参照する）、変更後（差分を確認する）のエクセルファイルを作成する。
+    引数はmake_value_dict、edit_value_dictを参照。
+
+    Parameters
+    ----------
+    referred_file_path, target_file_path: str
+        変更前、変更後のファイルを保存するファイルパス。
+
+    Returns
+    ----------
+    t: Tuple[ValueDict, ValueDict]
+        変更前、変更後の値。
+    """
+    referred_value_dict = make_value_dict(forest_num, mixed_rate, species_num, text_length, seed)
+    target_value_dict = edit_value_dict(referred_value_dict, edit_rate, seed + 1)
+    save_workbook(referred_value_dict, referred_file_path)
+    save_workbook(target_value_dict, target_file_path)
+    return referred_value_dict, target_value_dict
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('referred_file_path', help = 'ReferredFilePath')
+    parser.add_argument('target_file_path', help = 'TargetFilePath')
+    parser.add_argument('--forest-num', type = int, default = 100, help = 'ForestNum')
+    parser.add_argument('--mixed-rate', type = float, default = 0.3, help = 'MixedForestRate')
+    parser.add_argument('--species-num', type = int, default = 5, help = 'SpeciesNum')
+    parser.add_argument('--text-length', type = int, default = 100, help = 'TextLength')
+    parser.add_argument('--edit-rate', type = float, default = 0.05, help = 'EditRate')
+    parser.add_argument('--seed', type = int, default = 0, help = 'Seed')
+    args = parser.parse_args()
+    make_workbook_pair(args.referred_file_path, args.target_file_path, args.forest_num,
+                       args.mixed_rate, args.species_num, args.text_length, args.edit_rate, args.seed)
@@ -0,0 +1,401 @@
+"""
+セル番地、セル範囲を列番号、行番号のint型で保持する型（CellRef、RangeRef）を定義する。
+移動、結合、包含の判定などの処理を文字列を介さずに整数の演算で行い、
+セル番地を表すstr型への変換はワークシートとの受け渡しの時点でのみ行う。
+"""
+from typing import Iterable, Iterator, List, Tuple, Union
+import address_codec
+
+class CellRef:
+    """概要
+    1つのセルを（列番号、行番号）で示す変更不可の型。hash可能で、dict型のkeyに使用できる。
+
+    Parameters
+    ----------
+    col: int
+        列番号を表すint型。
+
+    row: int
+        行番号を表すint型。
+    """
+    __slots__ = ('col', 'row')
+
+    def __init__(self, col: int, row: int):
+        _set_col(self, col)
+        _set_row(self, row)
+
+    @classmethod
+    def from_address(cls, address: str) -> 'CellRef':
+        """概要
+        セル番地を表すstr型からCellRefを作成する。'$'は無視する。
+
+        Parameters
+        ----------
+        address: str
+            セル番地を表すstr型。
+
+        Returns
+        ----------
+        cell: CellRef
+            セル番地に対応するCellRef。
+        """
+        return cls(*address_codec.parse_cell(address))
+
+    @property
+    def address(self) -> str:
+        """概要
+        セル番地を表すstr型を返す。例：CellRef(1, 1)→A1
+        """
+        return address_codec.format_cell(self.col, self.row)
+
+    def offset(self, right: int = 0, down: int = 0) -> 'CellRef':
+        """概要
+        右方向にright、下方向にdown移動させたセルを返す。
+        A列より左、または1行より上に移動する場合はValueErrorを返す。
+
+        Parameters
+        ----------
+        right: int
+            右方向に移動するセル数。デフォルトは0。
+
+        down: int
+            下方向に移動するセル数。デフォルトは0。
+
+        Returns
+        ----------
+        cell: CellRef
+            移動させたセル。
+        """
+        col = self.col + right
+        row = self.row + down
+        if col < 1 or row < 1:
+            raise ValueError('移動先のセルがシートの範囲外です。:{}'.format(self))
+        return CellRef(col, row)
+
+    def to_range(self) -> 'RangeRef':
+        """概要
+        このセルのみからなる範囲を返す。
+        """
+        return RangeRef(self.col, self.row, self.col, self.row)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CellRefの値は変更できません。')
+
+    def __delattr__(self, name):
+        raise AttributeError('CellRefの値は変更できません。')
+
+    def __reduce__(self):
+        return (CellRef, (self.col, self.row))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CellRef):
+            return NotImplemented
+        return self.col == other.col and self.row == other.row
+
+    def __hash__(self) -> int:
+        return hash((self.col, self.row))
+
+    def __str__(self) -> str:
+        return self.address
+
+    def __repr__(self) -> str:
+        return 'CellRef({}, {})'.format(self.col, self.row)
+
+class RangeRef:
+    """概要
+    長方形のセル範囲を（左上の列番号、左上の行番号、右下の列番号、右下の行番号）で示す変更不可の型。
+    左上と右下が逆に与えられた場合は入れ替える。hash可能で、dict型のkeyに使用できる。
+
+    Parameters
+    ----------
+    c1, r1: int
+        左上のセルの列番号、行番号を表すint型。
+
+    c2, r2: int
+        右下のセルの列番号、行番号を表すint型。
+    """
+    __slots__ = ('c1', 'r1', 'c2', 'r2')
+
+    def __init__(self, c1: int, r1: int, c2: int, r2: int):
+        if c1 > c2:
+            c1, c2 = c2, c1
+        if r1 > r2:
+            r1, r2 = r2, r1
+        _set_c1(self, c1)
+        _set_r1(self, r1)
+        _set_c2(self, c2)
+        _set_r2(self, r2)
+
+    @classmethod
+    def from_address(cls, address: str) -> 'RangeRef':
+        """概要
+        セル範囲またはセル番地を表すstr型からRangeRefを作成する。'$'は無視する。
+
+        Parameters
+        ----------
+        address: str
+            セル範囲またはセル番地を表すstr型。':'が2つ以上含まれる場合はValueErrorを返す。
+
+        Returns
+        ----------
+        range_ref: RangeRef
+            セル範囲に対応するRangeRef。
+        """
+        (c1, r1), (c2, r2) = address_codec.parse_range(address)
+        return cls(c1, r1, c2, r2)
+
+    @classmethod
+    def bounding(cls, range_iter: Iterable['RangeRef']) -> 'RangeRef':
+        """概要
+        与えられたすべての範囲を含む最小の範囲を返す。範囲が1つもない場合はValueErrorを返す。
+
+        Parameters
+        ----------
+        range_iter: Iterable[RangeRef]
+            範囲を返すIterable型。
+
+        Returns
+        ----------
+        range_ref: RangeRef
+            すべての範囲を含む最小の範囲。
+        """
+        c1 = r1 = c2 = r2 = None
+        for range_ref in range_iter:
+            if c1 is None:
+                c1, r1, c2, r2 = range_ref.c1, range_ref.r1, range_ref.c2, range_ref.r2
+                continue
+            c1 = range_ref.c1 if range_ref.c1 < c1 else c1
+            r1 = range_ref.r1 if range_ref.r1 < r1 else r1
+            c2 = range_ref.c2 if range_ref.c2 > c2 else c2
+            r2 = range_ref.r2 if range_ref.r2 > r2 else r2
+        if c1 is None:
+            raise ValueError('範囲が1つも与えられていません。')
+        return cls(c1, r1, c2, r2)
+
+    @property
+    def first(self) -> CellRef:
+        """概要
+        左上のセルを返す。
+        """
+        return CellRef(self.c1, self.r1)
+
+    @property
+    def last(self) -> CellRef:
+        """概要
+        右下のセルを返す。
+        """
+        return CellRef(self.c2, self.r2)
+
+    @property
+    def width(self) -> int:
+        """概要
+        範囲の列数を返す。
+        """
+        return self.c2 - self.c1 + 1
+
+    @property
+    def height(self) -> int:
+        """概要
+        範囲の行数を返す。
+        """
+        return self.r2 - self.r1 + 1
+
+    @property
+    def is_cell(self) -> bool:
+        """概要
+        範囲が1つのセルのみからなるか否かを返す。
+        """
+        return self.c1 == self.c2 and self.r1 == self.r2
+
+    @property
+    def address(self) -> str:
+        """概要
+        セル範囲を表すstr型を返す。1つのセルのみからなる場合はセル番地を返す。
+        例：RangeRef(1, 1, 2, 2)→A1:B2、RangeRef(1, 1, 1, 1)→A1
+        """
+        if self.is_cell:
+            return address_codec.format_cell(self.c1, self.r1)
+        return address_codec.format_cell(self.c1, self.r1) + ':' \
+            + address_codec.format_cell(self.c2, self.r2)
+
+    def offset(self, right: int = 0, down: int = 0) -> 'RangeRef':
+        """概要
+        右方向にright、下方向にdown移動させた範囲を返す。
+        A列より左、または1行より上に移動する場合はValueErrorを返す。
+
+        Parameters
+        ----------
+        right: int
+            右方向に移動するセル数。デフォルトは0。
+
+        down: int
+            下方向に移動するセル数。デフォルトは0。
+
+        Returns
+        ----------
+        range_ref: RangeRef
+            移動させた範囲。
+        """
+        if self.c1 + right < 1 or self.r1 + down < 1:
+            raise ValueError('移動先の範囲がシートの範囲外です。:{}'.format(self))
+        return RangeRef(self.c1 + right, self.r1 + down, self.c2 + right, self.r2 + down)
+
+    def union(self, other: 'RangeRef') -> 'RangeRef':
+        """概要
+        この範囲とotherの両方を含む最小の範囲を返す。
+
+        Parameters
+        ----------
+        other: RangeRef
+            もう一方の範囲。
+
+        Returns
+        ----------
+        range_ref: RangeRef
+            両方を含む最小の範囲。
+        """
+        return RangeRef(min(self.c1, other.c1), min(self.r1, other.r1),
+                        max(self.c2, other.c2), max(self.r2, other.r2))
+
+    def relative_to(self, cell: CellRef) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """概要
+        cellを起点とする、左上のセル、右下のセルそれぞれの相対座標を返す。
+        範囲がcellより左または上にはみ出す場合はValueErrorを返す。
+
+        Parameters
+        ----------
+        cell: CellRef
+            起点とするセル。
+
+        Returns
+        ----------
+        t: Tuple[Tuple[int, int], Tuple[int, int]]
+            ((左上の行、左上の列), (右下の行、右下の列))の相対座標からなるtuple型。
+        """
+        if self.c1 < cell.col or self.r1 < cell.row:
+            raise ValueError('セルの指定範囲が不適です。{} {}'.format(self, cell))
+        return ((self.r1 - cell.row, self.c1 - cell.col),
+                (self.r2 - cell.row, self.c2 - cell.col))
+
+    def __contains__(self, item: Union[CellRef, 'RangeRef']) -> bool:
+        if isinstance(item, CellRef):
+            return self.c1 <= item.col <= self.c2 and self.r1 <= item.row <= self.r2
+        if isinstance(item, RangeRef):
+            return self.c1 <= item.c1 and item.c2 <= self.c2 \
+                and self.r1 <= item.r1 and item.r2 <= self.r2
+        return False
+
+    def __iter__(self) -> Iterator[CellRef]:
+        # 従来の処理と同じく、列ごとに上から下の順に返す
+        for col in range(self.c1, self.c2 + 1):
+            for row in range(self.r1, self.r2 + 1):
+                yield CellRef(col, row)
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def __setattr__(self, name, value):
+        raise AttributeError('RangeRefの値は変更できません。')
+
+    def __delattr__(self, name):
+        raise AttributeError('RangeRefの値は変更できません。')
+
+    def __reduce__(self):
+        return (RangeRef, (self.c1, self.r1, self.c2, self.r2))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RangeRef):
+            return NotImplemented
+        return self.c1 == other.c1 and self.r1 == other.r1 \
+            and self.c2 == other.c2 and self.r2 == other.r2
+
+    def __hash__(self) -> int:
+        return hash((self.c1, self.r1, self.c2, self.r2))
+
+    def __str__(self) -> str:
+        return self.address
+
+    def __repr__(self) -> str:
+        return 'RangeRef({}, {}, {}, {})'.format(self.c1, self.r1, self.c2, self.r2)
+
+# __setattr__を経由せずに値を設定する（生成時のみ使用する）
+_set_col = CellRef.col.__set__
+_set_row = CellRef.row.__set__
+_set_c1 = RangeRef.c1.__set__
+_set_r1 = RangeRef.r1.__set__
+_set_c2 = RangeRef.c2.__set__
+_set_r2 = RangeRef.r2.__set__
+
+def to_range_ref(address: Union[str, CellRef, RangeRef]) -> RangeRef:
+    """概要
+    セル番地、セル範囲を表すstr型、CellRef、RangeRefのいずれかをRangeRefに変換する。
+
+    Parameters
+    ----------
+    address: Union[str, CellRef, RangeRef]
+        セル番地またはセル範囲。
+
+    Returns
+    ----------
+    range_ref: RangeRef
+        対応するRangeRef。
+    """
+    if isinstance(address, RangeRef):
+        return address
+    if isinstance(address, CellRef):
+        return address.to_range()
+    return RangeRef.from_address(address)
+
+def merge_into_rectangles(range_iter: Iterable[Union[str, CellRef, RangeRef]]) -> List[RangeRef]:
+    """概要
+    セル番地またはセル範囲に含まれるセルを長方形の範囲にまとめる。
+    同じ列の範囲を持つ横方向の連続したセルを、縦方向に連続する行の間で結合する。
+
+    Parameters
+    ----------
+    range_iter: Iterable[Union[str, CellRef, RangeRef]]
+        セル番地またはセル範囲を返すIterable型。
+
+    Returns
+    ----------
+    range_list: List[RangeRef]
+        すべてのセルを覆う長方形の範囲を、左上のセルの行、列の順に格納したlist型。
+    """
+    cell_loc_set = set()
+    for address in range_iter:
+        if isinstance(address, CellRef):
+            cell_loc_set.add((address.row, address.col))
+            continue
+        if isinstance(address, RangeRef):
+            c1, r1, c2, r2 = address.c1, address.r1, address.c2, address.r2
+        else:
+            (c1, r1), (c2, r2) = address_codec.parse_range(address)
+        if c1 == c2 and r1 == r2:
+            cell_loc_set.add((r1, c1))
+            continue
+        for c in range(c1, c2 + 1):
+            for r in range(r1, r2 + 1):
+                cell_loc_set.add((r, c))
+    # 行ごとに横方向に連続するセルをまとめる
+    row_run_dict = {}
+    for r, c in sorted(cell_loc_set):
+        runs = row_run_dict.setdefault(r, [])
+        if len(runs) != 0 and runs[-1][1] == c - 1:
+            runs[-1][1] = c
+        else:
+            runs.append([c, c])
+    # 列の範囲が同じものを、縦方向に連続する行の間でまとめる
+    rectangle_list = []
+    open_rectangle_dict = {}
+    for r in sorted(row_run_dict.keys()):
+        next_open_rectangle_dict = {}
+        for c1, c2 in row_run_dict[r]:
+            rectangle = open_rectangle_dict.pop((c1, c2), None)
+            if rectangle is not None and rectangle[3] == r - 1:
+                rectangle[3] = r
+            else:
+                rectangle = [c1, r, c2, r]
+                rectangle_list.append(rectangle)
+            next_open_rectangle_dict[(c1, c2)] = rectangle
+        open_rectangle_dict = next_open_rectangle_dict
+    return [RangeRef(c1, r1, c2, r2) for c1, r1, c2, r2 in rectangle_list]
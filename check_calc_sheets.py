@@ -3,8 +3,82 @@
 吸収量算定シートの情報を比較する関数を定義する。
 """
 from typing import List
+import numpy as np
 from check_info_sheets import _get_max_row_from_ws
+from constants import KeikakuSheet
+import profiling
 import settings
+import utils
+
+def _read_formula(ws, range_address: str) -> np.array:
+    """概要
+    ワークシートのうち指定した範囲の数式を、2次元のnp.array型にして返す。
+
+    Parameters
+    ----------
+    ws
+        数式を読み込むワークシート。
+
+    range_address: str
+        数式を読み込む範囲を示すstr型。
+
+    Returns
+    ----------
+    formula: np.array
+        範囲の数式を格納する2次元のnp.array型。
+    """
+    formula = ws.Range(range_address).Formula
+    # 1つのセルを指定した場合は数式がそのまま返されるため、2次元に揃える
+    if not isinstance(formula, tuple):
+        formula = ((formula,),)
+    return np.array(formula, dtype=object)
+
+def _compare_address_range(target_ws, referred_ws, check_col_list: List[str], row_offset: int) -> str:
+    """概要
+    吸収量算定シートのうち、差分を確認するすべての列を含む範囲を返す。
+
+    Parameters
+    ----------
+    target_ws, referred_ws
+        差分を赤字にする吸収量算定シート、差分を参照する吸収量算定シート。
+
+    check_col_list: List[str]
+        差分を確認する列の列名を格納するList[str]型。
+
+    row_offset: int
+        行方向のオフセット数を示すint型。
+
+    Returns
+    ----------
+    compare_address_range: str
+        数式を読み込む範囲を示すstr型。
+    """
+    max_row = _get_max_row_from_ws(target_ws, referred_ws)
+    col_num_list = [utils.from_alpha_to_num(col) for col in check_col_list]
+    return '{c1}{r1}:{c2}{r2}'.format(
+        c1 = utils.toAlpha3(min(col_num_list)), c2 = utils.toAlpha3(max(col_num_list)),
+        r1 = row_offset + 1, r2 = max_row + 1)
+
+def get_read_address(sheet_name: KeikakuSheet, target_ws, referred_ws) -> str:
+    """概要
+    吸収量算定シートの差分の確認に必要な範囲を返す。値を先に読み込む場合に、読み込む範囲として使用する。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        吸収量算定シートのシート名を示すKeikakuSheet型。
+
+    target_ws, referred_ws
+        差分を赤字にする吸収量算定シート、差分を参照する吸収量算定シート。
+
+    Returns
+    ----------
+    read_address: str
+        読み込む範囲を示すstr型。
+    """
+    params = {KeikakuSheet.IKUSEI_CALCULATION: settings.IKUSEI_CALCULATION_PARAMS,
+              KeikakuSheet.TENNEN_CALCULATION: settings.TENNEN_CALCULATION_PARAMS}[sheet_name]
+    return _compare_address_range(target_ws, referred_ws, params.CHECK_COL_LIST, params.ROW_OFFSET)
 
 def _check_address_list(target_ws, referred_ws, 
                         check_col_list: List[str], row_offset: int) -> List[str]:
@@ -30,18 +104,20 @@ def _check_address_list(target_ws, referred_ws,
     check_cell_address_list: List[str]
         差分のあるセルの番地を示すstr型を格納するList[str]型。
     """
-    max_row = _get_max_row_from_ws(target_ws, referred_ws)
-    check_address_list = []
-    for col in check_col_list:
-        compare_address_range = '{c}{r1}:{c}{r2}'.format(
-            c = col, r1 = row_offset + 1, r2 = max_row + 1)
-        # 数式に対する変更を確認
-        target_value = target_ws.Range(compare_address_range).Formula
-        referred_value = referred_ws.Range(compare_address_range).Formula
-        for r_num in range(len(target_value)):
-            if target_value[r_num][0] != referred_value[r_num][0]:
-                check_address_list.append('{}{}'.format(col, row_offset + r_num + 1))
-    return check_address_list
+    # 確認するすべての列を含む範囲の数式を一度に読み込む
+    col_num_list = [utils.from_alpha_to_num(col) for col in check_col_list]
+    min_col_num = min(col_num_list)
+    compare_address_range = _compare_address_range(target_ws, referred_ws, check_col_list, row_offset)
+    col_pos_array = np.array(col_num_list, dtype=np.int64) - min_col_num
+    # 数式に対する変更を確認
+    target_formula = _read_formula(target_ws, compare_address_range)[:, col_pos_array]
+    referred_formula = _read_formula(referred_ws, compare_address_range)[:, col_pos_array]
+    is_diff_array = target_formula != referred_formula
+    profiling.count('compare.address_num', is_diff_array.size)
+    # 列ごとに差分のある行番号を格納
+    diff_col_pos_array, diff_row_pos_array = np.nonzero(is_diff_array.T)
+    return ['{}{}'.format(check_col_list[col_pos], row_offset + row_pos + 1)
+            for col_pos, row_pos in zip(diff_col_pos_array, diff_row_pos_array)]
 
 def check_cell_address_list_ikusei_calc(target_ws, referred_ws) -> List[str]:
     """概要
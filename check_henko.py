@@ -5,16 +5,29 @@ import argparse
 import datetime
 import os
 import re
-import win32com.client
+from typing import Dict, List, Optional, Set, Tuple, Union
 import check_calc_sheets
 import check_info_sheets
 import check_rsh_sheets
 import compare
-from constants import KeikakuSheet, Color
+import diff_cache
+import forest_matching
+from constants import KeikakuSheet
+from diff_report import DiffReport
+import parallel_check
+import profiling
 import settings
+import sheet_digest
+import sheet_plan
+import sheet_values
+import utils
+import workbook_backend
 
 def make_diff_red(target_file_path: str, referred_file_path: str, overwrite: bool = False,
-                  save_path: str = '') -> None:
+                  save_path: str = '', engine: str = workbook_backend.ENGINE_COM,
+                  match_method: str = forest_matching.MATCH_GREEDY, app=None,
+                  report_path: str = '', cache_mode: str = diff_cache.CACHE_BYPASS,
+                  profile_path: str = '', workers: int = 1) -> None:
     """"概要
     2つのプロジェクト計画書（計画変更届）を受け取り、差分を赤字で表示する。
 
@@ -33,81 +46,161 @@ def make_diff_red(target_file_path: str, referred_file_path: str, overwrite: boo
         ファイルの上書きを行わない場合に、差分を赤字にしたファイルの保存先を示すstr型。
         ''が指定されている場合は、元のファイル名に時刻を加えて保存する。デフォルトは''。
 
+    engine: str, 'com'
+        エクセルの操作に使用するバックエンドを示すstr型。comが与えられればExcelを起動して操作し、
+        openpyxlが与えられればExcelを起動せずに操作する。デフォルトはcom。
+
+    match_method: str, 'greedy'
+        情報記入シートにおいて、同じ林地名を持つ林地情報の対応付けの方法を示すstr型。
+        greedyが与えられれば乖離度が最も小さい組み合わせから順に、optimalが与えられれば
+        乖離度の合計が最小になるように対応付ける。デフォルトはgreedy。
+
+    app
+        エクセルを操作する起動済みのアプリケーション。与えられた場合はengineによらずに使用し、
+        処理後もアプリケーションを終了しない（excel_pool.ExcelPoolから借りたものを想定）。
+        Noneの場合はengineに応じて起動し、処理後に終了する。デフォルトはNone。
+
+    report_path: str, ''
+        差分を記録する報告書の保存先を示すstr型（拡張子は.csv、.json、.parquetのいずれか）。
+        指定した場合は赤字表示、変更の有無のセルの書き込み、ファイルの保存を行わず、
+        検出した差分をdiff_report.DiffReportの形式で書き出す。overwrite、save_pathは無視する。
+        デフォルトは''。
+
+    cache_mode: str, 'bypass'
+        シートごとの差分の確認の結果を保存し、内容が同じシートの確認に再利用するキャッシュ
+        （diff_cache.DiffCache）の使用方法を示すstr型。useが与えられれば使用し、bypassが与えられれば
+        使用せず、clearが与えられれば保存済みのものをすべて削除したうえで使用する。
+        キャッシュは利用者ごとのフォルダ（diff_cache.DEFAULT_CACHE_DIR）に保存する。デフォルトはbypass。
+
+    profile_path: str, ''
+        段階ごと、シートごとの処理時間、エクセルの操作の回数などの計測結果（profiling.Profiler）を
+        書き出すJSONのファイルパスを示すstr型。'-'が指定されている場合は書き出さずに表示する。
+        ''が指定されている場合は環境変数FCS_PROFILEの値を使用し、環境変数も指定されていない場合は
+        計測しない。デフォルトは''。
+
+    workers: int, 1
+        差分の確認を並行して行うプロセスの数を示すint型。2以上の場合は、読み込んだ値に対する
+        シートごとの確認を複数のプロセスで並行して行う。1の場合はこのプロセスで順に確認する。
+        デフォルトは1。
+
+    Returns
+    ----------
+    None
+    """
+    profile_output = profiling.resolve_output(profile_path)
+    if profile_output == '':
+        _make_diff_red(target_file_path, referred_file_path, overwrite, save_path, engine,
+                       match_method, app, report_path, cache_mode, workers)
+        return
+    profiling.start(target_file_path=target_file_path, referred_file_path=referred_file_path,
+                    engine=engine, match_method=match_method, report_path=report_path,
+                    cache_mode=cache_mode)
+    try:
+        _make_diff_red(target_file_path, referred_file_path, overwrite, save_path, engine,
+                       match_method, app, report_path, cache_mode, workers)
+    finally:
+        profiling.finish(profile_output)
+    return
+
+def _make_diff_red(target_file_path: str, referred_file_path: str, overwrite: bool, save_path: str,
+                   engine: str, match_method: str, app, report_path: str, cache_mode: str,
+                   workers: int) -> None:
+    """概要
+    make_diff_redの処理を行う。引数はmake_diff_redを参照。
+
     Returns
     ----------
     None
     """
-    app = win32com.client.Dispatch('Excel.Application')
-    app.Visible = True
-    target_wb = app.Workbooks.Open(os.getcwd() + '/' + target_file_path)
-    referred_wb = app.Workbooks.Open(os.getcwd() + '/' + referred_file_path)
-
-    # シミュレーションに依存しない記入項目の差分を確認
-    for sheet_name in list(set(list(settings.COMPARE_CELL_ADDRESS_DICT.keys()) 
-                               + list(settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT.keys()))):
-        target_sheet = target_wb.Sheets(sheet_name.value)
-        referred_sheet = referred_wb.Sheets(sheet_name.value)
-        # 差分がある場合に、該当するセルを赤字に変更
-        if sheet_name in settings.COMPARE_CELL_ADDRESS_DICT.keys():
-            compare.perform(sheet_name, target_sheet, referred_sheet, 
-                            settings.COMPARE_CELL_ADDRESS_DICT[sheet_name], 'check')
-        # 差分の有無に応じて、変更の有無のセルの値を変更
-        if sheet_name in settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT.keys():
-            compare.compare_and_change_other_cell_value(
-                target_sheet, referred_sheet,settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT[sheet_name])
-
-    # 情報記入シートの差分を確認
-    for sheet_name in settings.INFO_SHEET_LIST:
-        target_ws = target_wb.Sheets(sheet_name.value)
-        referred_ws = referred_wb.Sheets(sheet_name.value)
-        if sheet_name == KeikakuSheet.IKUSEI_INFO:
-            compare.perform(sheet_name, target_sheet, referred_sheet, 
-                            settings.IKUSEI_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check')
-            l = check_info_sheets.check_cell_address_list_ikusei_info(target_ws, referred_ws)
-        elif sheet_name == KeikakuSheet.TENNEN_INFO:
-            compare.perform(sheet_name, target_sheet, referred_sheet,
-                            settings.TENNEN_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check')
-            l = check_info_sheets.check_cell_address_list_tennen_info(target_ws, referred_ws)
-        elif sheet_name == KeikakuSheet.IN_PJ_EMISSION_INFO:
-            compare.perform(sheet_name, target_sheet, referred_sheet,
-                            settings.IN_PJ_EMISSION_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check')
-            l = check_info_sheets.check_cell_address_list_in_pj_emission_info(target_ws, referred_ws)
-        elif sheet_name == KeikakuSheet.OUT_PJ_INFO:
-            compare.perform(sheet_name, target_sheet, referred_sheet,
-                            settings.OUT_PJ_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check')
-            l = check_info_sheets.check_cell_address_list_out_pj_info(target_ws, referred_ws)
-        for address in l:
-            target_ws.Range(address).Font.Color = Color.RED.value
-
-    # 幹材積量算定シートの差分を確認
-    for sheet_name in settings.RSH_SHEET_LIST:
-        target_ws = target_wb.Sheets(sheet_name.value)
-        referred_ws = referred_wb.Sheets(sheet_name.value)
-        if sheet_name == KeikakuSheet.IKUSEI_RSH:
-            compare.perform(sheet_name, target_ws, referred_ws,
-                            settings.IKUSEI_RSH_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check')
-            l = check_rsh_sheets.check_cell_address_list_ikusei_rsh(target_ws, referred_ws)
-        elif sheet_name == KeikakuSheet.TENNEN_RSH:
-            compare.perform(sheet_name, target_ws, referred_ws,
-                            settings.TENNEN_RSH_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check')
-            l = check_rsh_sheets.check_cell_address_list_tennen_rsh(target_ws, referred_ws)
-        for address in l:
-            target_ws.Range(address).Font.Color = Color.RED.value
-
-    # 吸収量算定シートの差分を確認
-    for sheet_name in settings.CALC_SHEET_LIST:
-        target_ws = target_wb.Sheets(sheet_name.value)
-        referred_ws = referred_wb.Sheets(sheet_name.value)
-        if sheet_name == KeikakuSheet.IKUSEI_CALCULATION:
-            l = check_calc_sheets.check_cell_address_list_ikusei_calc(target_ws, referred_ws)
-        elif sheet_name == KeikakuSheet.TENNEN_CALCULATION:
-            l = check_calc_sheets.check_cell_address_list_tennen_calc(target_ws, referred_ws)
-        for address in l:
-            target_ws.Range(address).Font.Color = Color.RED.value
+    is_app_owner = app is None
+    if is_app_owner:
+        app = workbook_backend.dispatch(engine)
+        app.Visible = True
+    report = DiffReport() if report_path != '' else None
+    cache = diff_cache.open_cache(cache_mode)
+    # 内容が同一のシートは、セル番地ごとの比較を省略する
+    with profiling.stage('digest'):
+        target_digest_dict = sheet_digest.sheet_digest_dict(os.path.join(os.getcwd(), target_file_path))
+        referred_digest_dict = sheet_digest.sheet_digest_dict(
+            os.path.join(os.getcwd(), referred_file_path))
+        identical_sheet_set = sheet_digest.identical_sheet_set(target_digest_dict, referred_digest_dict)
+    with profiling.stage('open'):
+        # 報告書のみを作成する場合は書き込みを行わないため、差分を赤字にするファイルも読み取り専用で開く
+        target_wb = app.Workbooks.Open(os.path.join(os.getcwd(), target_file_path), 0,
+                                       report is not None)
+        # 参照するファイルは値の参照のみを行うため、読み取り専用で開く
+        referred_wb = app.Workbooks.Open(os.path.join(os.getcwd(), referred_file_path), 0, True)
+
+    # シミュレーションに依存しない記入項目の差分を確認したうえで、
+    # 情報記入シート、幹材積量算定シート、吸収量算定シートの差分を確認
+    # 報告書の行の順序が実行ごとに変わらないよう、setではなくdictで重複を除く
+    checked_sheet_list = list(dict.fromkeys(list(settings.COMPARE_CELL_ADDRESS_DICT.keys())
+                                            + settings.INFO_SHEET_LIST + settings.RSH_SHEET_LIST
+                                            + settings.CALC_SHEET_LIST))
+    sheet_name_list = list(dict.fromkeys(list(settings.COMPARE_CELL_ADDRESS_DICT.keys())
+                                         + list(settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT.keys())
+                                         + checked_sheet_list))
+    # 内容が同一のシートと、保存済みの確認の結果を使用するシートは、読み込みと確認を行わない
+    workbook_diff = WorkbookDiff()
+    check_sheet_list = []
+    cache_key_dict = {}
+    for sheet_name in sheet_name_list:
+        if sheet_name not in checked_sheet_list or _is_skipped(sheet_name, identical_sheet_set):
+            continue
+        if cache is not None:
+            cache_key = diff_cache.make_key(
+                sheet_name, target_digest_dict.get(sheet_name.value),
+                referred_digest_dict.get(sheet_name.value), match_method, report is not None,
+                workbook_backend.engine_of(app))
+            with profiling.stage('cache.io'):
+                result = cache.get(cache_key)
+            profiling.count('cache.miss' if result is None else 'cache.hit')
+            if result is not None:
+                print('{}: 前回の確認の結果を使用'.format(sheet_name.value))
+                workbook_diff.sheet_result_dict[sheet_name] = result
+                continue
+            cache_key_dict[sheet_name] = cache_key
+        check_sheet_list.append(sheet_name)
+    # 差分の有無に応じて値を変更するセルは、報告書のみを作成する場合は確認しない
+    flag_sheet_list = [] if report is not None \
+        else list(settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT.keys())
+
+    # 1. 確認に必要な範囲の値を、2つのファイルからまとめて読み込む
+    with profiling.stage('read'):
+        values_dict = read_sheet_values_dict(target_wb, referred_wb, check_sheet_list, flag_sheet_list)
+    # 読み込みの際に作成した処理計画を、別のプロセスでの確認より前に1度だけ保存する
+    sheet_plan.flush()
+    # 2. 読み込んだ値のみを使用して差分を確認する（エクセルは操作しない）
+    with profiling.stage('compute'):
+        computed_diff = compute_workbook_diff(values_dict, check_sheet_list, flag_sheet_list,
+                                              match_method, report is not None, workers)
+    if cache is not None:
+        with profiling.stage('cache.io'):
+            for sheet_name in check_sheet_list:
+                cache.put(cache_key_dict[sheet_name], computed_diff.sheet_result_dict[sheet_name])
+    workbook_diff.update(computed_diff)
+    # 3. 赤字表示と変更の有無のセルの書き込みを、シートの順にまとめて行う
+    if report is not None:
+        for sheet_name in sheet_name_list:
+            if sheet_name in workbook_diff.sheet_result_dict:
+                report.extend(workbook_diff.sheet_result_dict[sheet_name])
+    else:
+        with profiling.stage('write'):
+            write_workbook_diff(target_wb, workbook_diff, sheet_name_list)
 
     app.DisplayAlerts = False
+    if report is not None:
+        with profiling.stage('report'):
+            report.write(report_path)
+        target_wb.Close(False)
+        referred_wb.Close()
+        if is_app_owner:
+            app.Quit()
+        app.DisplayAlerts = True
+        return
     if overwrite:
-        target_wb.Save()
+        with profiling.stage('save'):
+            target_wb.Save()
     else:
         if save_path == '':
             L = len('.xlsx')
@@ -115,16 +208,357 @@ def make_diff_red(target_file_path: str, referred_file_path: str, overwrite: boo
             dt = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
             save_path = target_file_path[:-L] + '_赤字変更(参照ファイル：{})_{}'\
                 .format(last_ref_path[:-L], dt) + target_file_path[-L:]
-        target_wb.SaveAs(os.getcwd() + '/' + save_path)
+        with profiling.stage('save'):
+            target_wb.SaveAs(os.path.join(os.getcwd(), save_path))
     target_wb.Close()
     referred_wb.Close()
-    app.Quit()
+    if is_app_owner:
+        app.Quit()
     app.DisplayAlerts = True
     return
 
+def _is_skipped(sheet_name: KeikakuSheet, identical_sheet_set: Set[str]) -> bool:
+    """概要
+    シートの内容が2つのファイルで同一であり、比較を省略するか否かを返す。省略する場合はその旨を表示する。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    identical_sheet_set: Set[str]
+        内容が同一のシート名を格納したset型。
+
+    Returns
+    ----------
+    is_skipped: bool
+        比較を省略する場合はTrue。
+    """
+    if sheet_name.value not in identical_sheet_set:
+        return False
+    profiling.count('sheet.skipped_num')
+    print('{}: 差分なし（シートの内容が同一のため比較を省略）'.format(sheet_name.value))
+    return True
+
+def _check_sheet(sheet_name: KeikakuSheet, target_ws, referred_ws, match_method: str,
+                 is_report: bool) -> Union[compare.SheetDiff, DiffReport]:
+    """概要
+    1つのシートの差分を確認し、赤字表示の内容または差分を記録した報告書を返す。
+    ワークシートへの書き込みは行わない。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    target_ws
+        差分を赤字にするワークシート。
+
+    referred_ws
+        差分を確認する際に参照するワークシート。
+
+    match_method: str
+        情報記入シートにおける林地情報の対応付けの方法を示すstr型。
+
+    is_report: bool
+        赤字表示の内容の代わりに、差分を記録した報告書を返すか否かを示すbool型。
+
+    Returns
+    ----------
+    result: Union[compare.SheetDiff, DiffReport]
+        is_reportがFalseの場合は赤字表示の内容、Trueの場合は差分を記録した報告書。
+    """
+    report = DiffReport() if is_report else None
+    sheet_diff = None if is_report else compare.SheetDiff(sheet_name)
+    # 報告書に記録する場合は、林地情報、樹種＋地位を対応付けた変更前のセル番地も求める
+    referred_address_dict = {} if is_report else None
+    l = []
+    if sheet_name in settings.COMPARE_CELL_ADDRESS_DICT.keys():
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.COMPARE_CELL_ADDRESS_DICT[sheet_name], 'check', report, sheet_diff)
+    # 情報記入シート
+    elif sheet_name == KeikakuSheet.IKUSEI_INFO:
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.IKUSEI_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check', report, sheet_diff)
+        l = check_info_sheets.check_cell_address_list_ikusei_info(target_ws, referred_ws, match_method,
+                                                                  referred_address_dict)
+    elif sheet_name == KeikakuSheet.TENNEN_INFO:
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.TENNEN_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check', report, sheet_diff)
+        l = check_info_sheets.check_cell_address_list_tennen_info(target_ws, referred_ws, match_method,
+                                                                  referred_address_dict)
+    elif sheet_name == KeikakuSheet.IN_PJ_EMISSION_INFO:
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.IN_PJ_EMISSION_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check',
+                        report, sheet_diff)
+        l = check_info_sheets.check_cell_address_list_in_pj_emission_info(target_ws, referred_ws,
+                                                                          match_method,
+                                                                          referred_address_dict)
+    elif sheet_name == KeikakuSheet.OUT_PJ_INFO:
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.OUT_PJ_INFO_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check', report, sheet_diff)
+        l = check_info_sheets.check_cell_address_list_out_pj_info(target_ws, referred_ws, match_method,
+                                                                  referred_address_dict)
+    # 幹材積量算定シート
+    elif sheet_name == KeikakuSheet.IKUSEI_RSH:
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.IKUSEI_RSH_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check', report, sheet_diff)
+        l = check_rsh_sheets.check_cell_address_list_ikusei_rsh(target_ws, referred_ws,
+                                                                referred_address_dict)
+    elif sheet_name == KeikakuSheet.TENNEN_RSH:
+        compare.perform(sheet_name, target_ws, referred_ws,
+                        settings.TENNEN_RSH_PARAMS.OUT_OF_PATTERN_CELL_LIST, 'check', report, sheet_diff)
+        l = check_rsh_sheets.check_cell_address_list_tennen_rsh(target_ws, referred_ws,
+                                                                referred_address_dict)
+    # 吸収量算定シート
+    elif sheet_name == KeikakuSheet.IKUSEI_CALCULATION:
+        l = check_calc_sheets.check_cell_address_list_ikusei_calc(target_ws, referred_ws)
+    elif sheet_name == KeikakuSheet.TENNEN_CALCULATION:
+        l = check_calc_sheets.check_cell_address_list_tennen_calc(target_ws, referred_ws)
+    if is_report:
+        # 吸収量算定シートは数式を比較するため、数式を記録する
+        compare.add_report(report, sheet_name, target_ws, referred_ws, l, referred_address_dict,
+                           sheet_name in settings.CALC_SHEET_LIST)
+        return report
+    sheet_diff.red_address_list.extend(l)
+    return sheet_diff
+
+class WorkbookDiff:
+    """概要
+    2つのファイルの差分の確認の結果を、シートごとに格納する。ワークブックへの書き込みは行わない。
+
+    Attributes
+    ----------
+    sheet_result_dict: Dict[KeikakuSheet, Union[compare.SheetDiff, DiffReport]]
+        シート名をkeyに、赤字表示の内容または差分を記録した報告書をvalueに持つdict型。
+
+    flag_value_dict: Dict[KeikakuSheet, Dict[Tuple[int, int], str]]
+        シート名をkeyに、変更の有無のセルに書き込む値（compare.find_other_cell_valueの返り値）を
+        valueに持つdict型。
+    """
+    def __init__(self):
+        self.sheet_result_dict: Dict[KeikakuSheet, Union[compare.SheetDiff, DiffReport]] = {}
+        self.flag_value_dict: Dict[KeikakuSheet, Dict[Tuple[int, int], str]] = {}
+
+    def update(self, other: 'WorkbookDiff') -> None:
+        self.sheet_result_dict.update(other.sheet_result_dict)
+        self.flag_value_dict.update(other.flag_value_dict)
+        return
+
+def _read_address(sheet_name: KeikakuSheet, is_checked: bool, is_flagged: bool) -> str:
+    """概要
+    シートの差分の確認に必要な範囲を返す。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    is_checked: bool
+        シートの差分を確認するか否かを示すbool型。
+
+    is_flagged: bool
+        差分の有無に応じて変更の有無のセルの値を求めるか否かを示すbool型。
+
+    Returns
+    ----------
+    read_address: str
+        読み込む範囲を示すstr型。''の場合は使用範囲全体を読み込む。
+    """
+    # 情報記入シートなどは使用範囲の下端までを確認するため、使用範囲全体を読み込む
+    if is_checked and sheet_name not in settings.COMPARE_CELL_ADDRESS_DICT.keys():
+        return ''
+    address_list = []
+    if is_checked:
+        address_list.append(sheet_plan.get_plan(
+            sheet_name, settings.COMPARE_CELL_ADDRESS_DICT[sheet_name]).read_address)
+    if is_flagged:
+        return_address_dict = settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT[sheet_name]
+        address_list += list(return_address_dict.keys()) + list(return_address_dict.values())
+    return utils.from_range_address_list_to_range_address(
+        [address for address in address_list if address != ''])
+
+def read_sheet_values_dict(target_wb, referred_wb, check_sheet_list: List[KeikakuSheet],
+                           flag_sheet_list: Optional[List[KeikakuSheet]] = None
+                           ) -> Dict[KeikakuSheet, Tuple[sheet_values.SheetValues, sheet_values.SheetValues]]:
+    """概要
+    差分の確認に必要な範囲の値を、2つのワークブックからシートごとにまとめて読み込む。
+
+    Parameters
+    ----------
+    target_wb, referred_wb
+        差分を赤字にするワークブック、参照するワークブック。
+
+    check_sheet_list: List[KeikakuSheet]
+        差分を確認するシート名を格納したlist型。
+
+    flag_sheet_list: Optional[List[KeikakuSheet]]
+        変更の有無のセルの値を求めるシート名を格納したlist型。Noneの場合は求めない。デフォルトはNone。
+
+    Returns
+    ----------
+    values_dict: Dict[KeikakuSheet, Tuple[sheet_values.SheetValues, sheet_values.SheetValues]]
+        シート名をkeyに、差分を赤字にするシート、参照するシートの値の組をvalueに持つdict型。
+    """
+    if flag_sheet_list is None:
+        flag_sheet_list = []
+    values_dict = {}
+    for sheet_name in dict.fromkeys(list(check_sheet_list) + list(flag_sheet_list)):
+        with profiling.sheet(sheet_name.value):
+            ws_tuple = (profiling.wrap_worksheet(target_wb.Sheets(sheet_name.value)),
+                        profiling.wrap_worksheet(referred_wb.Sheets(sheet_name.value)))
+            if sheet_name in check_sheet_list and sheet_name in settings.CALC_SHEET_LIST:
+                # 吸収量算定シートは確認する列の数式のみを比較するため、その範囲の数式を読み込む
+                values_dict[sheet_name] = tuple(
+                    sheet_values.read_sheet_values(
+                        ws, True, check_calc_sheets.get_read_address(sheet_name, *ws_tuple), False)
+                    for ws in ws_tuple)
+                continue
+            read_address = _read_address(sheet_name, sheet_name in check_sheet_list,
+                                         sheet_name in flag_sheet_list)
+            values_dict[sheet_name] = tuple(sheet_values.read_sheet_values(ws, False, read_address)
+                                            for ws in ws_tuple)
+    return values_dict
+
+def _check_sheet_values(sheet_name: KeikakuSheet, target_values: sheet_values.SheetValues,
+                        referred_values: sheet_values.SheetValues, match_method: str,
+                        is_report: bool) -> Union[compare.SheetDiff, DiffReport]:
+    """概要
+    読み込んだシートの値に対して、1つのシートの差分を確認する。
+    parallel_check.check_sheetsから別のプロセスで呼び出すため、モジュールの最上位で定義する。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    target_values: sheet_values.SheetValues
+        差分を赤字にするシートの値。
+
+    referred_values: sheet_values.SheetValues
+        差分を確認する際に参照するシートの値。
+
+    match_method: str
+        情報記入シートにおける林地情報の対応付けの方法を示すstr型。
+
+    is_report: bool
+        赤字表示の内容の代わりに、差分を記録した報告書を返すか否かを示すbool型。
+
+    Returns
+    ----------
+    result: Union[compare.SheetDiff, DiffReport]
+        is_reportがFalseの場合は赤字表示の内容、Trueの場合は差分を記録した報告書。
+    """
+    with profiling.sheet(sheet_name.value):
+        return _check_sheet(sheet_name, target_values, referred_values, match_method, is_report)
+
+def compute_workbook_diff(values_dict: Dict[KeikakuSheet, Tuple[sheet_values.SheetValues,
+                                                                sheet_values.SheetValues]],
+                          check_sheet_list: List[KeikakuSheet],
+                          flag_sheet_list: Optional[List[KeikakuSheet]] = None,
+                          match_method: str = forest_matching.MATCH_GREEDY, is_report: bool = False,
+                          workers: int = 1) -> WorkbookDiff:
+    """概要
+    読み込んだシートの値のみを使用して差分を確認する。エクセルの読み込み、書き込みは行わない。
+
+    Parameters
+    ----------
+    values_dict: Dict[KeikakuSheet, Tuple[sheet_values.SheetValues, sheet_values.SheetValues]]
+        read_sheet_values_dictの返り値。
+
+    check_sheet_list: List[KeikakuSheet]
+        差分を確認するシート名を格納したlist型。
+
+    flag_sheet_list: Optional[List[KeikakuSheet]]
+        変更の有無のセルの値を求めるシート名を格納したlist型。Noneの場合は求めない。デフォルトはNone。
+
+    match_method: str
+        情報記入シートにおける林地情報の対応付けの方法を示すstr型。デフォルトはgreedy。
+
+    is_report: bool
+        赤字表示の内容の代わりに、差分を記録した報告書を求めるか否かを示すbool型。デフォルトはFalse。
+
+    workers: int
+        差分の確認を並行して行うプロセスの数を示すint型。デフォルトは1。
+
+    Returns
+    ----------
+    workbook_diff: WorkbookDiff
+        確認の結果。
+    """
+    if flag_sheet_list is None:
+        flag_sheet_list = []
+    workbook_diff = WorkbookDiff()
+    task_list = [(sheet_name,) + tuple(values_dict[sheet_name]) for sheet_name in check_sheet_list]
+    result_list = parallel_check.check_sheets(_check_sheet_values, task_list,
+                                              (match_method, is_report), workers)
+    for sheet_name, result in zip(check_sheet_list, result_list):
+        workbook_diff.sheet_result_dict[sheet_name] = result
+    for sheet_name in flag_sheet_list:
+        with profiling.sheet(sheet_name.value):
+            target_values, referred_values = values_dict[sheet_name]
+            workbook_diff.flag_value_dict[sheet_name] = compare.find_other_cell_value(
+                target_values, referred_values,
+                settings.COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT[sheet_name])
+    return workbook_diff
+
+def write_workbook_diff(target_wb, workbook_diff: WorkbookDiff,
+                        sheet_name_list: Optional[List[KeikakuSheet]] = None) -> None:
+    """概要
+    確認の結果に応じて、差分のあるセルの赤字表示と、変更の有無のセルの書き込みをまとめて行う。
+
+    Parameters
+    ----------
+    target_wb
+        差分を赤字にするワークブック。
+
+    workbook_diff: WorkbookDiff
+        compute_workbook_diffなどにより求めた確認の結果。報告書を格納したものは与えない。
+
+    sheet_name_list: Optional[List[KeikakuSheet]]
+        書き込むシートの順序を示すlist型。Noneの場合はworkbook_diffに格納した順とする。
+        デフォルトはNone。
+
+    Returns
+    ----------
+    None
+    """
+    if sheet_name_list is None:
+        sheet_name_list = list(dict.fromkeys(list(workbook_diff.sheet_result_dict.keys())
+                                             + list(workbook_diff.flag_value_dict.keys())))
+    for sheet_name in sheet_name_list:
+        sheet_diff = workbook_diff.sheet_result_dict.get(sheet_name)
+        cell_value_dict = workbook_diff.flag_value_dict.get(sheet_name)
+        if sheet_diff is None and cell_value_dict is None:
+            continue
+        with profiling.sheet(sheet_name.value):
+            target_ws = profiling.wrap_worksheet(target_wb.Sheets(sheet_name.value))
+            if sheet_diff is not None:
+                with profiling.stage('apply'):
+                    compare.apply_sheet_diff(target_ws, sheet_diff)
+            if cell_value_dict is not None:
+                with profiling.stage('flag'):
+                    compare.write_value(target_ws, cell_value_dict)
+    return
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('target_keikaku_path', type = str, help = 'TargetFilePath')
     parser.add_argument('referred_keikaku_path', type = str, help = 'ReferredFilePath')
+    parser.add_argument('--engine', type = str, default = workbook_backend.ENGINE_COM,
+                        choices = [workbook_backend.ENGINE_COM, workbook_backend.ENGINE_OPENPYXL],
+                        help = 'Backend')
+    parser.add_argument('--match-method', type = str, default = forest_matching.MATCH_GREEDY,
+                        choices = [forest_matching.MATCH_GREEDY, forest_matching.MATCH_OPTIMAL],
+                        help = 'ForestMatchingMethod')
+    parser.add_argument('--report', type = str, default = '',
+                        help = 'ReportPath(.csv/.json/.parquet)')
+    parser.add_argument('--cache', type = str, default = diff_cache.CACHE_BYPASS,
+                        choices = diff_cache.CACHE_MODE_LIST, help = 'DiffCacheMode')
+    parser.add_argument('--profile', type = str, default = '',
+                        help = 'ProfilePath(.json, - to print)')
+    parser.add_argument('--workers', type = int, default = 1, help = 'CheckWorkers')
     args = parser.parse_args()
-    make_diff_red(args.target_keikaku_path, args.referred_keikaku_path)
\ No newline at end of file
+    make_diff_red(args.target_keikaku_path, args.referred_keikaku_path, engine = args.engine,
+                  match_method = args.match_method, report_path = args.report,
+                  cache_mode = args.cache, profile_path = args.profile, workers = args.workers)
\ No newline at end of file
@@ -2,8 +2,11 @@
 プロジェクト計画書（計画変更届）に含まれるシートのうち、
 情報記入シートの情報を比較する関数を定義する。
 """
-from typing import Union, Dict, List, Tuple
+from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
+import forest_matching
+import profiling
 import settings
 import utils
 
@@ -29,37 +32,56 @@ def _get_max_row_from_ws(ws1, ws2) -> int:
         ws2.UsedRange.Address.split(':')[1])[1]
     return max(ws1_bottom_row, ws2_bottom_row)
     
-def _forest_name(forest: Union[tuple, pd.Series]) -> str:
+def _forest_name_part(val) -> str:
     """概要
-    特定の林地情報を格納するtuple型またはpd.Series型から、林地名を表すstr型を返す。
+    林地名を構成する1つの値を受け取り、林地名の一部を表すstr型を返す。
 
     Parameters
     ----------
-    forest: Union[tuple, pd.Series]
-        特定の林地情報を格納するtuple型またはpd.Series型。
+    val
+        林地名を構成する値。float型の場合は整数に変換する。
 
     Returns
     ----------
-    forest_name: str
-        林地名を表すstr型。
+    forest_name_part: str
+        林地名の一部を表すstr型。
     """
-    forest_name = ''
-    for i in range(0, len(forest)):
-        if isinstance(forest,tuple):
-            val = forest[i]
-        elif isinstance(forest, pd.Series):
-            val = forest.iat[i]
-        else:
-            raise TypeError('_forest_name()はtupleまたはpd.Seriesのみを引数に受け入れます。')
-        if pd.isna(val):
+    if isinstance(val, float):
+        val = int(val)
+    return str(val)
+
+def _forest_name_series(forest_df: pd.DataFrame) -> pd.Series:
+    """概要
+    林地名に関連する情報を格納するDataFrame型から、各行の林地名を表すstr型を格納したpd.Series型を返す。
+    林地名は先頭の列から空白の値が現れる直前までの値を'-'で連結したものとする。
+    行ごとではなく列ごとに処理し、数値のみの列は一括で整数に変換する。
+
+    Parameters
+    ----------
+    forest_df: pd.DataFrame
+        林地名に関連する情報を、林地名を構成する順に列に格納したDataFrame型。
+
+    Returns
+    ----------
+    forest_name_ser: pd.Series
+        各行の林地名を表すstr型を格納したpd.Series型。
+    """
+    forest_name_ser = pd.Series('', index=forest_df.index, dtype=object)
+    # 空白の値が現れるまでの行のみを連結の対象とする
+    is_continued = np.ones(len(forest_df), dtype=bool)
+    for col_num in range(0, forest_df.shape[1]):
+        col = forest_df.iloc[:, col_num]
+        is_continued &= col.notna().to_numpy()
+        if not is_continued.any():
             break
+        val = col[is_continued]
+        if pd.api.types.is_float_dtype(val.dtype):
+            val = val.astype(np.int64).astype(str)
         else:
-            if forest_name != '':
-                forest_name += '-'
-            if isinstance(val, float):
-                val = int(val)
-            forest_name += str(val)
-    return forest_name
+            val = val.map(_forest_name_part)
+        forest_name = forest_name_ser[is_continued]
+        forest_name_ser[is_continued] = forest_name.where(forest_name == '', forest_name + '-') + val
+    return forest_name_ser
 
 def _add_forest_name(df: pd.DataFrame, forest_name_col_list: List[str]) -> pd.DataFrame:
     """概要
@@ -79,111 +101,44 @@ def _add_forest_name(df: pd.DataFrame, forest_name_col_list: List[str]) -> pd.Da
         林地情報を格納するdataframe型に対して、林地名を格納した新たな列を追加したdataframe型。
     """
     col_num_list = [utils.from_alpha_to_num(c) - 1 for c in forest_name_col_list]
-    df[_FOREST_NAME_COL_NAME] = df.iloc[:, col_num_list].apply(
-        _forest_name, axis=1)
+    df[_FOREST_NAME_COL_NAME] = _forest_name_series(df.iloc[:, col_num_list])
     return df
 
-def _forest_info_diff_score(target_forest_info: pd.Series, referred_forest_info: pd.Series,
-                         compare_col_num_list: List[int]) -> int:
-    """概要
-    2つの林地情報を受け取った上で、両者の値が異なる番地の数を返す。
-
-    Parameters
-    ----------
-    target_forest_info, referred_forest_info: pd.Series
-        乖離度を調べる林地情報。
-
-    compare_col_num_list: List[int]
-        乖離度を計算する際に使用する列番号を格納するList[int]型。
-
-    Returns
-    ----------
-    score: int
-        2つの林地の乖離度を示すint型。compare_col_num_listで指定されたすべての列情報が
-        同一ならば0、同一でない要素が1つ増えるごとに+1される。
-    """
-    target_forest_info = target_forest_info.fillna('nan')
-    referred_forest_info = referred_forest_info.fillna('nan')
-    s = 0
-    for col_num in compare_col_num_list:
-        try:
-            if target_forest_info.iloc[col_num] != referred_forest_info.iloc[col_num]:
-                s += 1
-        except Exception as e:
-            print(e, col_num, target_forest_info)
-            raise e
-    return s
-
-def _forest_df_diff_dict(target_df: pd.DataFrame, referred_df: pd.DataFrame,
-                         compare_col_num_list: List[int]) -> Dict[str, Dict[str, int]]:
+def _forest_score_matrix(target_df: pd.DataFrame, referred_df: pd.DataFrame,
+                         compare_col_num_list: List[int]) -> np.ndarray:
     """概要
     林地情報を格納するDataFrame型を2つ受け取り、個々の林地情報同士をすべての組み合わせで比較し、
-    差分がある情報の位置を格納したリスト型をvalueに持つdict型を返す。
+    両者の値が異なる番地の数（乖離度）を格納した行列を返す。
+    列ごとに両者の値を共通の整数コードに変換したうえで、ブロードキャストにより一括で比較する。
 
     Parameters
     ----------
     target_df: pd.DataFrame
-        赤字で記載するworksheetの情報を格納するnp.DataFrame型。
+        赤字で記載するworksheetの情報を格納するpd.DataFrame型。
 
     referred_df: pd.DataFrame
         差分を検出するためのworksheetの情報を格納するpd.DataFrame型。
 
-    Returns
-    ----------
-    d: Dict[str, Dict[str, List[int]]]
-        すべての林地情報同士の組み合わせにおいて、差分が認められる位置を格納したリスト型を
-        valueに持つDict[str, Dict[str, List[int]]]型。
-    """
-    d = {}
-    # 抽出したすべての林地の組み合わせにおいて、値の異なるセル番地を抽出し、辞書型に保存
-    for i in range(0, len(target_df)):
-        t_ser = target_df.iloc[i]
-        dd = {}
-        for j in range(0, len(referred_df)):
-            r_ser = referred_df.iloc[j]
-            dd[r_ser.name] = _forest_info_diff_score(t_ser, r_ser, compare_col_num_list)
-        d[t_ser.name] = dd
-    return d
-
-def _min_val_info_from_dict(d: Dict[str, Dict[str, List[int]]]) -> Tuple[int, int]:
-    """概要
-    2つの林地情報の差分情報を格納した辞書型を受け取り、差分が最も少ない組み合わせのindexを返す。
+    compare_col_num_list: List[int]
+        乖離度を計算する際に使用する列番号を格納するList[int]型。
 
-    Parameters
-    ----------
-    d: Dict[str, Dict[str, List[int]]]
-        すべての林地情報同士の組み合わせにおいて、差分が認められる位置を格納したリスト型を
-        valueに持つDict[str, Dict[str, List[int]]]型。
-        
     Returns
     ----------
-    t_df_index: int
-        差分が最も少ない組み合わせのうち、差分を赤字にするworksheetに紐づく林地情報の位置。
-
-    r_df_index: int
-        差分が最も少ない組み合わせのうち、参照されるworksheetに紐づく林地情報の位置。
+    score_matrix: np.ndarray
+        行にtarget_dfの林地情報、列にreferred_dfの林地情報をとり、両者の乖離度を格納した
+        2次元のnp.ndarray型。compare_col_num_listで指定されたすべての列情報が同一ならば0、
+        同一でない要素が1つ増えるごとに+1される。両者ともに空白の番地は同一とみなす。
     """
-    min_d = {key: min(d[key].values()) for key in d.keys()}
-    min_s = min(min_d.values())
-    t_df_index = -1
-    for key in min_d.keys():
-        if min_d[key] == min_s:
-            t_df_index = key
-            break
-    if t_df_index == -1:
-        raise ValueError('条件に合うt_df_indexが存在しません。\n' \
-        'd: {}, min_s: {}, t_df_index: {}, r_df_index: {}'.format(
-            d, min_s, t_df_index, r_df_index))
-    r_df_index = -1
-    for key in d[t_df_index].keys():
-        if d[t_df_index][key] == min_s:
-            r_df_index = key
-            break
-    if r_df_index == -1:
-        raise ValueError('条件に合うt_df_indexが存在しません。\n' \
-        'd: {}, min_s: {}, t_df_index: {}, r_df_index: {}'.format(
-            d, min_s, t_df_index, r_df_index))
-    return t_df_index, r_df_index
+    n, m = len(target_df), len(referred_df)
+    score_matrix = np.zeros((n, m), dtype=np.int64)
+    if n == 0 or m == 0:
+        return score_matrix
+    for col_num in compare_col_num_list:
+        # 空白（NaN、None）はいずれも-1に変換されるため、両者ともに空白の場合は同一とみなされる
+        codes, _ = pd.factorize(pd.concat([target_df.iloc[:, col_num],
+                                           referred_df.iloc[:, col_num]], ignore_index=True))
+        score_matrix += codes[:n, np.newaxis] != codes[np.newaxis, n:]
+    return score_matrix
 
 def _diff_col_num_list(target_forest_info: pd.Series, referred_forest_info: pd.Series, 
                        check_col_num_list: List[int]) -> List[int]:
@@ -217,7 +172,10 @@ def _diff_col_num_list(target_forest_info: pd.Series, referred_forest_info: pd.S
 
 def _check_cell_address_list(target_ws, referred_ws, check_col_list: List[str], 
                              forest_name_col_list: List[str], compare_col_list: List[str], 
-                             col_offset: int, row_offset: int) -> List[str]:
+                             col_offset: int, row_offset: int,
+                             match_method: str = forest_matching.MATCH_GREEDY,
+                             referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                             ) -> List[str]:
     """概要
     2つの情報記入シートを比較し、林地名をもとに林地情報を紐づける。
     両者に差があった場合、target_wsのセル番地をリストに格納して返す。
@@ -245,6 +203,15 @@ def _check_cell_address_list(target_ws, referred_ws, check_col_list: List[str],
     row_offset: int
         行方向のオフセット数を示すint型。
 
+    match_method: str
+        同じ林地名を持つ林地情報の対応付けの方法を示すstr型。
+        forest_matching.matchのmethodに渡す。デフォルトはgreedy。
+
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるtarget_wsのセル番地または範囲をkeyに、対応付けた林地情報のreferred_wsのセル番地
+        （対応付けた林地情報がない場合はNone）をvalueとして格納するdict型。Noneの場合は格納しない。
+        デフォルトはNone。
+
     Returns:
     ----------
     check_cell_address_list: List[str]
@@ -264,41 +231,48 @@ def _check_cell_address_list(target_ws, referred_ws, check_col_list: List[str],
                             for alpha in compare_col_list]
     check_col_num_list = [utils.from_alpha_to_num(alpha) - col_offset - 1 
                           for alpha in check_col_list]
+    profiling.count('compare.address_num', len(target_df) * len(check_col_num_list))
     # 林地ごとに林地名を抽出して処理（混交林に対応）
     for forest_name in target_df[_FOREST_NAME_COL_NAME].unique():
         t_df = target_df[target_df[_FOREST_NAME_COL_NAME] == forest_name]
         r_df = referred_df[referred_df[_FOREST_NAME_COL_NAME] == forest_name]
-        # 抽出したすべての林地の組み合わせにおいて、値の異なるセル番地を抽出し、辞書型に保存
-        d = _forest_df_diff_dict(t_df, r_df, compare_col_num_list)
-        while(True):
-            if len(d) == 0 or len(list(d.values())[0]) == 0:
-                break
-            # 乖離度が最も小さい組み合わせを抽出
-            # （値の異なるセルが最小のもの、最小の組み合わせが複数ある場合は、先頭のもの同士を採用）
-            t_df_index, r_df_index = _min_val_info_from_dict(d)
-            
-            # 乖離度の小さかった組み合わせにおいて、差分を赤字にするセルのリストとして格納
+        # 抽出したすべての林地の組み合わせにおいて、値の異なるセルの数を行列として算出
+        with profiling.stage('forest_matching'):
+            score_matrix = _forest_score_matrix(t_df, r_df, compare_col_num_list)
+            # 乖離度をもとに林地を対応付ける
+            # （greedyの場合は値の異なるセルが最小のものから順に、最小の組み合わせが複数ある場合は、
+            # 先頭のもの同士を採用）
+            pair_list = forest_matching.match(score_matrix, match_method)
+        t_df_index_list = list(t_df.index)
+        r_df_index_list = list(r_df.index)
+        for t_pos, r_pos in pair_list:
+            t_df_index = t_df_index_list[t_pos]
+            r_df_index = r_df_index_list[r_pos]
+            # 対応付けた組み合わせにおいて、差分を赤字にするセルのリストとして格納
             diff_col_num_list = _diff_col_num_list(
                 t_df.loc[t_df_index], r_df.loc[r_df_index], check_col_num_list)
-            check_cell_address_list += ['{}{}'.format(utils.toAlpha3(col_num + col_offset + 1), 
-                                                      t_df_index + row_offset + 1) 
-                                        for col_num in diff_col_num_list]
-            
-            # 辞書型から抽出した組み合わせの情報を削除
-            del d[t_df_index]
-            if len(d) == 0:
-                break
-            for key in d.keys():
-                del d[key][r_df_index]
-            
-         # 林地が追加されていた場合はすべての情報を赤字で表示
-        if len(d) != 0 and len(list(d.values())[0]) == 0:
-            for t_df_index in d.keys():
-                check_cell_address_list.append('{c1}{r}:{c2}{r}'.format(
-                    r = t_df_index + row_offset + 1, c1 = check_col_list[0], c2 = check_col_list[-1]))
+            for col_num in diff_col_num_list:
+                col_alpha = utils.toAlpha3(col_num + col_offset + 1)
+                address = '{}{}'.format(col_alpha, t_df_index + row_offset + 1)
+                check_cell_address_list.append(address)
+                if referred_address_dict is not None:
+                    referred_address_dict[address] = '{}{}'.format(col_alpha, r_df_index + row_offset + 1)
+
+        # 林地が追加されていた場合はすべての情報を赤字で表示
+        matched_t_pos_set = set(t_pos for t_pos, _ in pair_list)
+        for t_pos, t_df_index in enumerate(t_df_index_list):
+            if t_pos not in matched_t_pos_set:
+                address = '{c1}{r}:{c2}{r}'.format(
+                    r = t_df_index + row_offset + 1, c1 = check_col_list[0], c2 = check_col_list[-1])
+                check_cell_address_list.append(address)
+                if referred_address_dict is not None:
+                    referred_address_dict[address] = None
     return check_cell_address_list
 
-def check_cell_address_list_ikusei_info(target_ws, referred_ws) -> List[str]:
+def check_cell_address_list_ikusei_info(target_ws, referred_ws,
+                                        match_method: str = forest_matching.MATCH_GREEDY,
+                                        referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                                        ) -> List[str]:
     """概要
     2つの【吸収量（育成林）算定用】情報記入シート（001、003共通）を比較し、林地名をもとに林地情報を紐づける。
     両者に差があった場合、target_wsのセル番地をリストに格納して返す。
@@ -311,6 +285,13 @@ def check_cell_address_list_ikusei_info(target_ws, referred_ws) -> List[str]:
     referred_ws:
         差分を確認するための【吸収量（育成林）算定用】情報記入シート（001、003共通）。
 
+    match_method: str
+        同じ林地名を持つ林地情報の対応付けの方法を示すstr型。デフォルトはgreedy。
+
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるセル番地をkeyに、対応付けたreferred_wsのセル番地をvalueとして格納するdict型。
+        _check_cell_address_listを参照。デフォルトはNone。
+
     Returns:
     ----------
     check_cell_address_list: List[str]
@@ -321,9 +302,13 @@ def check_cell_address_list_ikusei_info(target_ws, referred_ws) -> List[str]:
                                     settings.IKUSEI_INFO_PARAMS.FOREST_NAME_COL_LIST,
                                     settings.IKUSEI_INFO_PARAMS.COMPARE_COL_LIST,
                                     settings.IKUSEI_INFO_PARAMS.COL_OFFSET,
-                                    settings.IKUSEI_INFO_PARAMS.ROW_OFFSET)
+                                    settings.IKUSEI_INFO_PARAMS.ROW_OFFSET,
+                                    match_method, referred_address_dict)
 
-def check_cell_address_list_tennen_info(target_ws, referred_ws) -> List[str]:
+def check_cell_address_list_tennen_info(target_ws, referred_ws,
+                                        match_method: str = forest_matching.MATCH_GREEDY,
+                                        referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                                        ) -> List[str]:
     """概要
     2つの【吸収量（天然生林）算定用】情報記入シート（FO-001）を比較し、林地名をもとに林地情報を紐づける。
     両者に差があった場合、target_wsのセル番地をリストに格納して返す。
@@ -336,6 +321,13 @@ def check_cell_address_list_tennen_info(target_ws, referred_ws) -> List[str]:
     referred_ws:
         差分を確認するための【吸収量（天然生林）算定用】情報記入シート（FO-001）。
 
+    match_method: str
+        同じ林地名を持つ林地情報の対応付けの方法を示すstr型。デフォルトはgreedy。
+
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるセル番地をkeyに、対応付けたreferred_wsのセル番地をvalueとして格納するdict型。
+        _check_cell_address_listを参照。デフォルトはNone。
+
     Returns:
     ----------
     check_cell_address_list: List[str]
@@ -346,9 +338,13 @@ def check_cell_address_list_tennen_info(target_ws, referred_ws) -> List[str]:
                                     settings.TENNEN_INFO_PARAMS.FOREST_NAME_COL_LIST,
                                     settings.TENNEN_INFO_PARAMS.COMPARE_COL_LIST,
                                     settings.TENNEN_INFO_PARAMS.COL_OFFSET,
-                                    settings.TENNEN_INFO_PARAMS.ROW_OFFSET)
+                                    settings.TENNEN_INFO_PARAMS.ROW_OFFSET,
+                                    match_method, referred_address_dict)
 
-def check_cell_address_list_in_pj_emission_info(target_ws, referred_ws) -> List[str]:
+def check_cell_address_list_in_pj_emission_info(target_ws, referred_ws,
+                                                match_method: str = forest_matching.MATCH_GREEDY,
+                                                referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                                                ) -> List[str]:
     """概要
     2つの【排出量（PJ内）算定用】情報記入シート（001、003共通）を比較し、林地名をもとに林地情報を紐づける。
     両者に差があった場合、target_wsのセル番地をリストに格納して返す。
@@ -361,6 +357,13 @@ def check_cell_address_list_in_pj_emission_info(target_ws, referred_ws) -> List[
     referred_ws:
         差分を確認するための【排出量（PJ内）算定用】情報記入シート（001、003共通）。
 
+    match_method: str
+        同じ林地名を持つ林地情報の対応付けの方法を示すstr型。デフォルトはgreedy。
+
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるセル番地をkeyに、対応付けたreferred_wsのセル番地をvalueとして格納するdict型。
+        _check_cell_address_listを参照。デフォルトはNone。
+
     Returns:
     ----------
     check_cell_address_list: List[str]
@@ -371,9 +374,13 @@ def check_cell_address_list_in_pj_emission_info(target_ws, referred_ws) -> List[
                                     settings.IN_PJ_EMISSION_INFO_PARAMS.FOREST_NAME_COL_LIST,
                                     settings.IN_PJ_EMISSION_INFO_PARAMS.COMPARE_COL_LIST,
                                     settings.IN_PJ_EMISSION_INFO_PARAMS.COL_OFFSET,
-                                    settings.IN_PJ_EMISSION_INFO_PARAMS.ROW_OFFSET)
+                                    settings.IN_PJ_EMISSION_INFO_PARAMS.ROW_OFFSET,
+                                    match_method, referred_address_dict)
 
-def check_cell_address_list_out_pj_info(target_ws, referred_ws) -> List[str]:
+def check_cell_address_list_out_pj_info(target_ws, referred_ws,
+                                        match_method: str = forest_matching.MATCH_GREEDY,
+                                        referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                                        ) -> List[str]:
     """概要
     2つの【主伐再造林（PJ外）算定用】情報記入シート（FO-001）を比較し、林地名をもとに林地情報を紐づける。
     両者に差があった場合、target_wsのセル番地をリストに格納して返す。
@@ -386,6 +393,13 @@ def check_cell_address_list_out_pj_info(target_ws, referred_ws) -> List[str]:
     referred_ws:
         差分を確認するための【主伐再造林（PJ外）算定用】情報記入シート（FO-001）。
 
+    match_method: str
+        同じ林地名を持つ林地情報の対応付けの方法を示すstr型。デフォルトはgreedy。
+
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるセル番地をkeyに、対応付けたreferred_wsのセル番地をvalueとして格納するdict型。
+        _check_cell_address_listを参照。デフォルトはNone。
+
     Returns:
     ----------
     check_cell_address_list: List[str]
@@ -396,4 +410,5 @@ def check_cell_address_list_out_pj_info(target_ws, referred_ws) -> List[str]:
                                     settings.OUT_PJ_INFO_PARAMS.FOREST_NAME_COL_LIST,
                                     settings.OUT_PJ_INFO_PARAMS.COMPARE_COL_LIST,
                                     settings.OUT_PJ_INFO_PARAMS.COL_OFFFSET,
-                                    settings.OUT_PJ_INFO_PARAMS.ROW_OFFSET)
\ No newline at end of file
+                                    settings.OUT_PJ_INFO_PARAMS.ROW_OFFSET,
+                                    match_method, referred_address_dict)
\ No newline at end of file
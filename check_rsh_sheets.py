@@ -2,8 +2,10 @@
 プロジェクト計画書（計画変更届）に含まれるシートのうち、
 幹材積量算定シートの情報を比較する関数を定義する。
 """
-from typing import List
+from typing import List, Dict, Optional
+import numpy as np
 from constants import KeikakuSheet
+import profiling
 import settings
 import utils
 
@@ -24,8 +26,29 @@ def _species_rank_list(value: tuple, col_interval: int) -> List[str]:
     t = value[0]
     return [t[i] for i in range(len(t)) if i % col_interval == 0]
 
+def _species_rank_index_dict(species_rank_list: List[str]) -> Dict[str, int]:
+    """概要
+    樹種＋地位名のstr型を格納するlist型を受け取り、樹種＋地位名をkey、
+    最初に現れる位置をvalueに持つdict型を返す。
+
+    Parameters
+    ----------
+    species_rank_list: List[str]
+        樹種＋地位名のstr型を格納するlist型。
+
+    Returns
+    ----------
+    d: Dict[str, int]
+        樹種＋地位名をkey、species_rank_listにおいて最初に現れる位置をvalueに持つDict[str, int]型。
+    """
+    d = {}
+    for i, species_rank in enumerate(species_rank_list):
+        d.setdefault(species_rank, i)
+    return d
+
 def _check_cell_address_list_rsh(target_ws, referred_ws, col_offset: int, row_offset: int,
-                             col_interval: int, species_rank_ref_cell_address: str) -> List[str]:
+                             col_interval: int, species_rank_ref_cell_address: str,
+                             referred_address_dict: Optional[Dict[str, Optional[str]]] = None) -> List[str]:
     """概要
     幹材積量算定シートの情報を比較し、差分のあるセルのアドレスをリストに格納する。
 
@@ -49,6 +72,11 @@ def _check_cell_address_list_rsh(target_ws, referred_ws, col_offset: int, row_of
     species_rank_ref_cell_address: str
         樹種＋地位名を記入する範囲のうち左端のセルの番地を示すstr型。
 
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるtarget_wsのセル番地または範囲をkeyに、同じ樹種＋地位、林齢のreferred_wsのセル番地
+        （樹種＋地位が追加されていた場合はNone）をvalueとして格納するdict型。Noneの場合は格納しない。
+        デフォルトはNone。
+
     Returns
     ----------
     check_cell_address_list: List[str]
@@ -63,31 +91,50 @@ def _check_cell_address_list_rsh(target_ws, referred_ws, col_offset: int, row_of
     max_age = utils.from_cell_address_to_column_row_int(bottom_right_cell_address)[1] - row_offset
     target_value = target_ws.Range(range_address).Value
     referred_value = referred_ws.Range(range_address).value
-    target_species_rank_list = _species_rank_list(target_value, col_interval)
-    referred_species_rank_list = _species_rank_list(referred_value, col_interval)
-    for species_rank in target_species_rank_list:
-        t_index = target_species_rank_list.index(species_rank)
-        t_col = t_index * col_interval
-        if species_rank in referred_species_rank_list:        
-            r_index = referred_species_rank_list.index(species_rank)
-            r_col = r_index * col_interval
-            for age in range(1, max_age + 1):
-                if target_value[age + 2][t_col] != referred_value[age + 2][r_col]:
-                    check_cell_address_list.append('{}{}'.format(
-                        utils.toAlpha3(t_col + col_offset + 1),
-                        age + row_offset))
+    target_species_rank_dict = _species_rank_index_dict(
+        _species_rank_list(target_value, col_interval))
+    referred_species_rank_dict = _species_rank_index_dict(
+        _species_rank_list(referred_value, col_interval))
+    # 林齢ごとの値を（林齢、列）のnp.array型として取り出す
+    target_age_array = np.array(target_value, dtype=object)[3:max_age + 3]
+    referred_age_array = np.array(referred_value, dtype=object)[3:max_age + 3]
+    # 両者に存在する樹種＋地位の列を対応付け、すべての林齢を一括で比較
+    common_species_rank_list = [species_rank for species_rank in target_species_rank_dict
+                                if species_rank in referred_species_rank_dict]
+    t_col_array = np.array([target_species_rank_dict[species_rank] * col_interval
+                            for species_rank in common_species_rank_list], dtype=np.int64)
+    r_col_array = np.array([referred_species_rank_dict[species_rank] * col_interval
+                            for species_rank in common_species_rank_list], dtype=np.int64)
+    is_diff_array = target_age_array[:, t_col_array] != referred_age_array[:, r_col_array]
+    profiling.count('compare.address_num', is_diff_array.size)
+    common_species_rank_pos_dict = {species_rank: i
+                                    for i, species_rank in enumerate(common_species_rank_list)}
+    for species_rank, t_index in target_species_rank_dict.items():
+        t_col_alpha = utils.toAlpha3(t_index * col_interval + col_offset + 1)
+        if species_rank in common_species_rank_pos_dict:
+            diff_age_array = np.flatnonzero(
+                is_diff_array[:, common_species_rank_pos_dict[species_rank]]) + 1
+            diff_address_list = ['{}{}'.format(t_col_alpha, age + row_offset) for age in diff_age_array]
+            check_cell_address_list += diff_address_list
+            if referred_address_dict is not None:
+                r_col_alpha = utils.toAlpha3(
+                    referred_species_rank_dict[species_rank] * col_interval + col_offset + 1)
+                for address, age in zip(diff_address_list, diff_age_array):
+                    referred_address_dict[address] = '{}{}'.format(r_col_alpha, age + row_offset)
         else:
-            check_cell_address_list.append('{}{}'.format(
-                utils.toAlpha3(t_col + col_offset + 1),
-                row_offset - 2
-            ))
-            for age in range(1, max_age + 1):
-                check_cell_address_list.append('{}{}'.format(
-                        utils.toAlpha3(t_col + col_offset + 1),
-                        age + row_offset))
+            # 樹種＋地位が追加されていた場合は、樹種＋地位名とすべての林齢を赤字で表示
+            added_address_list = ['{}{}'.format(t_col_alpha, row_offset - 2)]
+            if max_age > 0:
+                added_address_list.append('{c}{r1}:{c}{r2}'.format(
+                    c = t_col_alpha, r1 = row_offset + 1, r2 = max_age + row_offset))
+            check_cell_address_list += added_address_list
+            if referred_address_dict is not None:
+                referred_address_dict.update(dict.fromkeys(added_address_list))
     return check_cell_address_list
 
-def check_cell_address_list_ikusei_rsh(target_ws, referred_ws) -> List[str]:
+def check_cell_address_list_ikusei_rsh(target_ws, referred_ws,
+                                       referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                                       ) -> List[str]:
     """概要
     幹材積量算定シート_育成林および主伐用（001、003共通）同士を比較し、差分のあるセルを赤字に更新する。
 
@@ -99,6 +146,10 @@ def check_cell_address_list_ikusei_rsh(target_ws, referred_ws) -> List[str]:
     referred_ws
         差分を参照する幹材積量算定シート。
 
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるセル番地をkeyに、対応付けたreferred_wsのセル番地をvalueとして格納するdict型。
+        _check_cell_address_list_rshを参照。デフォルトはNone。
+
     Returns
     ----------
     check_cell_address_list: List[str]
@@ -107,9 +158,12 @@ def check_cell_address_list_ikusei_rsh(target_ws, referred_ws) -> List[str]:
     return _check_cell_address_list_rsh(target_ws, referred_ws, settings.IKUSEI_RSH_PARAMS.COL_OFFSET,
                                         settings.IKUSEI_RSH_PARAMS.ROW_OFFSET,
                                         settings.IKUSEI_RSH_PARAMS.COL_INTERVAL,
-                                        settings.IKUSEI_RSH_PARAMS.SPECIES_RANK_REF_CELL_ADDRESS)
+                                        settings.IKUSEI_RSH_PARAMS.SPECIES_RANK_REF_CELL_ADDRESS,
+                                        referred_address_dict)
 
-def check_cell_address_list_tennen_rsh(target_ws, referred_ws) -> List[str]:
+def check_cell_address_list_tennen_rsh(target_ws, referred_ws,
+                                       referred_address_dict: Optional[Dict[str, Optional[str]]] = None
+                                       ) -> List[str]:
     """概要
     幹材積量算定シート_天然生林（FO-001）同士を比較し、差分のあるセルを赤字に更新する。
 
@@ -121,6 +175,10 @@ def check_cell_address_list_tennen_rsh(target_ws, referred_ws) -> List[str]:
     referred_ws
         差分を参照する幹材積量算定シート。
 
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        差分のあるセル番地をkeyに、対応付けたreferred_wsのセル番地をvalueとして格納するdict型。
+        _check_cell_address_list_rshを参照。デフォルトはNone。
+
     Returns
     ----------
     check_cell_address_list: List[str]
@@ -129,4 +187,5 @@ def check_cell_address_list_tennen_rsh(target_ws, referred_ws) -> List[str]:
     return _check_cell_address_list_rsh(target_ws, referred_ws, settings.TENNEN_RSH_PARAMS.COL_OFFSET,
                                         settings.TENNEN_RSH_PARAMS.ROW_OFFSET,
                                         settings.TENNEN_RSH_PARAMS.COL_INTERVAL,
-                                        settings.TENNEN_RSH_PARAMS.SPECIES_RANK_REF_CELL_ADDRESS)
\ No newline at end of file
+                                        settings.TENNEN_RSH_PARAMS.SPECIES_RANK_REF_CELL_ADDRESS,
+                                        referred_address_dict)
\ No newline at end of file
@@ -2,84 +2,136 @@
 2つのプロジェクト計画書（計画変更届）のうちの特定のシートに含まれる番地ごとの情報を確認し、
 両者に差分があった場合に書き込みまたは赤字変更の処理を行う関数を定義する。
 """
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Optional, Tuple, Union
 import numpy as np
+import pandas as pd
+from cell_ref import CellRef, RangeRef, merge_into_rectangles
 import compare_text_value
 from constants import KeikakuSheet, Color, ChangeFlag
-import settings
+from diff_report import DiffReport
+import profiling
+import sheet_plan
 import utils
 
-def _extract_array(array: np.array, relative_address_loc: Tuple[Tuple[int]]) -> np.array:
+def _read_value(ws, range_address: str, formula: bool = False) -> np.array:
     """概要
-    np.array型の2次元配列から、relative_address_locで指定した範囲を抽出する。
+    ワークシートのうち指定した範囲の値を、2次元のnp.array型にして返す。
 
     Parameters
     ----------
-    array: np.array
-        抽出される2次元配列を格納するnp.array型。
+    ws
+        値を読み込むワークシート。
 
-    relative_address_loc: Tuple[Tuple[int]]
-        抽出する範囲を示すint型を格納するTuple型。
+    range_address: str
+        値を読み込む範囲を示すstr型。
+
+    formula: bool
+        値の代わりに数式を読み込むか否かを示すbool型。デフォルトはFalse。
 
     Returns
     ----------
-    return_array: np.array
-        抽出されたnp.array型。
+    value: np.array
+        範囲の値を格納する2次元のnp.array型。
     """
-    return array[relative_address_loc[0][0]:relative_address_loc[1][0]+1,
-                 relative_address_loc[0][1]:relative_address_loc[1][1]+1]
+    value = ws.Range(range_address).Formula if formula else ws.Range(range_address).Value
+    # 1つのセルを指定した場合は値がそのまま返されるため、2次元に揃える
+    if not isinstance(value, tuple):
+        value = ((value,),)
+    return np.array(value, dtype=object)
 
-def _is_same(address: str, referred_cell_loc: str, target_value: np.array, 
-             referred_value: np.array, return_value_address: Optional[str] = None)\
-                -> Tuple[bool, Optional[np.array], Optional[np.array], Optional[np.array]]:
+def _relative_loc_array(address_list: List[str], referred_cell_loc: Tuple[int]) -> np.array:
     """概要
-    与えられたaddress, referred_cell_locから求まる相対位置の範囲に対して、
-    2つのnp.array型を比較し、両者の値が同一であるか否かのbool型と、
-    referred_valueから抽出した値のtuple型を返す。
+    セル番地またはセル範囲を表すstr型を格納したlist型を受け取り、参照セルを起点とする各範囲の
+    相対座標を格納したnp.array型を返す。
 
     Parameters
     ----------
-    address: str
-        値を比較するセル範囲を示すstr型。
+    address_list: List[str]
+        セル番地またはセル範囲を表すstr型を格納したlist型。
 
-    referred_cell_loc: str
-        target_value, referred_valueの値を格納する範囲のうち、左上のセルの座標を示すstr型。
+    referred_cell_loc: Tuple[int]
+        参照セルの座標を示すtuple型。(列番号、行番号)のint型を格納する。
 
-    target_value: np.array
-        値を比較するnp.array型。
+    Returns
+    ----------
+    loc_array: np.array
+        各範囲の（左上の行、左上の列、右下の行、右下の列）の相対座標を行ごとに格納した
+        2次元のnp.array型。
+    """
+    loc_array = np.zeros((len(address_list), 4), dtype=np.int64)
+    for i, address in enumerate(address_list):
+        first_loc, last_loc = utils.relative_range_address_loc(address, referred_cell_loc)
+        loc_array[i] = (first_loc[0], first_loc[1], last_loc[0], last_loc[1])
+    return loc_array
 
-    referred_value: np.array
-        値を参照するnp.array型。
-        与えられたreferred_valueのうち、return_value_addressに対応する範囲の値が返される。
+def _diff_mask(target_value: np.array, referred_value: np.array) -> np.array:
+    """概要
+    2つのnp.array型を要素ごとに比較し、値が異なる要素をTrueとするnp.array型を返す。
+    どちらも欠損値（None, NaN）の要素は同一とみなす。
 
-    return_value_address: Optional[str] = None
-        referred_valueから値を抽出する範囲を示すstr型。Noneの場合は、
-        addressと同じ範囲を抽出する。デフォルトはNone。
+    Parameters
+    ----------
+    target_value, referred_value: np.array
+        比較する同じ形の2次元のnp.array型。
 
-    Return
+    Returns
     ----------
-    check_tuple: Tuple[bool, Optional[np.array]]
-        指定した範囲において、2つのnp.array型の持つ値が同一であるか否かを示すbool値と、
-        referred_valueのうちreturn_value_addressで指定される範囲のnp.array型を格納するtuple型。
+    mask: np.array
+        値が異なる要素をTrueとするbool型の2次元のnp.array型。
     """
-    relative_address_loc = utils.relative_range_address_loc(address, referred_cell_loc)
-    try:
-        target_array = _extract_array(target_value, relative_address_loc)
-        referred_array = _extract_array(referred_value, relative_address_loc)
-        if return_value_address is None:
-            return (referred_array == target_array).all(), referred_array, target_array
-        else:
-            return_address_loc = utils.relative_range_address_loc(return_value_address, 
-                                                                  referred_cell_loc)
-            return_array = _extract_array(referred_value, return_address_loc)
-            return (referred_array == target_array).all(), return_array, target_array
-    except Exception as e:
-        print(e)
-        print(address)
-        return False, None, None
+    is_equal = np.asarray(target_value == referred_value, dtype=bool)
+    is_both_na = pd.isna(target_value) & pd.isna(referred_value)
+    return ~(is_equal | is_both_na)
+
+def _is_diff_array(diff_mask: np.array, loc_array: np.array) -> np.array:
+    """概要
+    値が異なる要素をTrueとするnp.array型と、範囲の相対座標を受け取り、
+    各範囲に値の異なる要素が含まれるか否かを格納したnp.array型を返す。
+    累積和を用いることで、範囲の数によらず一度の計算で求める。
+
+    Parameters
+    ----------
+    diff_mask: np.array
+        値が異なる要素をTrueとするbool型の2次元のnp.array型。
+
+    loc_array: np.array
+        各範囲の（左上の行、左上の列、右下の行、右下の列）の相対座標を行ごとに格納した
+        2次元のnp.array型。
+
+    Returns
+    ----------
+    is_diff_array: np.array
+        各範囲に値の異なる要素が含まれるか否かを格納したbool型のnp.array型。
+    """
+    s = np.zeros((diff_mask.shape[0] + 1, diff_mask.shape[1] + 1), dtype=np.int64)
+    s[1:, 1:] = diff_mask.cumsum(axis=0).cumsum(axis=1)
+    r1, c1, r2, c2 = loc_array[:, 0], loc_array[:, 1], loc_array[:, 2] + 1, loc_array[:, 3] + 1
+    return (s[r2, c2] - s[r1, c2] - s[r2, c1] + s[r1, c1]) > 0
+
+class SheetDiff:
+    """概要
+    1つのワークシートについて、差分の確認の結果（赤字にする範囲と、文字列の差分）を格納する。
+    差分の確認と赤字表示（apply_sheet_diff）を分けて行い、確認の結果を保存して再利用できるようにする。
+
+    Attributes
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    red_address_list: List[Union[str, RangeRef]]
+        字を赤字にするセル番地または範囲を格納したlist型。
+
+    text_diff_list: List[Tuple[str, List[Tuple[int]]]]
+        文字列の差分を確認したセル番地と、compare_text_value.find_text_diffの返り値の組を格納したlist型。
+    """
+    def __init__(self, sheet_name: KeikakuSheet):
+        self.sheet_name = sheet_name
+        self.red_address_list: List[Union[str, RangeRef]] = []
+        self.text_diff_list: List[Tuple[str, List[Tuple[int]]]] = []
 
 def perform(sheet_name: KeikakuSheet, target_ws, referred_ws, 
-            compare_address_list: List[str], how: str) -> None:
+            compare_address_list: List[str], how: str, report: Optional[DiffReport] = None,
+            sheet_diff: Optional[SheetDiff] = None) -> None:
     """概要
     与えられたセル番地に対して、2つのワークシートの値を比較し、両者が異なる場合は一方のワークシートに対して
     値の書き写しまたは赤字表示の処理を行う。
@@ -102,60 +154,153 @@ def perform(sheet_name: KeikakuSheet, target_ws, referred_ws,
         差分のあるセル範囲に対して、値を書き写すか、赤字表示にするかを指定するstr型。
         copyが与えられれば書き写し、checkが与えられれば赤字表示にする。それ以外の値はValueErrorを返す。
 
+    report: Optional[DiffReport]
+        howがcheckの場合に、赤字表示を行わずに差分を記録する報告書。Noneの場合は赤字表示にする。
+        デフォルトはNone。
+
+    sheet_diff: Optional[SheetDiff]
+        howがcheckの場合に、赤字表示を行わずに赤字にする範囲を追加するSheetDiff。
+        Noneの場合はこの関数の中で赤字表示にする。デフォルトはNone。
+
     Returns
     ----------
     None
     """
-    target_wk = target_ws.UsedRange
-    target_value = np.array(target_wk.Value)
-    referred_wk = referred_ws.Range(target_wk.Address)
-    referred_value = np.array(referred_wk.Value)
-    referred_cell = utils.get_cell_address_from_range_address(target_wk.Address)
-    referred_cell_loc = utils.from_cell_address_to_column_row_int(referred_cell)
-
-    for address in compare_address_list:
-        check_tuple = _is_same(address, referred_cell_loc, target_value, referred_value)
-        if not check_tuple[0]:
-            if how == 'copy':
-                _write(sheet_name, target_ws, address, check_tuple[1])
-            elif how == 'check':
-                _make_red(sheet_name, target_ws, address, check_tuple[1], check_tuple[2])
-            else:
-                raise ValueError('howにはcopyまたはcheckを指定してください。')
+    if how not in ('copy', 'check'):
+        raise ValueError('howにはcopyまたはcheckを指定してください。')
+    # 比較するセル番地の座標、読み込む範囲、セルの種類は、settingsから作成した処理計画を使用する
+    plan = sheet_plan.get_plan(sheet_name, compare_address_list)
+    # UsedRange全体ではなく、比較するセル番地をすべて含む最小の範囲のみを読み込む
+    if plan.read_address == '':
+        return
+    profiling.count('compare.address_num', len(plan.address_list))
+    target_value = _read_value(target_ws, plan.read_address)
+    referred_value = _read_value(referred_ws, plan.read_address)
+
+    # シート全体の差分を一度に求め、各範囲の差分の有無を判定する
+    loc_array = plan.relative_loc_array
+    diff_mask = _diff_mask(target_value, referred_value)
+    is_diff_array = _is_diff_array(diff_mask, loc_array)
+
+    # 書き込みと赤字の処理は、最後にまとめて行う
+    cell_value_dict = {}
+    is_applied = sheet_diff is None
+    if is_applied:
+        sheet_diff = SheetDiff(sheet_name)
+    for i in np.flatnonzero(is_diff_array):
+        address = plan.address_list[i]
+        r1, c1, r2, c2 = loc_array[i]
+        referred_array = referred_value[r1:r2 + 1, c1:c2 + 1]
+        if how == 'copy':
+            _add_write_value(cell_value_dict, plan.range_list[i], referred_array,
+                             plan.is_num_to_str_array[i])
+        elif report is not None:
+            target_array = target_value[r1:r2 + 1, c1:c2 + 1]
+            # 範囲が指定されている場合は、赤字表示と同じく先頭のセルのみ文字列の差分を確認する
+            text_diff = None
+            if plan.is_text_array[i]:
+                with profiling.stage('text_diff'):
+                    text_diff = compare_text_value.find_text_diff(target_array[0][0],
+                                                                  referred_array[0][0])
+            report.add_array(sheet_name, plan.range_list[i], target_array, referred_array,
+                             diff_mask[r1:r2 + 1, c1:c2 + 1], text_diff)
+        elif plan.is_text_array[i]:
+            # 範囲が指定されている場合は先頭のセルのみ対応
+            with profiling.stage('text_diff'):
+                sheet_diff.text_diff_list.append((address, compare_text_value.find_text_diff(
+                    target_value[r1][c1], referred_array[0][0])))
+        else:
+            sheet_diff.red_address_list.append(plan.range_list[i])
+    _write(target_ws, cell_value_dict)
+    if is_applied:
+        apply_sheet_diff(target_ws, sheet_diff)
     return
 
-def _write(sheet_name: KeikakuSheet, target_ws, address: str, referred_array: np.array) -> None:
+def apply_sheet_diff(target_ws, sheet_diff: SheetDiff) -> None:
     """概要
-    ワークシートに対して、指定したアドレスに指定した値を書き込む。
+    ワークシートに対して、差分の確認の結果に基づき赤字表示を行う。
 
     Parameters
     ----------
-    sheet_name
-        ワークシートのシート名を示すKeikakuSheet型。
-
     target_ws
-        値を書き込むワークシート。
+        字を赤字にするワークシート。
 
-    address: str
-        値を書き込む範囲を示すstr型。
+    sheet_diff: SheetDiff
+        差分の確認の結果。
+
+    Returns
+    ----------
+    None
+    """
+    profiling.count('highlight.text_cell_num', len(sheet_diff.text_diff_list))
+    profiling.count('highlight.address_num', len(sheet_diff.red_address_list))
+    for address, text_diff in sheet_diff.text_diff_list:
+        _make_text_red(sheet_diff.sheet_name, target_ws, address, text_diff)
+    make_red(target_ws, sheet_diff.red_address_list)
+    return
+
+def _add_write_value(cell_value_dict: Dict[Tuple[int, int], object], range_ref: RangeRef,
+                     referred_array: np.array, is_num_to_str: bool = False) -> None:
+    """概要
+    書き込む範囲の値をセルごとに分解し、辞書型に格納する。
+
+    Parameters
+    ----------
+    cell_value_dict: Dict[Tuple[int, int], object]
+        （列番号、行番号）をkeyに、書き込む値をvalueに持つ辞書型。
+
+    range_ref: RangeRef
+        値を書き込む範囲を示すRangeRef。
 
     referred_array: np.array
         書き込む値を示すnp.array型。
 
+    is_num_to_str: bool
+        文字列であることを明記して書き写すか否かを示すbool型。デフォルトはFalse。
+
+    Returns
+    ----------
+    None
+    """
+    for i in range(referred_array.shape[0]):
+        for j in range(referred_array.shape[1]):
+            value = referred_array[i][j]
+            if is_num_to_str and value is not None:
+                value = utils.from_str_num_to_text(value)
+            cell_value_dict[(range_ref.c1 + j, range_ref.r1 + i)] = value
+    return
+
+def _write(target_ws, cell_value_dict: Dict[Tuple[int, int], object]) -> None:
+    """概要
+    ワークシートに対して、セルごとの値をまとめて書き込む。
+    書き込むセルを長方形の範囲にまとめ、範囲ごとに1回で書き込む。
+
+    Parameters
+    ----------
+    target_ws
+        値を書き込むワークシート。
+
+    cell_value_dict: Dict[Tuple[int, int], object]
+        （列番号、行番号）をkeyに、書き込む値をvalueに持つ辞書型。
+
     Returns
     ----------
     None
     """
-    if sheet_name in settings.NUM_TO_STR_ADDRESS_DICT.keys():
-        if address in settings.NUM_TO_STR_ADDRESS_DICT[sheet_name]:
-            referred_array = np.vectorize(utils.from_str_num_to_text)(referred_array)
-    target_ws.Range(address).Value = referred_array
+    # セル番地のstr型への変換は、ワークシートに書き込む時点でのみ行う
+    cell_list = [CellRef(c, r) for c, r in cell_value_dict.keys()]
+    for range_ref in merge_into_rectangles(cell_list):
+        if range_ref.is_cell:
+            value = cell_value_dict[(range_ref.c1, range_ref.r1)]
+        else:
+            value = tuple(tuple(cell_value_dict[(c, r)] for c in range(range_ref.c1, range_ref.c2 + 1))
+                          for r in range(range_ref.r1, range_ref.r2 + 1))
+        target_ws.Range(range_ref.address).Value = value
     return
 
-def _make_red(sheet_name, target_ws, address: str, referred_array: np.array, 
-              target_array: np.array) -> None:
+def _make_text_red(sheet_name, target_ws, address: str, red_char_num_list: List[Tuple[int]]) -> None:
     """概要
-    ワークシートに対して、指定したアドレスの字を赤字にする。
+    ワークシートに対して、指定したアドレスの文字列のうち差分のある文字を赤字にする。
     
     Parameters
     ----------
@@ -164,22 +309,114 @@ def _make_red(sheet_name, target_ws, address: str, referred_array: np.array,
 
     address: str
         字を赤字にする範囲を示すstr型。
+
+    red_char_num_list: List[Tuple[int]]
+        差分の開始する文字位置（0始まり）と文字数の組を格納したlist型。
         
     Returns
     ----------
     None
     """
-    if sheet_name in settings.CHECK_TEXT_CELL_DICT.keys() \
-        and address in settings.CHECK_TEXT_CELL_DICT[sheet_name]:
-        print(sheet_name.value, address)
-        # 範囲が指定されている場合は先頭のセルのみ対応
-        red_char_num_list = compare_text_value.find_text_diff(
-            target_array[0][0], referred_array[0][0])
-        for red_char_num in red_char_num_list:
-            target_ws.Range(address).GetCharacters(red_char_num[0] + 1, red_char_num[1]
-                                                   ).Font.Color = Color.RED.value
-    else:
-        target_ws.Range(address).Font.Color = Color.RED.value
+    print(sheet_name.value, address)
+    for red_char_num in red_char_num_list:
+        target_ws.Range(address).GetCharacters(red_char_num[0] + 1, red_char_num[1]
+                                               ).Font.Color = Color.RED.value
+    return
+
+def make_red(target_ws, address_list: List[Union[str, RangeRef]]) -> None:
+    """概要
+    ワークシートに対して、指定したすべてのアドレスの字を赤字にする。
+    セルを長方形の範囲にまとめ、複数の範囲をカンマ区切りで指定することで、
+    書式を変更する回数を減らす。
+
+    Parameters
+    ----------
+    target_ws
+        字を赤字にするワークシート。
+
+    address_list: List[Union[str, RangeRef]]
+        字を赤字にするセル番地または範囲を示すstr型、RangeRefを格納したlist型。
+
+    Returns
+    ----------
+    None
+    """
+    range_address_list = utils.from_address_list_to_rectangle_range_address_list(address_list)
+    for joined_address in utils.join_range_address_list(range_address_list):
+        target_ws.Range(joined_address).Font.Color = Color.RED.value
+    return
+
+def add_report(report: DiffReport, sheet_name: KeikakuSheet, target_ws, referred_ws,
+               address_list: List[Union[str, RangeRef]],
+               referred_address_dict: Optional[Dict[str, Optional[str]]] = None,
+               formula: bool = False) -> None:
+    """概要
+    make_redの代わりに、指定したすべてのアドレスに含まれるセルを報告書に記録する。
+    アドレスをすべて含む最小の範囲を、それぞれのワークシートから1回ずつ読み込む。
+    変更前の値は、referred_address_dictに含まれるセルは対応付けたセルの値を、
+    それ以外のセルは参照するワークシートの同じセル番地の値を記録する。
+
+    Parameters
+    ----------
+    report: DiffReport
+        差分を記録する報告書。
+
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    target_ws
+        差分を確認するワークシート。
+
+    referred_ws
+        値を参照するワークシート。
+
+    address_list: List[Union[str, RangeRef]]
+        差分のあるセル番地または範囲を示すstr型、RangeRefを格納したlist型。
+
+    referred_address_dict: Optional[Dict[str, Optional[str]]]
+        address_listのうち、参照するワークシートの異なるセル番地と対応付けたセル番地または範囲をkeyに、
+        対応付けたセル番地（対応するセルがない場合はNone）をvalueに持つdict型
+        （check_info_sheets、check_rsh_sheetsの各関数により作成したもの）。
+        対応するセルがない場合は、変更前の値を空欄とする。Noneの場合はすべて同じセル番地の値を記録する。
+        デフォルトはNone。
+
+    formula: bool
+        値の代わりに数式を記録するか否かを示すbool型。数式を比較するシートに使用する。デフォルトはFalse。
+
+    Returns
+    ----------
+    None
+    """
+    range_list = merge_into_rectangles(address_list)
+    if len(range_list) == 0:
+        return
+    read_range = RangeRef.bounding(range_list)
+    target_value = _read_value(target_ws, read_range.address, formula)
+    referred_value = _read_value(referred_ws, read_range.address, formula)
+    # 異なるセル番地と対応付けたセルは、対応付けたセルをすべて含む最小の範囲を1回で読み込む
+    referred_cell_dict: Dict[CellRef, Optional[CellRef]] = {}
+    for address, referred_address in (referred_address_dict or {}).items():
+        referred_cell = None if referred_address is None else CellRef.from_address(referred_address)
+        for cell in RangeRef.from_address(address):
+            referred_cell_dict[cell] = referred_cell
+    matched_range_list = [cell.to_range() for cell in referred_cell_dict.values() if cell is not None]
+    if len(matched_range_list) > 0:
+        matched_range = RangeRef.bounding(matched_range_list)
+        matched_value = _read_value(referred_ws, matched_range.address, formula)
+    for range_ref in range_list:
+        r1, c1 = range_ref.r1 - read_range.r1, range_ref.c1 - read_range.c1
+        r2, c2 = range_ref.r2 - read_range.r1, range_ref.c2 - read_range.c1
+        referred_block = referred_value[r1:r2 + 1, c1:c2 + 1]
+        if len(referred_cell_dict) > 0:
+            referred_block = referred_block.copy()
+            for cell in range_ref:
+                if cell not in referred_cell_dict:
+                    continue
+                referred_cell = referred_cell_dict[cell]
+                referred_block[cell.row - range_ref.r1, cell.col - range_ref.c1] = None \
+                    if referred_cell is None else matched_value[referred_cell.row - matched_range.r1,
+                                                                referred_cell.col - matched_range.c1]
+        report.add_array(sheet_name, range_ref, target_value[r1:r2 + 1, c1:c2 + 1], referred_block)
     return
 
 def compare_and_change_other_cell_value(target_ws, referred_ws, 
@@ -202,19 +439,71 @@ def compare_and_change_other_cell_value(target_ws, referred_ws,
     ----------
     None
     """
-    target_wk = target_ws.UsedRange
-    target_value = np.array(target_wk.Value)
-    referred_wk = referred_ws.Range(target_wk.Address)
-    referred_value = np.array(referred_wk.Value)
-    referred_cell = utils.get_cell_address_from_range_address(target_wk.Address)
+    write_value(target_ws, find_other_cell_value(target_ws, referred_ws, return_address_dict))
+    return
+
+def find_other_cell_value(target_ws, referred_ws,
+                          return_address_dict: Dict[str, str]) -> Dict[Tuple[int, int], str]:
+    """概要
+    2つのワークシートを比較し、ある範囲において値が異なるか否かに応じて別の範囲に書き込む値のうち、
+    現在の値と異なるものを返す。ワークシートへの書き込みは行わない。
+
+    Parameters
+    ----------
+    target_ws
+        値を更新するワークシート。
+
+    referred_ws
+        値を参照するワークシート。
+
+    return_address_dict: Dict[str, str]
+        差分を比較する番地と、比較した結果に応じて値を更新する範囲の対応を示すDict[str, str]型。
+
+    Returns
+    ----------
+    cell_value_dict: Dict[Tuple[int, int], str]
+        （列番号、行番号）をkeyに、書き込む値（有、無）をvalueに持つ辞書型。
+    """
+    # UsedRange全体ではなく、比較するセル番地と値を更新するセル番地をすべて含む最小の範囲のみを読み込む
+    read_address = utils.from_range_address_list_to_range_address(
+        list(return_address_dict.keys()) + list(return_address_dict.values()))
+    if read_address == '':
+        return {}
+    target_value = _read_value(target_ws, read_address)
+    referred_value = _read_value(referred_ws, read_address)
+    referred_cell = utils.get_cell_address_from_range_address(read_address)
     referred_cell_loc = utils.from_cell_address_to_column_row_int(referred_cell)
 
-    for address in return_address_dict.keys():
-        check_tuple = _is_same(address, referred_cell_loc, target_value, referred_value,
-                               return_address_dict[address])
-        # 書き込み処理をまとめることで少し処理時間を短縮できるが、ここでは手抜き
-        if check_tuple[0] and check_tuple[1][0][0] != ChangeFlag.NOT_CHANGED.value:
-            target_ws.Range(return_address_dict[address]).Value = ChangeFlag.NOT_CHANGED.value
-        elif not check_tuple[0] and check_tuple[1][0][0] != ChangeFlag.CHANGED.value:
-            target_ws.Range(return_address_dict[address]).Value = ChangeFlag.CHANGED.value
-    return
\ No newline at end of file
+    address_list = list(return_address_dict.keys())
+    is_diff_array = _is_diff_array(_diff_mask(target_value, referred_value),
+                                   _relative_loc_array(address_list, referred_cell_loc))
+    return_loc_array = _relative_loc_array(list(return_address_dict.values()), referred_cell_loc)
+    # 値が更新前と異なるセルのみをまとめて書き込む
+    cell_value_dict = {}
+    for i, address in enumerate(address_list):
+        flag = ChangeFlag.CHANGED.value if is_diff_array[i] else ChangeFlag.NOT_CHANGED.value
+        r1, c1, r2, c2 = return_loc_array[i]
+        if target_value[r1][c1] != flag:
+            return_cell_loc = utils.from_range_address_to_column_row_int(
+                return_address_dict[address])[0]
+            cell_value_dict[return_cell_loc] = flag
+    return cell_value_dict
+
+def write_value(target_ws, cell_value_dict: Dict[Tuple[int, int], object]) -> None:
+    """概要
+    ワークシートに対して、find_other_cell_valueなどにより求めたセルごとの値をまとめて書き込む。
+
+    Parameters
+    ----------
+    target_ws
+        値を書き込むワークシート。
+
+    cell_value_dict: Dict[Tuple[int, int], object]
+        （列番号、行番号）をkeyに、書き込む値をvalueに持つ辞書型。
+
+    Returns
+    ----------
+    None
+    """
+    _write(target_ws, cell_value_dict)
+    return
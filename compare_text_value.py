@@ -2,8 +2,56 @@
 2つのテキスト分を比較し、差分の情報を返す。
 """
 import difflib
+import functools
 from typing import List, Tuple
 import MeCab
+import profiling
+
+# 形態素解析の結果を保持する文章の数の上限
+WAKATI_CACHE_SIZE = 4096
+# 共通する先頭・末尾の文字列を取り除く際に、形態素の区切りが変わらないように残す文字数
+TEXT_DIFF_CONTEXT_MARGIN = 16
+
+_tagger = None
+
+def _get_tagger() -> MeCab.Tagger:
+    """概要
+    形態素解析に使用するMeCab.Taggerを返す。
+    辞書の読み込みはプロセスごとに1回のみとし、以降は同じTaggerを使い回す。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    tagger: MeCab.Tagger
+        単語をスペース区切りで出力するMeCab.Tagger。
+    """
+    global _tagger
+    if _tagger is None:
+        # 単語をスペース区切りで出力する
+        _tagger = MeCab.Tagger("-Owakati")
+    return _tagger
+
+@functools.lru_cache(maxsize=WAKATI_CACHE_SIZE)
+def _wakati_tuple(text: str) -> Tuple[str]:
+    """概要
+    Mecabによる形態素解析を行い、テキスト分を単語ごとのtupleにして返す。
+    同じ文章に対する結果は、WAKATI_CACHE_SIZEの件数まで保持して再利用する。
+
+    Parameters
+    ----------
+    text: str
+        形態素を行う文章を示すstr型。
+
+    Returns
+    ----------
+    words: Tuple[str]
+        文章に含まれている単語ごとのTuple[str]型。
+    """
+    with profiling.stage('mecab'):
+        return tuple(_get_tagger().parse(text).strip().split())
 
 def _wakati_list(text: str) -> List[str]:
     """概要
@@ -19,10 +67,38 @@ def _wakati_list(text: str) -> List[str]:
     words: List[str]
         文章に含まれている単語ごとのList[str]型。
     """
-    # 単語をスペース区切りで出力する
-    tagger = MeCab.Tagger("-Owakati")
-    words = tagger.parse(text).strip().split()
-    return words
+    return list(_wakati_tuple(text))
+
+def wakati_cache_info():
+    """概要
+    形態素解析の結果の再利用の状況を返す。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    info
+        hits（再利用した回数）、misses（形態素解析を行った回数）、maxsize（保持する件数の上限）、
+        currsize（保持している件数）を持つnamedtuple。
+    """
+    return _wakati_tuple.cache_info()
+
+def clear_wakati_cache() -> None:
+    """概要
+    保持している形態素解析の結果を破棄する。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    _wakati_tuple.cache_clear()
+    return
 
 def _words_to_char_loc_and_len(words: List[str], start_int: int, end_int: int
                                ) -> Tuple[int]:
@@ -55,6 +131,40 @@ def _words_to_char_loc_and_len(words: List[str], start_int: int, end_int: int
         s_len += len(words[j])
     return (s_loc, s_len)
 
+def _common_prefix_suffix_len(text1: str, text2: str) -> Tuple[int, int]:
+    """概要
+    2つの文章を受け取り、先頭から共通する文字数と、末尾から共通する文字数を返す。
+    末尾から共通する文字数は、先頭から共通する部分と重ならない範囲で数える。
+
+    Parameters
+    ----------
+    text1, text2: str
+        比較する文章を示すstr型。
+
+    Returns
+    ----------
+    t: Tuple[int, int]
+        先頭から共通する文字数、末尾から共通する文字数を格納するTuple[int]型。
+    """
+    n = min(len(text1), len(text2))
+    # 文字列のスライスの比較を二分探索で行い、1文字ずつ比較するループを避ける
+    low, high = 0, n
+    while low < high:
+        mid = (low + high + 1) // 2
+        if text1[:mid] == text2[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix_len = low
+    low, high = 0, n - prefix_len
+    while low < high:
+        mid = (low + high + 1) // 2
+        if text1[len(text1) - mid:] == text2[len(text2) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return prefix_len, low
+
 def find_text_diff(target_text: str, referred_text: str) -> List[Tuple[int]]:
     """概要
     2つの文章を受け取り、差分があった場合に差分の開始する文字位置と差分のある文字数の長さを
@@ -76,6 +186,16 @@ def find_text_diff(target_text: str, referred_text: str) -> List[Tuple[int]]:
         差分の開始する文字位置と各差分の文字数の長さをペアにしたTuple[int]型を作成し、
         各差分をList[Tuple[int]]型に格納したもの。
     """
+    # 共通する先頭・末尾の文字列を取り除き、差分のある部分の前後のみを形態素解析する
+    offset = 0
+    if isinstance(target_text, str) and isinstance(referred_text, str):
+        if target_text == referred_text:
+            return []
+        prefix_len, suffix_len = _common_prefix_suffix_len(target_text, referred_text)
+        offset = max(0, prefix_len - TEXT_DIFF_CONTEXT_MARGIN)
+        suffix_len = max(0, suffix_len - TEXT_DIFF_CONTEXT_MARGIN)
+        target_text = target_text[offset:len(target_text) - suffix_len]
+        referred_text = referred_text[offset:len(referred_text) - suffix_len]
     target_words = _wakati_list(target_text)
     referred_words = _wakati_list(referred_text)
     sm = difflib.SequenceMatcher(None, referred_words, target_words)
@@ -84,5 +204,6 @@ def find_text_diff(target_text: str, referred_text: str) -> List[Tuple[int]]:
         if opcode == 'equal' or opcode == 'delete':
             pass
         elif opcode == 'insert' or opcode == 'replace':
-            diff_char_tuple_list.append(_words_to_char_loc_and_len(target_words, j1, j2))       
+            s_loc, s_len = _words_to_char_loc_and_len(target_words, j1, j2)
+            diff_char_tuple_list.append((s_loc + offset, s_len))
     return diff_char_tuple_list
\ No newline at end of file
@@ -8,10 +8,10 @@ import os
 import re
 import numpy as np
 import pandas as pd
-import win32com.client
 import compare
 import settings
 import utils
+import workbook_backend
 
 def _copy_col_width_row_height(target_ws, referred_ws) -> None:
     """概要
@@ -43,7 +43,7 @@ def _copy_col_width_row_height(target_ws, referred_ws) -> None:
         else:
             is_all_col_nan = False
         if target_ws.Columns(col).ColumnWidth != referred_ws.Columns(col).ColumnWidth:
-            target_ws.Columns(col).ColumnsWidth = referred_ws.Columns(col).ColumnWidth
+            target_ws.Columns(col).ColumnWidth = referred_ws.Columns(col).ColumnWidth
     for row in row_list:
         if is_all_row_nan and pd.isna(target_value[row_list.index(row)]).all():
             continue
@@ -54,7 +54,8 @@ def _copy_col_width_row_height(target_ws, referred_ws) -> None:
     return
 
 def copy_keikaku_value(target_keikaku_path: str, referred_keikaku_path: str,
-                       save_path: str = '', ver: str = '1.3.0', overwrite: bool = False) -> None:
+                       save_path: str = '', ver: str = '1.3.0', overwrite: bool = False,
+                       engine: str = workbook_backend.ENGINE_COM, app=None) -> None:
     """概要
     プロジェクト登録書に記載された内容のうち、シミュレーションに依存しない項目を
     別のプロジェクト登録書に対して書き写す。
@@ -73,16 +74,28 @@ def copy_keikaku_value(target_keikaku_path: str, referred_keikaku_path: str,
     ver: str
         プロジェクト計画書のフォーマットを示すstr型。1.3.0のみを許容。
 
+    engine: str
+        エクセルの操作に使用するバックエンドを示すstr型。comが与えられればExcelを起動して操作し、
+        openpyxlが与えられればExcelを起動せずに操作する。デフォルトはcom。
+
+    app
+        エクセルを操作する起動済みのアプリケーション。与えられた場合はengineによらずに使用し、
+        処理後もアプリケーションを終了しない（excel_pool.ExcelPoolから借りたものを想定）。
+        Noneの場合はengineに応じて起動し、処理後に終了する。デフォルトはNone。
+
     Returns
     ----------
     None
     """
     if ver != '1.3.0':
         raise ValueError('現在プロジェクト登録書のフォーマットは1.3.0のみしか対応していません。')
-    app = win32com.client.Dispatch('Excel.Application')
-    app.Visible = True
-    target_wb = app.Workbooks.Open(os.getcwd() + '/' + target_keikaku_path)
-    referred_wb = app.Workbooks.Open(os.getcwd() + '/' + referred_keikaku_path)
+    is_app_owner = app is None
+    if is_app_owner:
+        app = workbook_backend.dispatch(engine)
+        app.Visible = True
+    target_wb = app.Workbooks.Open(os.path.join(os.getcwd(), target_keikaku_path))
+    # 参照するファイルは値の参照のみを行うため、読み取り専用で開く
+    referred_wb = app.Workbooks.Open(os.path.join(os.getcwd(), referred_keikaku_path), 0, True)
 
     for sheet_name in settings.COPY_CELL_ADDRESS_DICT.keys():
         target_ws = target_wb.Sheets(sheet_name.value)
@@ -105,10 +118,11 @@ def copy_keikaku_value(target_keikaku_path: str, referred_keikaku_path: str,
             dt = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
             save_path = target_keikaku_path[:-L] + '_コピー(参照ファイル：{})_{}'\
                 .format(last_ref_path[:-L], dt) + target_keikaku_path[-L:]
-        target_wb.SaveAs(os.getcwd() + '/' + save_path)
+        target_wb.SaveAs(os.path.join(os.getcwd(), save_path))
     target_wb.Close()
     referred_wb.Close()
-    app.Quit()
+    if is_app_owner:
+        app.Quit()
     app.DisplayAlerts = True
     return
 
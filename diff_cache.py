@@ -0,0 +1,243 @@
+"""
+シートごとの差分の確認の結果をファイルに保存し、同じ内容のシートを再び確認する際に再利用するための
+キャッシュを定義する。
+キーは（差分を確認するシートのハッシュ値、参照するシートのハッシュ値、settingsとモジュールの版）から作成し、
+保存したファイルの合計の大きさが上限を超えた場合は、最後に使用した時点が古いものから削除する。
+"""
+import hashlib
+import os
+import pickle
+from typing import Optional
+from constants import KeikakuSheet
+import user_cache
+
+# キャッシュを使用する
+CACHE_USE = 'use'
+# キャッシュを読み書きしない
+CACHE_BYPASS = 'bypass'
+# 保存済みのキャッシュをすべて削除したうえで使用する
+CACHE_CLEAR = 'clear'
+CACHE_MODE_LIST = [CACHE_USE, CACHE_BYPASS, CACHE_CLEAR]
+
+# 利用者ごとのキャッシュのフォルダ（user_cache.user_cache_dir）の下に保存する
+DEFAULT_CACHE_DIR = user_cache.user_cache_dir('diff_cache')
+# 保存するファイルの合計の大きさの上限（バイト）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 保存する確認の結果の形式を変更した場合は値を更新し、保存済みのキャッシュを無効にする
+_CACHE_FORMAT_VERSION = 1
+_CACHE_FILE_EXT = '.pickle'
+
+_settings_version = None
+
+def settings_version() -> str:
+    """概要
+    settings.pyと、差分の確認に使用するモジュール（このフォルダのすべてのモジュール）の内容、
+    保存する確認の結果の形式から求めたハッシュ値を返す。いずれかが変更、追加、削除された場合は異なる値となる。
+
+    Returns
+    ----------
+    version: str
+        ハッシュ値を示すstr型。
+    """
+    global _settings_version
+    if _settings_version is None:
+        _settings_version = hashlib.sha256('{}\0{}'.format(
+            _CACHE_FORMAT_VERSION, user_cache.code_version()).encode()).hexdigest()
+    return _settings_version
+
+def make_key(sheet_name: KeikakuSheet, target_digest: Optional[str], referred_digest: Optional[str],
+             *option) -> Optional[str]:
+    """概要
+    シートの差分の確認の結果を保存するキーを作成する。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    target_digest, referred_digest: Optional[str]
+        差分を確認するシート、参照するシートのハッシュ値（sheet_digest.sheet_digest_dictの値）。
+
+    option
+        確認の結果に影響するその他の引数（林地情報の対応付けの方法、バックエンドなど）。str型に変換してキーに含める。
+
+    Returns
+    ----------
+    key: Optional[str]
+        キーを示すstr型。いずれかのハッシュ値がNoneの場合は保存しないため、Noneを返す。
+    """
+    if target_digest is None or referred_digest is None:
+        return None
+    key_part_list = [settings_version(), sheet_name.value, target_digest, referred_digest] \
+        + [str(o) for o in option]
+    return hashlib.sha256('\0'.join(key_part_list).encode('utf-8')).hexdigest()
+
+class DiffCache:
+    """概要
+    シートごとの差分の確認の結果を、キーごとに1つのファイルとして保存するキャッシュ。
+
+    Parameters
+    ----------
+    cache_dir: str
+        ファイルを保存するフォルダのパス。デフォルトはDEFAULT_CACHE_DIR。
+
+    max_bytes: int
+        保存するファイルの合計の大きさの上限（バイト）。デフォルトはDEFAULT_MAX_BYTES。
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError('max_bytesには0以上の値を指定してください。')
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _CACHE_FILE_EXT)
+
+    def get(self, key: Optional[str]):
+        """概要
+        キーに対応する確認の結果を返す。保存されていない、または読み込めない場合はNoneを返す。
+
+        Parameters
+        ----------
+        key: Optional[str]
+            make_keyにより作成したキー。Noneの場合はNoneを返す。
+
+        Returns
+        ----------
+        value
+            保存した確認の結果。
+        """
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception:
+            # 保存されていない、または読み込めない場合は確認し直す
+            return None
+        try:
+            # 削除する順序を決めるため、最後に使用した時点を更新する
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: Optional[str], value) -> None:
+        """概要
+        キーに対応する確認の結果を保存し、合計の大きさが上限を超えた場合は古いものから削除する。
+
+        Parameters
+        ----------
+        key: Optional[str]
+            make_keyにより作成したキー。Noneの場合は保存しない。
+
+        value
+            保存する確認の結果。pickleにより保存できるもの。
+
+        Returns
+        ----------
+        None
+        """
+        if key is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 書き込み途中のファイルを読み込まないよう、一時ファイルに書き込んでから置き換える
+            tmp_path = '{}.{}.tmp'.format(self._path(key), os.getpid())
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # 保存できない環境では、保存せずに続ける
+            return
+        self._evict()
+        return
+
+    def _evict(self) -> None:
+        """概要
+        保存したファイルの合計の大きさが上限を超えている場合に、最後に使用した時点が古いものから削除する。
+
+        Returns
+        ----------
+        None
+        """
+        entry_list = []
+        total_bytes = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(_CACHE_FILE_EXT):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entry_list.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+        except OSError:
+            return
+        if total_bytes <= self.max_bytes:
+            return
+        for _, size, path in sorted(entry_list):
+            try:
+                os.remove(path)
+            except OSError:
+                # 他のプロセスが削除した場合など
+                continue
+            total_bytes -= size
+            if total_bytes <= self.max_bytes:
+                break
+        return
+
+    def clear(self) -> None:
+        """概要
+        保存したすべての確認の結果を削除する。
+
+        Returns
+        ----------
+        None
+        """
+        try:
+            name_list = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in name_list:
+            if name.endswith(_CACHE_FILE_EXT):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return
+
+def open_cache(cache_mode: str, cache_dir: str = DEFAULT_CACHE_DIR,
+               max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[DiffCache]:
+    """概要
+    キャッシュの使用方法に応じて、DiffCacheを返す。
+
+    Parameters
+    ----------
+    cache_mode: str
+        useが与えられれば使用し、bypassが与えられれば使用せず、clearが与えられれば
+        保存済みのものをすべて削除したうえで使用する。それ以外の値はValueErrorを返す。
+
+    cache_dir: str
+        ファイルを保存するフォルダのパス。デフォルトはDEFAULT_CACHE_DIR。
+
+    max_bytes: int
+        保存するファイルの合計の大きさの上限（バイト）。デフォルトはDEFAULT_MAX_BYTES。
+
+    Returns
+    ----------
+    cache: Optional[DiffCache]
+        使用するDiffCache。bypassの場合はNone。
+    """
+    if cache_mode not in CACHE_MODE_LIST:
+        raise ValueError('cache_modeにはuse、bypass、clearのいずれかを指定してください。')
+    if cache_mode == CACHE_BYPASS:
+        return None
+    cache = DiffCache(cache_dir, max_bytes)
+    if cache_mode == CACHE_CLEAR:
+        cache.clear()
+    return cache
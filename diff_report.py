@@ -0,0 +1,268 @@
+"""
+差分の赤字表示やファイルの保存を行わずに、検出した差分をセルごとに記録し、
+列ごとに値を格納したファイル（CSV、JSON、Parquet）に書き出すための報告書を定義する。
+Parquetでは、セルごとに型が異なるold_value、new_valueはstr型に揃えて書き出し、
+数値（bool型を除くint型、float型）のセルはold_number、new_numberにfloat64型としても書き出す。
+text_diffは（開始する文字位置、文字数）のlist型のlist型（list<list<int64>>）として書き出す。
+"""
+import csv
+import datetime
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from cell_ref import RangeRef
+from constants import KeikakuSheet
+import address_codec
+
+# 報告書の列名
+SHEET_COLUMN = 'sheet'
+ADDRESS_COLUMN = 'address'
+OLD_VALUE_COLUMN = 'old_value'
+NEW_VALUE_COLUMN = 'new_value'
+TEXT_DIFF_COLUMN = 'text_diff'
+COLUMN_LIST = [SHEET_COLUMN, ADDRESS_COLUMN, OLD_VALUE_COLUMN, NEW_VALUE_COLUMN, TEXT_DIFF_COLUMN]
+# Parquetのみに書き出す、数値のセルの値の列名
+OLD_NUMBER_COLUMN = 'old_number'
+NEW_NUMBER_COLUMN = 'new_number'
+PARQUET_COLUMN_LIST = COLUMN_LIST + [OLD_NUMBER_COLUMN, NEW_NUMBER_COLUMN]
+
+class DiffReport:
+    """概要
+    検出した差分を、1つのセルを1行として列ごとのlist型に記録する報告書。
+    new_valueには差分を確認するファイル（変更後）の値を、old_valueには参照するファイル（変更前）の
+    対応するセルの値を記録する。対応するセルは、情報記入シートは対応付けた林地情報の行の、
+    幹材積量算定シートは同じ樹種＋地位の列のセルとし、その他のシートは同じセル番地のセルとする。
+    対応するセルがない場合（追加された林地情報、樹種＋地位）はNoneとする。
+    吸収量算定シートは数式を比較するため、値の代わりに数式を記録する。text_diffには、文字列の差分を確認するセルについて
+    compare_text_value.find_text_diffが返す（開始する文字位置（0始まり）、文字数）のlist型を記録する。
+    """
+    def __init__(self):
+        self._column_dict: Dict[str, list] = {column: [] for column in COLUMN_LIST}
+
+    def add(self, sheet_name: KeikakuSheet, address: str, old_value, new_value,
+            text_diff: Optional[List[Tuple[int]]] = None) -> None:
+        """概要
+        1つのセルの差分を記録する。
+
+        Parameters
+        ----------
+        sheet_name: KeikakuSheet
+            ワークシートのシート名を示すKeikakuSheet型。
+
+        address: str
+            セル番地を示すstr型。
+
+        old_value
+            参照するファイルのセルの値。
+
+        new_value
+            差分を確認するファイルのセルの値。
+
+        text_diff: Optional[List[Tuple[int]]]
+            文字列の差分の（開始する文字位置、文字数）を格納したlist型。
+            文字列の差分を確認しないセルはNone。デフォルトはNone。
+
+        Returns
+        ----------
+        None
+        """
+        self._column_dict[SHEET_COLUMN].append(sheet_name.value)
+        self._column_dict[ADDRESS_COLUMN].append(address)
+        self._column_dict[OLD_VALUE_COLUMN].append(old_value)
+        self._column_dict[NEW_VALUE_COLUMN].append(new_value)
+        self._column_dict[TEXT_DIFF_COLUMN].append(
+            None if text_diff is None else [list(span) for span in text_diff])
+        return
+
+    def add_array(self, sheet_name: KeikakuSheet, range_ref: RangeRef, target_array: np.array,
+                  referred_array: np.array, diff_mask: Optional[np.array] = None,
+                  text_diff: Optional[List[Tuple[int]]] = None) -> None:
+        """概要
+        1つの範囲に含まれるセルの差分を、行、列の順に記録する。
+
+        Parameters
+        ----------
+        sheet_name: KeikakuSheet
+            ワークシートのシート名を示すKeikakuSheet型。
+
+        range_ref: RangeRef
+            記録する範囲。
+
+        target_array, referred_array: np.array
+            差分を確認するファイル、参照するファイルの範囲の値を格納した2次元のnp.array型。
+
+        diff_mask: Optional[np.array]
+            記録するセルをTrueとする2次元のbool型のnp.array型。Noneの場合はすべてのセルを記録する。
+            デフォルトはNone。
+
+        text_diff: Optional[List[Tuple[int]]]
+            範囲の左上のセルの文字列の差分。デフォルトはNone。
+
+        Returns
+        ----------
+        None
+        """
+        if diff_mask is None:
+            diff_mask = np.ones(target_array.shape, dtype=bool)
+        for i, j in zip(*np.nonzero(diff_mask)):
+            self.add(sheet_name, address_codec.format_cell(range_ref.c1 + int(j), range_ref.r1 + int(i)),
+                     referred_array[i, j], target_array[i, j],
+                     text_diff if (i, j) == (0, 0) else None)
+        return
+
+    def extend(self, other: 'DiffReport') -> None:
+        """概要
+        別の報告書に記録した差分を、この報告書の末尾に追加する。
+
+        Parameters
+        ----------
+        other: DiffReport
+            追加する差分を記録した報告書。
+
+        Returns
+        ----------
+        None
+        """
+        for column in COLUMN_LIST:
+            self._column_dict[column].extend(other._column_dict[column])
+        return
+
+    def __len__(self) -> int:
+        return len(self._column_dict[SHEET_COLUMN])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """概要
+        記録した差分をpd.DataFrame型にして返す。
+
+        Returns
+        ----------
+        df: pd.DataFrame
+            COLUMN_LISTの列を持つpd.DataFrame型。
+        """
+        return pd.DataFrame({column: pd.Series(value_list, dtype=object)
+                             for column, value_list in self._column_dict.items()},
+                            columns=COLUMN_LIST)
+
+    def write(self, report_path: str) -> None:
+        """概要
+        記録した差分をファイルに書き出す。拡張子に応じて形式を選ぶ。
+        Parquetの書き出しには、pyarrowが必要。
+
+        Parameters
+        ----------
+        report_path: str
+            拡張子が.csv、.json、.parquetのファイルパス。それ以外の拡張子はValueErrorを返す。
+
+        Returns
+        ----------
+        None
+        """
+        ext = os.path.splitext(report_path)[1].lower()
+        if ext == '.csv':
+            self._write_csv(report_path)
+        elif ext == '.json':
+            self._write_json(report_path)
+        elif ext == '.parquet':
+            self._write_parquet(report_path)
+        else:
+            raise ValueError('報告書には.csv、.json、.parquetのいずれかのファイルを指定してください。')
+        return
+
+    def _write_csv(self, report_path: str) -> None:
+        with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMN_LIST)
+            writer.writerows(zip(self._column_dict[SHEET_COLUMN],
+                                 self._column_dict[ADDRESS_COLUMN],
+                                 map(_to_text, self._column_dict[OLD_VALUE_COLUMN]),
+                                 map(_to_text, self._column_dict[NEW_VALUE_COLUMN]),
+                                 map(_text_diff_to_text, self._column_dict[TEXT_DIFF_COLUMN])))
+        return
+
+    def _write_json(self, report_path: str) -> None:
+        record_list = [dict(zip(COLUMN_LIST, row)) for row in zip(
+            *(self._column_dict[column] for column in COLUMN_LIST))]
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(record_list, f, ensure_ascii=False, default=_to_text)
+        return
+
+    def _write_parquet(self, report_path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        old_value_list = self._column_dict[OLD_VALUE_COLUMN]
+        new_value_list = self._column_dict[NEW_VALUE_COLUMN]
+        # 値の型がセルごとに異なるため、値はstr型に揃え、数値は別の列にも型を保って書き出す
+        table = pa.table({
+            SHEET_COLUMN: pa.array(self._column_dict[SHEET_COLUMN], type=pa.string()),
+            ADDRESS_COLUMN: pa.array(self._column_dict[ADDRESS_COLUMN], type=pa.string()),
+            OLD_VALUE_COLUMN: pa.array([None if v is None else _to_text(v) for v in old_value_list],
+                                       type=pa.string()),
+            NEW_VALUE_COLUMN: pa.array([None if v is None else _to_text(v) for v in new_value_list],
+                                       type=pa.string()),
+            TEXT_DIFF_COLUMN: pa.array(self._column_dict[TEXT_DIFF_COLUMN],
+                                       type=pa.list_(pa.list_(pa.int64()))),
+            OLD_NUMBER_COLUMN: pa.array([_to_number(v) for v in old_value_list], type=pa.float64()),
+            NEW_NUMBER_COLUMN: pa.array([_to_number(v) for v in new_value_list], type=pa.float64()),
+        })
+        pq.write_table(table, report_path)
+        return
+
+def _to_text(value) -> str:
+    """概要
+    セルの値を報告書に書き出すstr型に変換する。Noneは''とする。
+
+    Parameters
+    ----------
+    value
+        セルの値。
+
+    Returns
+    ----------
+    text: str
+        値を示すstr型。
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    return str(value)
+
+def _to_number(value) -> Optional[float]:
+    """概要
+    数値のセルの値をfloat型に変換する。数値以外（bool型、str型、日付など）とNoneはNoneとする。
+
+    Parameters
+    ----------
+    value
+        セルの値。
+
+    Returns
+    ----------
+    number: Optional[float]
+        値を示すfloat型。
+    """
+    if isinstance(value, (bool, np.bool_)) or not isinstance(value, (int, float, np.number)):
+        return None
+    return float(value)
+
+def _text_diff_to_text(text_diff: Optional[List[List[int]]]) -> str:
+    """概要
+    文字列の差分をJSON形式のstr型に変換する。Noneは''とする。
+
+    Parameters
+    ----------
+    text_diff: Optional[List[List[int]]]
+        文字列の差分の（開始する文字位置、文字数）を格納したlist型。
+
+    Returns
+    ----------
+    text: str
+        JSON形式のstr型。
+    """
+    if text_diff is None:
+        return ''
+    return json.dumps(text_diff)
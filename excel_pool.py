@@ -0,0 +1,212 @@
+"""
+起動済みのエクセルのアプリケーションを保持し、複数の処理で使い回すためのプールを定義する。
+Excelの起動を処理ごとに行わず、一定の回数または失敗した時点でのみ起動し直す。
+"""
+import contextlib
+import functools
+import queue
+import threading
+from typing import Callable, Dict, Optional
+import workbook_backend
+
+class ExcelPool:
+    """概要
+    起動済みのエクセルのアプリケーションを保持し、処理ごとに貸し出すプール。
+    貸し出したアプリケーションは返却時に開いているワークブックを閉じ、DisplayAlertsを元に戻す。
+    max_jobs回使用したアプリケーション、または処理が失敗したアプリケーションは終了させ、
+    次に必要になった時点で新たに起動する。
+
+    Parameters
+    ----------
+    size: int
+        同時に貸し出すことのできるアプリケーションの数を示すint型。デフォルトは1。
+
+    engine: str
+        使用するバックエンドを示すstr型。workbook_backend.dispatchに渡す。デフォルトはcom。
+
+    max_jobs: int
+        1つのアプリケーションを使用する処理の回数の上限を示すint型。デフォルトは50。
+
+    dispatch_func: Optional[Callable]
+        アプリケーションを起動して返す引数なしの関数。Noneの場合は、engineに応じて
+        workbook_backend.dispatchにより新たなアプリケーションを起動する。
+        COMを使用できない環境で、COMを模したオブジェクトに置き換える場合に指定する。
+        デフォルトはNone。
+    """
+    def __init__(self, size: int = 1, engine: str = workbook_backend.ENGINE_COM,
+                 max_jobs: int = 50, dispatch_func: Optional[Callable] = None):
+        if size < 1:
+            raise ValueError('sizeには1以上の値を指定してください。')
+        if max_jobs < 1:
+            raise ValueError('max_jobsには1以上の値を指定してください。')
+        if dispatch_func is None:
+            dispatch_func = functools.partial(workbook_backend.dispatch, engine, new_instance=True)
+        self.size = size
+        self.max_jobs = max_jobs
+        self._dispatch_func = dispatch_func
+        # 貸し出していないアプリケーション（Noneは未起動の枠を示す）
+        self._idle_queue = queue.LifoQueue()
+        for _ in range(size):
+            self._idle_queue.put(None)
+        # 起動済みのアプリケーションごとの使用回数
+        self._job_count_dict: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.started_num = 0
+        self.quit_num = 0
+
+    def acquire(self, timeout: Optional[float] = None):
+        """概要
+        アプリケーションを1つ借りる。すべて貸し出し中の場合は返却されるまで待つ。
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            待機する秒数の上限。Noneの場合は返却されるまで待つ。デフォルトはNone。
+
+        Returns
+        ----------
+        app
+            Excel.ApplicationまたはOpenpyxlApplication。
+        """
+        if self._closed:
+            raise ValueError('終了したExcelPoolは使用できません。')
+        app = self._idle_queue.get(timeout=timeout)
+        if app is None:
+            try:
+                app = self._dispatch_func()
+            except Exception:
+                self._idle_queue.put(None)
+                raise
+            with self._lock:
+                self._job_count_dict[id(app)] = 0
+                self.started_num += 1
+        return app
+
+    def release(self, app, failed: bool = False) -> None:
+        """概要
+        借りたアプリケーションを返却する。開いているワークブックを保存せずに閉じ、
+        DisplayAlertsを元に戻す。上限の回数に達した場合、処理が失敗した場合、
+        または状態を戻せなかった場合はアプリケーションを終了させる。
+
+        Parameters
+        ----------
+        app
+            acquireにより借りたアプリケーション。
+
+        failed: bool
+            アプリケーションを使用した処理が失敗したか否かを示すbool型。デフォルトはFalse。
+
+        Returns
+        ----------
+        None
+        """
+        with self._lock:
+            self._job_count_dict[id(app)] += 1
+            is_recycled = failed or self._job_count_dict[id(app)] >= self.max_jobs
+        if not is_recycled:
+            try:
+                _reset(app)
+            except Exception:
+                is_recycled = True
+        if is_recycled or self._closed:
+            self._quit(app)
+            self._idle_queue.put(None)
+        else:
+            self._idle_queue.put(app)
+        return
+
+    @contextlib.contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """概要
+        アプリケーションを借り、withブロックを抜けた時点で返却する。
+        ブロック内で例外が発生した場合は、アプリケーションを終了させたうえで例外を送出する。
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            acquireに渡す待機する秒数の上限。デフォルトはNone。
+
+        Returns
+        ----------
+        app
+            Excel.ApplicationまたはOpenpyxlApplication。
+        """
+        app = self.acquire(timeout)
+        try:
+            yield app
+        except BaseException:
+            self.release(app, failed=True)
+            raise
+        self.release(app)
+
+    def close(self) -> None:
+        """概要
+        貸し出していないすべてのアプリケーションを終了させる。
+        貸し出し中のアプリケーションは返却された時点で終了させる。
+
+        Returns
+        ----------
+        None
+        """
+        self._closed = True
+        app_list = []
+        while True:
+            try:
+                app_list.append(self._idle_queue.get_nowait())
+            except queue.Empty:
+                break
+        for app in app_list:
+            if app is not None:
+                self._quit(app)
+        return
+
+    def _quit(self, app) -> None:
+        """概要
+        アプリケーションを終了させ、使用回数の記録を削除する。
+
+        Parameters
+        ----------
+        app
+            終了させるアプリケーション。
+
+        Returns
+        ----------
+        None
+        """
+        with self._lock:
+            self._job_count_dict.pop(id(app), None)
+            self.quit_num += 1
+        try:
+            app.DisplayAlerts = False
+            app.Quit()
+        except Exception:
+            # 応答しなくなったアプリケーションは終了できない場合がある
+            pass
+        return
+
+    def __enter__(self) -> 'ExcelPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        return
+
+def _reset(app) -> None:
+    """概要
+    アプリケーションで開いているワークブックを保存せずにすべて閉じ、DisplayAlertsを元に戻す。
+
+    Parameters
+    ----------
+    app
+        状態を戻すアプリケーション。
+
+    Returns
+    ----------
+    None
+    """
+    app.DisplayAlerts = False
+    for _ in range(app.Workbooks.Count):
+        app.Workbooks(1).Close(False)
+    app.DisplayAlerts = True
+    return
@@ -0,0 +1,155 @@
+"""
+同じ林地名を持つ林地情報同士の乖離度を格納した行列を受け取り、
+変更前後の林地情報を対応付ける関数を定義する。
+"""
+from typing import List, Tuple
+import numpy as np
+try:
+    # scipyが利用できる場合は、C言語で実装された割当問題の解法を使用する
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+# 乖離度が最も小さい組み合わせから順に対応付ける（従来の方法）
+MATCH_GREEDY = 'greedy'
+# 対応付けた組み合わせの乖離度の合計が最小になるように対応付ける
+MATCH_OPTIMAL = 'optimal'
+
+def match(score_matrix: np.array, method: str = MATCH_GREEDY) -> List[Tuple[int, int]]:
+    """概要
+    林地情報同士の乖離度を格納した行列を受け取り、対応付けた林地情報の位置の組み合わせを返す。
+
+    Parameters
+    ----------
+    score_matrix: np.array
+        行に差分を赤字にするワークシートの林地情報、列に参照されるワークシートの林地情報をとり、
+        両者の乖離度を格納した2次元のnp.array型。
+
+    method: str
+        対応付けの方法を示すstr型。greedyが与えられれば乖離度が最も小さい組み合わせから順に、
+        optimalが与えられれば乖離度の合計が最小になるように対応付ける。
+        それ以外の値はValueErrorを返す。デフォルトはgreedy。
+
+    Returns
+    ----------
+    pair_list: List[Tuple[int, int]]
+        対応付けた（行の位置、列の位置）を格納したList[Tuple[int, int]]型。
+    """
+    if method == MATCH_GREEDY:
+        return _match_greedy(score_matrix)
+    elif method == MATCH_OPTIMAL:
+        return _match_optimal(score_matrix)
+    else:
+        raise ValueError('methodにはgreedyまたはoptimalを指定してください。')
+
+def _match_greedy(score_matrix: np.array) -> List[Tuple[int, int]]:
+    """概要
+    乖離度が最も小さい組み合わせから順に対応付ける。乖離度が等しい組み合わせが複数ある場合は、
+    行の位置、列の位置が小さいものを優先する。
+    すべての組み合わせを一度だけ並べ替え、未使用の行と列の組み合わせを先頭から採用する。
+
+    Parameters
+    ----------
+    score_matrix: np.array
+        林地情報同士の乖離度を格納した2次元のnp.array型。
+
+    Returns
+    ----------
+    pair_list: List[Tuple[int, int]]
+        対応付けた順に（行の位置、列の位置）を格納したList[Tuple[int, int]]型。
+    """
+    n, m = score_matrix.shape
+    pair_list = []
+    if n == 0 or m == 0:
+        return pair_list
+    t_pos_array, r_pos_array = np.divmod(np.arange(n * m), m)
+    order = np.lexsort((r_pos_array, t_pos_array, score_matrix.ravel()))
+    is_t_used = np.zeros(n, dtype=bool)
+    is_r_used = np.zeros(m, dtype=bool)
+    max_pair_num = min(n, m)
+    for k in order:
+        t_pos = t_pos_array[k]
+        r_pos = r_pos_array[k]
+        if is_t_used[t_pos] or is_r_used[r_pos]:
+            continue
+        is_t_used[t_pos] = True
+        is_r_used[r_pos] = True
+        pair_list.append((int(t_pos), int(r_pos)))
+        if len(pair_list) == max_pair_num:
+            break
+    return pair_list
+
+def _match_optimal(score_matrix: np.array) -> List[Tuple[int, int]]:
+    """概要
+    対応付けた組み合わせの乖離度の合計が最小になるように対応付ける（ハンガリアン法）。
+    scipyが利用できない場合は、np.array型の演算による実装を使用する。
+
+    Parameters
+    ----------
+    score_matrix: np.array
+        林地情報同士の乖離度を格納した2次元のnp.array型。
+
+    Returns
+    ----------
+    pair_list: List[Tuple[int, int]]
+        行の位置の順に（行の位置、列の位置）を格納したList[Tuple[int, int]]型。
+    """
+    n, m = score_matrix.shape
+    if n == 0 or m == 0:
+        return []
+    if linear_sum_assignment is not None:
+        t_pos_array, r_pos_array = linear_sum_assignment(score_matrix)
+        return [(int(t_pos), int(r_pos)) for t_pos, r_pos in zip(t_pos_array, r_pos_array)]
+    # 行の数が列の数以下となるように向きを揃える
+    if n > m:
+        return sorted((t_pos, r_pos) for r_pos, t_pos in _hungarian(score_matrix.T))
+    return _hungarian(score_matrix)
+
+def _hungarian(cost_matrix: np.array) -> List[Tuple[int, int]]:
+    """概要
+    行の数が列の数以下の行列に対して、ハンガリアン法によりすべての行を列に割り当てる。
+    内側のループはnp.array型の演算で行う。
+
+    Parameters
+    ----------
+    cost_matrix: np.array
+        行の数が列の数以下の2次元のnp.array型。
+
+    Returns
+    ----------
+    pair_list: List[Tuple[int, int]]
+        行の位置の順に（行の位置、列の位置）を格納したList[Tuple[int, int]]型。
+    """
+    n, m = cost_matrix.shape
+    cost = cost_matrix.astype(np.float64)
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    # p[j]: 列jに割り当てられた行（1始まり、0は未割り当て）
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        min_v = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            is_update = ~used[1:] & (cur < min_v[1:])
+            min_v[1:][is_update] = cur[is_update]
+            way[1:][is_update] = j0
+            free_min_v = np.where(used[1:], np.inf, min_v[1:])
+            j1 = int(np.argmin(free_min_v)) + 1
+            delta = free_min_v[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            min_v[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return sorted((int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j] != 0)
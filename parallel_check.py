@@ -0,0 +1,256 @@
+"""
+読み込んだシートの値（sheet_values.SheetValues）に対する差分の確認を、シートごとに複数のプロセスで
+並行して行う関数を定義する。
+値の配列のうち数値（int型、float型）と空白のセルは、float64型の値とセルの種類を示す配列として
+共有メモリを介して渡し、pickleするのは文字列などのその他のセルの重複を除いた値のみとする。
+結果は与えたシートの順に返すため、プロセスの数や処理の完了順によらず同じ結果となる。
+計測（profiling）を行う場合は、各プロセスで記録した内容を与えたシートの順に呼び出し元で合算する。
+"""
+import concurrent.futures
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from constants import KeikakuSheet
+import profiling
+from sheet_values import SheetValues
+
+# 共有メモリに格納するセルの種類
+_KIND_EMPTY = 0
+_KIND_FLOAT = 1
+_KIND_INT = 2
+# pickleして渡すセル（文字列、bool型、日付など）
+_KIND_OBJECT = 3
+_KIND_DICT = {type(None): _KIND_EMPTY, float: _KIND_FLOAT, int: _KIND_INT}
+# float64型で誤差なく表せる整数の範囲
+_MAX_EXACT_INT = 2 ** 53
+
+# 共有メモリの名前、配列の形、pickleして渡すセルの値を重複なく格納したlist型
+PackedArray = Tuple[str, Tuple[int, int], list]
+
+def _split(array: np.ndarray) -> Tuple[np.ndarray, np.ndarray, list]:
+    """概要
+    値の配列を、数値を格納したfloat64型の配列、セルの種類を示す配列と、
+    数値、空白以外のセルの値の重複のないlist型に分ける。
+    その他のセルには、float64型の配列にlist型における位置を格納する。
+
+    Parameters
+    ----------
+    array: np.ndarray
+        値を格納した2次元のnp.ndarray型（dtype=object）。
+
+    Returns
+    ----------
+    t: Tuple[np.ndarray, np.ndarray, list]
+        数値を格納した1次元のfloat64型の配列、セルの種類を格納した1次元のuint8型の配列と、
+        その他のセルの値を重複なく格納したlist型。
+    """
+    flat_array = array.ravel()
+    flat_value_list = flat_array.tolist()
+    kind_array = np.array([_KIND_DICT.get(value.__class__, _KIND_OBJECT) for value in flat_value_list],
+                          dtype=np.uint8)
+    # float64型で誤差なく表せない整数は、その他のセルとして渡す
+    int_pos_array = np.flatnonzero(kind_array == _KIND_INT)
+    if len(int_pos_array) > 0:
+        int_array = flat_array[int_pos_array]
+        is_exact_array = ((int_array <= _MAX_EXACT_INT) & (int_array >= -_MAX_EXACT_INT)).astype(bool)
+        kind_array[int_pos_array[~is_exact_array]] = _KIND_OBJECT
+    number_array = np.zeros(len(flat_value_list), dtype=np.float64)
+    is_number_array = (kind_array == _KIND_FLOAT) | (kind_array == _KIND_INT)
+    number_array[is_number_array] = flat_array[is_number_array].astype(np.float64)
+    object_pos_array = np.flatnonzero(kind_array == _KIND_OBJECT)
+    # 1とTrueなど等しいとみなされる値を区別するため、型と値の組で重複を除く
+    object_index_dict = {}
+    object_list = []
+    for pos in object_pos_array.tolist():
+        value = flat_value_list[pos]
+        key = (value.__class__, value)
+        index = object_index_dict.get(key)
+        if index is None:
+            index = object_index_dict[key] = len(object_list)
+            object_list.append(value)
+        number_array[pos] = index
+    return number_array, kind_array, object_list
+
+def _join(number_array: np.ndarray, kind_array: np.ndarray, object_list: list,
+          shape: Tuple[int, int]) -> np.ndarray:
+    """概要
+    _splitにより分けた配列とその他のセルの値から、値の配列を復元する。
+    数値はint型、float型のいずれも元の型に戻す。
+
+    Parameters
+    ----------
+    number_array, kind_array: np.ndarray
+        _splitにより分けた数値の配列、セルの種類の配列。
+
+    object_list: list
+        その他のセルの値を重複なく格納したlist型。
+
+    shape: Tuple[int, int]
+        値の配列の形。
+
+    Returns
+    ----------
+    array: np.ndarray
+        値を格納した2次元のnp.ndarray型（dtype=object）。
+    """
+    flat_array = np.empty(len(kind_array), dtype=object)
+    is_float_array = kind_array == _KIND_FLOAT
+    flat_array[is_float_array] = number_array[is_float_array]
+    is_int_array = kind_array == _KIND_INT
+    flat_array[is_int_array] = number_array[is_int_array].astype(np.int64)
+    is_object_array = kind_array == _KIND_OBJECT
+    if is_object_array.any():
+        object_array = np.empty(len(object_list), dtype=object)
+        object_array[:] = object_list
+        flat_array[is_object_array] = object_array[number_array[is_object_array].astype(np.int64)]
+    return flat_array.reshape(shape)
+
+class _SharedArrayStore:
+    """概要
+    値の配列の数値とセルの種類を共有メモリに格納し、処理の終了時にまとめて解放する。
+    """
+    def __init__(self):
+        self._shm_list: List[shared_memory.SharedMemory] = []
+
+    def put(self, array: Optional[np.ndarray]) -> Optional[PackedArray]:
+        """概要
+        値の配列の数値とセルの種類を共有メモリに格納し、別のプロセスで復元するための情報を返す。
+
+        Parameters
+        ----------
+        array: Optional[np.ndarray]
+            値を格納した2次元のnp.ndarray型。Noneの場合は格納しない。
+
+        Returns
+        ----------
+        packed: Optional[PackedArray]
+            共有メモリの名前、配列の形、その他のセルの値の組。arrayがNoneの場合はNone。
+        """
+        if array is None:
+            return None
+        number_array, kind_array, object_list = _split(array)
+        size = number_array.size
+        # 先頭にfloat64型の数値を、続けてuint8型のセルの種類を格納する
+        shm = shared_memory.SharedMemory(create=True, size=max(number_array.nbytes + kind_array.nbytes, 1))
+        self._shm_list.append(shm)
+        np.ndarray(size, dtype=np.float64, buffer=shm.buf)[:] = number_array
+        np.ndarray(size, dtype=np.uint8, buffer=shm.buf, offset=number_array.nbytes)[:] = kind_array
+        return (shm.name, array.shape, object_list)
+
+    def put_sheet_values(self, sheet_values: SheetValues) -> Tuple:
+        return (sheet_values.used_address, sheet_values.value_address, self.put(sheet_values.value),
+                self.put(sheet_values.formula))
+
+    def close(self) -> None:
+        for shm in self._shm_list:
+            shm.close()
+            shm.unlink()
+        self._shm_list = []
+        return
+
+def _load(packed: Optional[PackedArray]) -> Optional[np.ndarray]:
+    """概要
+    共有メモリに格納した数値とセルの種類を読み込み、値の配列に復元する。
+
+    Parameters
+    ----------
+    packed: Optional[PackedArray]
+        _SharedArrayStore.putの返り値。
+
+    Returns
+    ----------
+    array: Optional[np.ndarray]
+        値を格納した2次元のnp.ndarray型。packedがNoneの場合はNone。
+    """
+    if packed is None:
+        return None
+    name, shape, object_list = packed
+    size = shape[0] * shape[1]
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        number_array = np.ndarray(size, dtype=np.float64, buffer=shm.buf)
+        kind_array = np.ndarray(size, dtype=np.uint8, buffer=shm.buf, offset=number_array.nbytes)
+        array = _join(number_array, kind_array, object_list, shape)
+        del number_array, kind_array
+    finally:
+        shm.close()
+    return array
+
+def _load_sheet_values(packed_sheet_values: Tuple) -> SheetValues:
+    used_address, value_address, packed_value, packed_formula = packed_sheet_values
+    return SheetValues(used_address, _load(packed_value), _load(packed_formula), value_address)
+
+def _run_task(check_func: Callable, sheet_name: KeikakuSheet, packed_target: Tuple,
+              packed_referred: Tuple, args: tuple, is_profiled: bool = False) -> Tuple[object, Optional[Dict]]:
+    """概要
+    別のプロセスで、共有メモリから復元したシートの値に対して差分を確認する。
+    is_profiledがTrueの場合は、このプロセスのProfilerで計測し、記録した内容を結果とともに返す。
+
+    Returns
+    ----------
+    t: Tuple[object, Optional[Dict]]
+        check_funcの返り値と、Profiler.exportの返り値の組。計測しない場合、後者はNone。
+    """
+    if not is_profiled:
+        return (check_func(sheet_name, _load_sheet_values(packed_target),
+                           _load_sheet_values(packed_referred), *args), None)
+    profiling.start()
+    try:
+        with profiling.sheet(sheet_name.value):
+            with profiling.stage('parallel_check.load'):
+                target_values = _load_sheet_values(packed_target)
+                referred_values = _load_sheet_values(packed_referred)
+        result = check_func(sheet_name, target_values, referred_values, *args)
+    finally:
+        profiler = profiling.stop()
+    return (result, profiler.export())
+
+def check_sheets(check_func: Callable, task_list: List[Tuple[KeikakuSheet, SheetValues, SheetValues]],
+                 args: tuple = (), max_workers: int = 1) -> list:
+    """概要
+    シートごとに読み込んだ値に対して、差分の確認を複数のプロセスで並行して行う。
+
+    Parameters
+    ----------
+    check_func: Callable
+        check_func(sheet_name, target_values, referred_values, *args)として呼び出す関数。
+        別のプロセスから呼び出せるよう、モジュールの最上位で定義したものとし、返り値はpickleできるものとする。
+
+    task_list: List[Tuple[KeikakuSheet, SheetValues, SheetValues]]
+        シート名と、差分を確認するシート、参照するシートの値の組を格納したlist型。
+
+    args: tuple
+        check_funcに与えるその他の引数。デフォルトは()。
+
+    max_workers: int
+        並行して処理を行うプロセスの数。1以下の場合、またはシートが1つ以下の場合は、
+        このプロセスで順に処理する。デフォルトは1。
+
+    Returns
+    ----------
+    result_list: list
+        task_listと同じ順にcheck_funcの返り値を格納したlist型。
+    """
+    if max_workers <= 1 or len(task_list) <= 1:
+        return [check_func(sheet_name, target_values, referred_values, *args)
+                for sheet_name, target_values, referred_values in task_list]
+    store = _SharedArrayStore()
+    try:
+        with profiling.stage('parallel_check.put'):
+            packed_task_list = [(sheet_name, store.put_sheet_values(target_values),
+                                 store.put_sheet_values(referred_values))
+                                for sheet_name, target_values, referred_values in task_list]
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(max_workers, len(task_list))) as executor:
+            future_list = [executor.submit(_run_task, check_func, sheet_name, packed_target,
+                                           packed_referred, args, profiling.is_enabled())
+                           for sheet_name, packed_target, packed_referred in packed_task_list]
+            # 完了した順ではなく、与えたシートの順に結果と各プロセスでの計測の記録を受け取る
+            result_list = []
+            for future in future_list:
+                result, profile_state = future.result()
+                profiling.merge(profile_state)
+                result_list.append(result)
+            return result_list
+    finally:
+        store.close()
@@ -0,0 +1,438 @@
+"""
+差分の赤字表示の処理時間の内訳を計測するための計測器を定義する。
+段階ごと、シートごとの処理時間、エクセルの読み込み、書き込み、文字単位の書式変更の回数、
+比較、赤字表示したセル番地の数、キャッシュの使用状況を記録し、処理の終了時にJSON形式で書き出す。
+計測は引数または環境変数FCS_PROFILEで指定した場合のみ行い、指定しない場合は各関数は何もしない。
+別のプロセスで記録した内容は、exportにより取り出して呼び出し元のプロセスでmergeにより合算する。
+"""
+import contextlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# 計測結果の書き出し先を指定する環境変数
+PROFILE_ENV_NAME = 'FCS_PROFILE'
+# 計測結果を書き出さずに表示することを示す書き出し先
+PROFILE_STDOUT = '-'
+
+# エクセルの操作の段階名
+BACKEND_READ = 'backend.read'
+BACKEND_WRITE = 'backend.write'
+BACKEND_FONT_COLOR = 'backend.font_color'
+BACKEND_CHAR_FORMAT = 'backend.char_format'
+# 値の読み込みとみなす属性
+_READ_ATTR_SET = frozenset(['Value', 'value', 'Formula', 'Address'])
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+class Profiler:
+    """概要
+    段階ごとの回数と処理時間、件数を記録する。段階は入れ子にでき、処理時間は内側の段階を含む。
+    シートの処理中（sheetの範囲内）に記録したものは、シートごとにも記録する。
+    """
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.stage_dict: Dict[str, List[float]] = {}
+        self.counter_dict: Dict[str, int] = {}
+        self.sheet_dict: Dict[str, Dict] = {}
+        self.info_dict: Dict[str, object] = {}
+        self._sheet_entry: Optional[Dict] = None
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """概要
+        段階の回数を1増やし、処理時間を加える。
+
+        Parameters
+        ----------
+        name: str
+            段階名。
+
+        seconds: float
+            処理時間（秒）。
+
+        Returns
+        ----------
+        None
+        """
+        for stage_dict in (self.stage_dict, None if self._sheet_entry is None
+                           else self._sheet_entry['stages']):
+            if stage_dict is None:
+                continue
+            entry = stage_dict.get(name)
+            if entry is None:
+                stage_dict[name] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+        return
+
+    def count(self, name: str, num: int = 1) -> None:
+        """概要
+        件数を加える。
+
+        Parameters
+        ----------
+        name: str
+            件数の名前。
+
+        num: int
+            加える件数。デフォルトは1。
+
+        Returns
+        ----------
+        None
+        """
+        self.counter_dict[name] = self.counter_dict.get(name, 0) + num
+        if self._sheet_entry is not None:
+            counter_dict = self._sheet_entry['counters']
+            counter_dict[name] = counter_dict.get(name, 0) + num
+        return
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def sheet(self, sheet_name: str):
+        entry = self.sheet_dict.setdefault(sheet_name, {'seconds': 0.0, 'stages': {}, 'counters': {}})
+        outer_entry = self._sheet_entry
+        self._sheet_entry = entry
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['seconds'] += time.perf_counter() - start
+            self._sheet_entry = outer_entry
+
+    def export(self) -> Dict:
+        """概要
+        別のプロセスで記録した内容を呼び出し元のプロセスで合算するため、pickleできるdict型にして返す。
+
+        Returns
+        ----------
+        state: Dict
+            stages、counters、sheetsをkeyに持つdict型。
+        """
+        return {'stages': self.stage_dict, 'counters': self.counter_dict, 'sheets': self.sheet_dict}
+
+    def merge(self, state: Dict) -> None:
+        """概要
+        exportにより取り出した別のProfilerの記録を合算する。
+        別のプロセスの処理時間を加えるため、段階の処理時間の合計は経過時間を超えることがある。
+
+        Parameters
+        ----------
+        state: Dict
+            exportの返り値。
+
+        Returns
+        ----------
+        None
+        """
+        _merge_stage_dict(self.stage_dict, state['stages'])
+        _merge_counter_dict(self.counter_dict, state['counters'])
+        for sheet_name, sheet_entry in state['sheets'].items():
+            entry = self.sheet_dict.setdefault(sheet_name, {'seconds': 0.0, 'stages': {}, 'counters': {}})
+            entry['seconds'] += sheet_entry['seconds']
+            _merge_stage_dict(entry['stages'], sheet_entry['stages'])
+            _merge_counter_dict(entry['counters'], sheet_entry['counters'])
+        return
+
+    def to_dict(self) -> Dict:
+        """概要
+        記録した内容をJSON形式に変換できるdict型にして返す。
+
+        Returns
+        ----------
+        d: Dict
+            total_seconds、stages、sheets、counters、cacheをkeyに持つdict型。
+        """
+        def _stage_to_dict(stage_dict: Dict[str, List[float]]) -> Dict[str, Dict]:
+            return {name: {'count': entry[0], 'seconds': round(entry[1], 6)}
+                    for name, entry in stage_dict.items()}
+        hit_num = self.counter_dict.get('cache.hit', 0)
+        miss_num = self.counter_dict.get('cache.miss', 0)
+        d = dict(self.info_dict)
+        d.update({
+            'total_seconds': round(time.perf_counter() - self.start_time, 6),
+            'stages': _stage_to_dict(self.stage_dict),
+            'sheets': {sheet_name: {'seconds': round(entry['seconds'], 6),
+                                    'stages': _stage_to_dict(entry['stages']),
+                                    'counters': dict(entry['counters'])}
+                       for sheet_name, entry in self.sheet_dict.items()},
+            'counters': dict(self.counter_dict),
+            'cache': {'hit': hit_num, 'miss': miss_num,
+                      'hit_rate': hit_num / (hit_num + miss_num) if hit_num + miss_num > 0 else None},
+        })
+        return d
+
+def _merge_stage_dict(stage_dict: Dict[str, List[float]], other_stage_dict: Dict[str, List[float]]) -> None:
+    for name, (num, seconds) in other_stage_dict.items():
+        entry = stage_dict.setdefault(name, [0, 0.0])
+        entry[0] += num
+        entry[1] += seconds
+    return
+
+def _merge_counter_dict(counter_dict: Dict[str, int], other_counter_dict: Dict[str, int]) -> None:
+    for name, num in other_counter_dict.items():
+        counter_dict[name] = counter_dict.get(name, 0) + num
+    return
+
+_profiler: Optional[Profiler] = None
+
+def resolve_output(profile_path: str = '') -> str:
+    """概要
+    計測結果の書き出し先を返す。引数が''の場合は環境変数FCS_PROFILEの値を使用する。
+    環境変数の値が1の場合は、書き出さずに表示する。
+
+    Parameters
+    ----------
+    profile_path: str
+        計測結果を書き出すJSONのファイルパス。'-'の場合は表示する。デフォルトは''。
+
+    Returns
+    ----------
+    output: str
+        書き出し先を示すstr型。計測しない場合は''。
+    """
+    if profile_path != '':
+        return profile_path
+    output = os.environ.get(PROFILE_ENV_NAME, '')
+    if output == '1':
+        return PROFILE_STDOUT
+    return output
+
+def start(**info) -> Profiler:
+    """概要
+    計測を開始する。
+
+    Parameters
+    ----------
+    info
+        計測結果に含める情報（ファイルパスなど）。
+
+    Returns
+    ----------
+    profiler: Profiler
+        計測に使用するProfiler。
+    """
+    global _profiler
+    _profiler = Profiler()
+    _profiler.info_dict.update(info)
+    return _profiler
+
+def finish(output: str) -> Optional[Dict]:
+    """概要
+    計測を終了し、計測結果を書き出す。計測を開始していない場合は何もしない。
+
+    Parameters
+    ----------
+    output: str
+        書き出すJSONのファイルパス。'-'の場合は表示する。
+
+    Returns
+    ----------
+    d: Optional[Dict]
+        計測結果を格納したdict型。計測を開始していない場合はNone。
+    """
+    global _profiler
+    if _profiler is None:
+        return None
+    d = _profiler.to_dict()
+    _profiler = None
+    if output == PROFILE_STDOUT:
+        print(json.dumps(d, ensure_ascii=False, indent=2))
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(d, f, ensure_ascii=False, indent=2)
+    return d
+
+def stop() -> Optional[Profiler]:
+    """概要
+    計測を終了し、計測結果を書き出さずにProfilerを返す。別のプロセスでの計測に使用する。
+
+    Returns
+    ----------
+    profiler: Optional[Profiler]
+        計測に使用したProfiler。計測を開始していない場合はNone。
+    """
+    global _profiler
+    profiler = _profiler
+    _profiler = None
+    return profiler
+
+def merge(state: Optional[Dict]) -> None:
+    """概要
+    別のプロセスで記録した内容（Profiler.exportの返り値）を合算する。計測しない場合は何もしない。
+
+    Parameters
+    ----------
+    state: Optional[Dict]
+        Profiler.exportの返り値。Noneの場合は何もしない。
+
+    Returns
+    ----------
+    None
+    """
+    if _profiler is not None and state is not None:
+        _profiler.merge(state)
+    return
+
+def is_enabled() -> bool:
+    return _profiler is not None
+
+def stage(name: str):
+    """概要
+    withの範囲の処理時間を、段階の処理時間として記録する。計測しない場合は何もしない。
+
+    Parameters
+    ----------
+    name: str
+        段階名。
+
+    Returns
+    ----------
+    context
+        withで使用するコンテキストマネージャ。
+    """
+    if _profiler is None:
+        return _NULL_CONTEXT
+    return _profiler.stage(name)
+
+def sheet(sheet_name: str):
+    """概要
+    withの範囲で記録したものを、シートごとにも記録する。計測しない場合は何もしない。
+
+    Parameters
+    ----------
+    sheet_name: str
+        シート名。
+
+    Returns
+    ----------
+    context
+        withで使用するコンテキストマネージャ。
+    """
+    if _profiler is None:
+        return _NULL_CONTEXT
+    return _profiler.sheet(sheet_name)
+
+def count(name: str, num: int = 1) -> None:
+    """概要
+    件数を加える。計測しない場合は何もしない。
+
+    Parameters
+    ----------
+    name: str
+        件数の名前。
+
+    num: int
+        加える件数。デフォルトは1。
+
+    Returns
+    ----------
+    None
+    """
+    if _profiler is not None:
+        _profiler.count(name, num)
+    return
+
+def wrap_worksheet(ws):
+    """概要
+    ワークシートに対する読み込み、書き込み、書式変更の回数と処理時間を記録するため、
+    ワークシートを包んだものを返す。計測しない場合はワークシートをそのまま返す。
+
+    Parameters
+    ----------
+    ws
+        包むワークシート。
+
+    Returns
+    ----------
+    ws
+        CountingWorksheetまたは受け取ったワークシート。
+    """
+    if _profiler is None:
+        return ws
+    return CountingWorksheet(ws)
+
+class _Proxy:
+    """概要
+    受け取ったオブジェクトの属性をそのまま参照、変更するための基底クラス。
+    """
+    def __init__(self, obj):
+        object.__setattr__(self, '_obj', obj)
+
+    def __getattr__(self, name: str):
+        return getattr(self._obj, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._obj, name, value)
+
+def _timed_get(obj, name: str, stage_name: str):
+    start = time.perf_counter()
+    value = getattr(obj, name)
+    if _profiler is not None:
+        _profiler.add_time(stage_name, time.perf_counter() - start)
+    return value
+
+def _timed_set(obj, name: str, value, stage_name: str) -> None:
+    start = time.perf_counter()
+    setattr(obj, name, value)
+    if _profiler is not None:
+        _profiler.add_time(stage_name, time.perf_counter() - start)
+    return
+
+class CountingWorksheet(_Proxy):
+    """概要
+    Range、UsedRangeが返す範囲をCountingRangeで包むワークシート。
+    """
+    def Range(self, address: str) -> 'CountingRange':
+        return CountingRange(self._obj.Range(address))
+
+    @property
+    def UsedRange(self) -> 'CountingRange':
+        return CountingRange(self._obj.UsedRange)
+
+class CountingRange(_Proxy):
+    """概要
+    値の読み込み、書き込みと、字の色の変更、文字単位の書式変更の回数と処理時間を記録する範囲。
+    """
+    def __getattr__(self, name: str):
+        if name in _READ_ATTR_SET:
+            return _timed_get(self._obj, name, BACKEND_READ)
+        return getattr(self._obj, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in _READ_ATTR_SET:
+            _timed_set(self._obj, name, value, BACKEND_WRITE)
+        else:
+            setattr(self._obj, name, value)
+
+    @property
+    def Font(self) -> '_CountingFont':
+        return _CountingFont(self._obj.Font, BACKEND_FONT_COLOR)
+
+    def GetCharacters(self, start: int, length: int) -> '_CountingCharacters':
+        return _CountingCharacters(self._obj.GetCharacters(start, length))
+
+class _CountingCharacters(_Proxy):
+    @property
+    def Font(self) -> '_CountingFont':
+        return _CountingFont(self._obj.Font, BACKEND_CHAR_FORMAT)
+
+class _CountingFont(_Proxy):
+    def __init__(self, obj, stage_name: str):
+        super().__init__(obj)
+        object.__setattr__(self, '_stage_name', stage_name)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name == 'Color':
+            _timed_set(self._obj, name, value, self._stage_name)
+        else:
+            setattr(self._obj, name, value)
@@ -1,10 +1,33 @@
 """
 コピーや差分比較時に参照するセル番地、範囲の情報を定義する。
+セル番地を展開して作成するテーブルは、インポート時ではなく初めて参照された時点で作成する。
 """
-from typing import List, Dict
+from typing import Callable, List, Dict
 from constants import KeikakuSheet
 import utils
 
+class _LazyClassAttribute:
+    """概要
+    クラス属性を初めて参照した時点で値を作成し、以降は作成した値をそのまま返す記述子。
+
+    Parameters
+    ----------
+    func: Callable
+        クラス属性の値を作成して返す引数なしの関数。
+    """
+    def __init__(self, func: Callable):
+        self._func = func
+        self._name = func.__name__
+
+    def __set_name__(self, owner, name: str) -> None:
+        self._name = name
+
+    def __get__(self, instance, owner):
+        value = self._func()
+        # 記述子を作成した値で置き換え、2回目以降は通常のクラス属性として参照させる
+        setattr(owner, self._name, value)
+        return value
+
 class REGISTER_APPLICATION_PARAMS:
     CHANGE_OTHER_CELL_VALUE_DICT = {'E26': 'P26', 'E27': 'P27', 'E28': 'P28', 'E29': 'P29', 
                                     'E30': 'P30', 'E31': 'P31', 'E33': 'P33', 'E34': 'P34',
@@ -80,9 +103,11 @@ class SPECIAL_NOTES_PARAMS:
     CHECK_TEXT_CELL_LIST = ['A6', 'E23']
 
 class MONITORING_PLAN_FO001_PARAMS:
-    CHECK_ADDRESS_LIST = utils.from_range_address_list_to_each_cell_adress_list(['K4:AQ53'])
+    CHECK_ADDRESS_LIST = _LazyClassAttribute(
+        lambda: utils.from_range_address_list_to_each_cell_adress_list(['K4:AQ53']))
     COPY_ADDRESS_LIST = ['K4:AQ53']
-    CHECK_TEXT_CELL_LIST = utils.from_range_address_list_to_each_cell_adress_list(['O4:AQ53'])
+    CHECK_TEXT_CELL_LIST = _LazyClassAttribute(
+        lambda: utils.from_range_address_list_to_each_cell_adress_list(['O4:AQ53']))
 
 class IKUSEI_RSH_PARAMS:
     COL_INTERVAL = 4
@@ -230,7 +255,8 @@ def _SKK_CHANGES_CHECK_LIST() -> List[str]:
     l: List[str]
         森林経営計画の適用条件１への適用と計画の変遷（FO-001）の値の比較をするセルを指定するlist型。
     """
-    l = SKK_CHANGES_PARAMS.OUT_OF_PATTERN_CELL_LIST
+    # OUT_OF_PATTERN_CELL_LIST自体を変更しないよう、複製してから追加する
+    l = list(SKK_CHANGES_PARAMS.OUT_OF_PATTERN_CELL_LIST)
     for r in range(0, SKK_CHANGES_PARAMS.ROW_PATTERN_NUM):
         for c in range(0, SKK_CHANGES_PARAMS.COL_PATTERN_NUM):
             right = c * SKK_CHANGES_PARAMS.COL_INTERVAL
@@ -257,7 +283,8 @@ def _SKK_CHANGES_COPY_LIST() -> List[str]:
     l: List[str]
         森林経営計画の適用条件１への適用と計画の変遷（FO-001）の書き込みセルを指定するlist型。
     """
-    l = SKK_CHANGES_PARAMS.OUT_OF_PATTERN_CELL_LIST
+    # OUT_OF_PATTERN_CELL_LIST自体を変更しないよう、複製してから追加する
+    l = list(SKK_CHANGES_PARAMS.OUT_OF_PATTERN_CELL_LIST)
     for r in range(0, SKK_CHANGES_PARAMS.ROW_PATTERN_NUM):
         for c in range(0, SKK_CHANGES_PARAMS.COL_PATTERN_NUM):
             right = c * SKK_CHANGES_PARAMS.COL_INTERVAL
@@ -357,20 +384,33 @@ def _IN_PJ_HWP_CHECK_LIST() -> List[str]:
                 l.append(col + str(row_num))
     return l
 
-COPY_CELL_ADDRESS_DICT = {
-    KeikakuSheet.REGISTER_APPLICATION: REGISTER_APPLICATION_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.OTHER_PARTICIPANTS: _OTHER_PARTICIPANTS_COPY_LIST(),
-    KeikakuSheet.CONFIRMATION_OF_CONDITION_5: CONFIRMATION_OF_CONDITION_5_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.CONFIRMATION_OF_CONDITION_6: CONFIRMATION_OF_CONDITION_6_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.PLAN_CHANGE_NORTIFICATION: PLAN_CHANGE_NORTIFICATION_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.OVERVIEW: OVERVIEW_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.METHODOLOGY_FO001: METHODOLOGY_FO001_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.SKK_CHANGES: _SKK_CHANGES_COPY_LIST(),
-    KeikakuSheet.MULTIPLE_SKK_INFO: _MULTIPLE_SKK_INFO_COPY_LIST(),
-    KeikakuSheet.DATA_MANAGEMENT: DATA_MANAGEMENT_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.SPECIAL_NOTES: SPECIAL_NOTES_PARAMS.COPY_ADDRESS_LIST,
-    KeikakuSheet.MONITORING_PLAN_FO001: MONITORING_PLAN_FO001_PARAMS.COPY_ADDRESS_LIST
-}
+def _COPY_CELL_ADDRESS_DICT() -> Dict[KeikakuSheet, List[str]]:
+    """概要
+    書き写すセル番地をシートごとに格納したdict型を作成。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    d: Dict[KeikakuSheet, List[str]]
+        KeikakuSheet型をkeyに、書き写すセル番地のlist型をvalueに持つdict型。
+    """
+    return {
+        KeikakuSheet.REGISTER_APPLICATION: REGISTER_APPLICATION_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.OTHER_PARTICIPANTS: _OTHER_PARTICIPANTS_COPY_LIST(),
+        KeikakuSheet.CONFIRMATION_OF_CONDITION_5: CONFIRMATION_OF_CONDITION_5_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.CONFIRMATION_OF_CONDITION_6: CONFIRMATION_OF_CONDITION_6_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.PLAN_CHANGE_NORTIFICATION: PLAN_CHANGE_NORTIFICATION_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.OVERVIEW: OVERVIEW_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.METHODOLOGY_FO001: METHODOLOGY_FO001_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.SKK_CHANGES: _SKK_CHANGES_COPY_LIST(),
+        KeikakuSheet.MULTIPLE_SKK_INFO: _MULTIPLE_SKK_INFO_COPY_LIST(),
+        KeikakuSheet.DATA_MANAGEMENT: DATA_MANAGEMENT_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.SPECIAL_NOTES: SPECIAL_NOTES_PARAMS.COPY_ADDRESS_LIST,
+        KeikakuSheet.MONITORING_PLAN_FO001: MONITORING_PLAN_FO001_PARAMS.COPY_ADDRESS_LIST
+    }
 
 # 文字列であることを明記して書き写す必要のあるセル
 NUM_TO_STR_ADDRESS_DICT = {
@@ -387,26 +427,52 @@ COPY_WIDTH_AND_HEIGHT_SHEET_LIST = [
 ]
 
 # 差分を確認して変更箇所を赤字にするセル番地の辞書形式
-COMPARE_CELL_ADDRESS_DICT = {
-    KeikakuSheet.OTHER_PARTICIPANTS: _OTHER_PARTICIPANTS_CHECK_LIST(),                                          
-    KeikakuSheet.CONFIRMATION_OF_CONDITION_5: CONFIRMATION_OF_CONDITION_5_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.CONFIRMATION_OF_CONDITION_6: CONFIRMATION_OF_CONDITION_6_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.PLAN_CHANGE_NORTIFICATION: PLAN_CHANGE_NORTIFICATION_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.OVERVIEW: OVERVIEW_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.METHODOLOGY_FO001: METHODOLOGY_FO001_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.SKK_CHANGES: _SKK_CHANGES_CHECK_LIST(),
-    KeikakuSheet.MULTIPLE_SKK_INFO: _MULTIPLE_SKK_INFO_CHECK_LIST(),
-    KeikakuSheet.DATA_MANAGEMENT: DATA_MANAGEMENT_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.SPECIAL_NOTES: SPECIAL_NOTES_PARAMS.CHECK_ADDRESS_LIST,
-    KeikakuSheet.MONITORING_PLAN_FO001: utils.from_range_address_list_to_each_cell_adress_list(['K4:AQ53']),
-    KeikakuSheet.IN_PJ_HWP: _IN_PJ_HWP_CHECK_LIST()
-}
+def _COMPARE_CELL_ADDRESS_DICT() -> Dict[KeikakuSheet, List[str]]:
+    """概要
+    差分を確認して変更箇所を赤字にするセル番地をシートごとに格納したdict型を作成。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    d: Dict[KeikakuSheet, List[str]]
+        KeikakuSheet型をkeyに、差分を確認するセル番地のlist型をvalueに持つdict型。
+    """
+    return {
+        KeikakuSheet.OTHER_PARTICIPANTS: _OTHER_PARTICIPANTS_CHECK_LIST(),                                          
+        KeikakuSheet.CONFIRMATION_OF_CONDITION_5: CONFIRMATION_OF_CONDITION_5_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.CONFIRMATION_OF_CONDITION_6: CONFIRMATION_OF_CONDITION_6_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.PLAN_CHANGE_NORTIFICATION: PLAN_CHANGE_NORTIFICATION_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.OVERVIEW: OVERVIEW_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.METHODOLOGY_FO001: METHODOLOGY_FO001_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.SKK_CHANGES: _SKK_CHANGES_CHECK_LIST(),
+        KeikakuSheet.MULTIPLE_SKK_INFO: _MULTIPLE_SKK_INFO_CHECK_LIST(),
+        KeikakuSheet.DATA_MANAGEMENT: DATA_MANAGEMENT_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.SPECIAL_NOTES: SPECIAL_NOTES_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.MONITORING_PLAN_FO001: MONITORING_PLAN_FO001_PARAMS.CHECK_ADDRESS_LIST,
+        KeikakuSheet.IN_PJ_HWP: _IN_PJ_HWP_CHECK_LIST()
+    }
 
 # 差分がある場合、別のセルの値を変更するセル番地の辞書形式
-COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT = {
-    KeikakuSheet.REGISTER_APPLICATION: REGISTER_APPLICATION_PARAMS.CHANGE_OTHER_CELL_VALUE_DICT,
-    KeikakuSheet.OTHER_PARTICIPANTS: _OTHER_PARTICIPANTS_CHANGE_OTHER_CELL_VALUE_DICT()
-}
+def _COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT() -> Dict[KeikakuSheet, Dict[str, str]]:
+    """概要
+    差分がある場合に別のセルの値を変更するセル番地の組み合わせを、シートごとに格納したdict型を作成。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    d: Dict[KeikakuSheet, Dict[str, str]]
+        KeikakuSheet型をkeyに、差分を確認するセル番地と値を変更するセル番地のdict型をvalueに持つdict型。
+    """
+    return {
+        KeikakuSheet.REGISTER_APPLICATION: REGISTER_APPLICATION_PARAMS.CHANGE_OTHER_CELL_VALUE_DICT,
+        KeikakuSheet.OTHER_PARTICIPANTS: _OTHER_PARTICIPANTS_CHANGE_OTHER_CELL_VALUE_DICT()
+    }
 
 # 差分を比較する情報記入シート
 INFO_SHEET_LIST = [
@@ -429,11 +495,57 @@ CALC_SHEET_LIST = [
 ]
 
 # 差分がある場合、文字列の値を検証するセル番地の辞書形式
-CHECK_TEXT_CELL_DICT = {
-    KeikakuSheet.PLAN_CHANGE_NORTIFICATION: PLAN_CHANGE_NORTIFICATION_PARAMS.CHECK_TEXT_CELL_LIST,
-    KeikakuSheet.METHODOLOGY_FO001: METHODOLOGY_FO001_PARAMS.CHECK_TEXT_CELL_LIST,
-    KeikakuSheet.MULTIPLE_SKK_INFO: _MULTIPLE_SKK_INFO_CHECK_TEXT_LIST(),
-    KeikakuSheet.DATA_MANAGEMENT: DATA_MANAGEMENT_PARAMS.CHECK_TEXT_CELL_LIST,
-    KeikakuSheet.SPECIAL_NOTES: SPECIAL_NOTES_PARAMS.CHECK_TEXT_CELL_LIST,
-    KeikakuSheet.MONITORING_PLAN_FO001: MONITORING_PLAN_FO001_PARAMS.CHECK_TEXT_CELL_LIST
-}
\ No newline at end of file
+def _CHECK_TEXT_CELL_DICT() -> Dict[KeikakuSheet, List[str]]:
+    """概要
+    差分がある場合に文字列の値を検証するセル番地をシートごとに格納したdict型を作成。
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    d: Dict[KeikakuSheet, List[str]]
+        KeikakuSheet型をkeyに、文字列の値を検証するセル番地のlist型をvalueに持つdict型。
+    """
+    return {
+        KeikakuSheet.PLAN_CHANGE_NORTIFICATION: PLAN_CHANGE_NORTIFICATION_PARAMS.CHECK_TEXT_CELL_LIST,
+        KeikakuSheet.METHODOLOGY_FO001: METHODOLOGY_FO001_PARAMS.CHECK_TEXT_CELL_LIST,
+        KeikakuSheet.MULTIPLE_SKK_INFO: _MULTIPLE_SKK_INFO_CHECK_TEXT_LIST(),
+        KeikakuSheet.DATA_MANAGEMENT: DATA_MANAGEMENT_PARAMS.CHECK_TEXT_CELL_LIST,
+        KeikakuSheet.SPECIAL_NOTES: SPECIAL_NOTES_PARAMS.CHECK_TEXT_CELL_LIST,
+        KeikakuSheet.MONITORING_PLAN_FO001: MONITORING_PLAN_FO001_PARAMS.CHECK_TEXT_CELL_LIST
+    }
+
+# 初めて参照された時点で作成するテーブル名と、テーブルを作成する関数の対応
+_LAZY_TABLE_FUNC_DICT = {
+    'COPY_CELL_ADDRESS_DICT': _COPY_CELL_ADDRESS_DICT,
+    'COMPARE_CELL_ADDRESS_DICT': _COMPARE_CELL_ADDRESS_DICT,
+    'COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT': _COMPARE_AND_CHANGE_OTHER_CELL_VALUE_DICT,
+    'CHECK_TEXT_CELL_DICT': _CHECK_TEXT_CELL_DICT
+}
+
+def __getattr__(name: str):
+    """概要
+    モジュールに定義されていない属性が参照された際に呼び出され（PEP 562）、
+    _LAZY_TABLE_FUNC_DICTに含まれるテーブルを作成して返す。
+    作成したテーブルはモジュールの属性として保存し、2回目以降はこの関数を経由せずに参照させる。
+
+    Parameters
+    ----------
+    name: str
+        参照された属性名。
+
+    Returns
+    ----------
+    table
+        作成したテーブル。
+    """
+    if name in _LAZY_TABLE_FUNC_DICT:
+        table = _LAZY_TABLE_FUNC_DICT[name]()
+        globals()[name] = table
+        return table
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+def __dir__() -> List[str]:
+    return sorted(list(globals().keys()) + list(_LAZY_TABLE_FUNC_DICT.keys()))
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+エクセルファイルのシートのXMLから、シートごとの内容のハッシュ値を求める関数を定義する。
+ハッシュ値はsheetDataに含まれるセルの番地、型、値、数式のみから求め、書式、選択中のセル、
+使用範囲（dimension）などは含めない。
+2つのファイルで同じハッシュ値を持つシートは内容が同一であるとみなし、
+セル番地ごとの比較を省略するために使用する。
+"""
+import hashlib
+import html
+import re
+from typing import Dict, Set
+import zipfile
+import sheet_reader
+
+# 子要素を持つセルの番地、型と、値、数式などの子要素。書式（s）などの属性は含めない
+# 子要素を持たないセル（<c .../>）は書式のみを設定したセルのため、一致させない
+_CELL_PATTERN = re.compile(
+    rb'<c\b(?=[^>]*?\br="([^"]*)")(?:(?=[^>]*?\bt="([^"]*)"))?[^>/]*>(.*?)</c>', re.S)
+# 共有文字列のindex
+_VALUE_PATTERN = re.compile(rb'<v>([0-9]+)</v>')
+# 書式を持たないインライン文字列（<is><t>文字列</t></is>）の前後
+_PLAIN_INLINE_PREFIX = b'<is><t>'
+_PLAIN_INLINE_SUFFIX = b'</t></is>'
+# 文字列の要素と、ふりがなの要素
+_TEXT_PATTERN = re.compile(rb'<t\b[^>]*?(?:/>|>(.*?)</t>)', re.S)
+_PHONETIC_PATTERN = re.compile(rb'<rPh\b.*?</rPh>', re.S)
+# 共有文字列、インライン文字列のセルの型（いずれも文字列として同じ型とみなす）
+_STRING_CELL_TYPE_SET = frozenset([b's', b'inlineStr'])
+
+def sheet_digest_dict(file_path: str) -> Dict[str, str]:
+    """概要
+    エクセルファイルに含まれるシートごとに、セルの番地、型、値、数式のハッシュ値を求める。
+    共有文字列のindexとインライン文字列は文字列に置き換えてから求めるため、共有文字列の順序や
+    文字列の格納方法が異なるファイル同士でも、同じ値を持つシートは同じハッシュ値となる。
+    セルの書式、選択中のセル、使用範囲などは含めないため、値を変更せずに保存したシートも同じハッシュ値となる。
+    xlsx形式として読み込めないファイルは空のdict型を返す。
+
+    Parameters
+    ----------
+    file_path: str
+        エクセルファイルのパス。
+
+    Returns
+    ----------
+    digest_dict: Dict[str, str]
+        シート名をkeyに、ハッシュ値を示すstr型をvalueに持つdict型。
+    """
+    try:
+        zip_file = zipfile.ZipFile(file_path)
+    except (OSError, zipfile.BadZipFile):
+        return {}
+    with zip_file:
+        try:
+            sheet_path_dict = sheet_reader.read_sheet_path_dict(zip_file)
+        except KeyError:
+            return {}
+        shared_string_list = None
+        digest_dict = {}
+        for sheet_name, sheet_path in sheet_path_dict.items():
+            try:
+                data = zip_file.read(sheet_path)
+            except KeyError:
+                continue
+            if b't="s"' in data and shared_string_list is None:
+                # 共有文字列は、参照するシートが含まれる時点で初めて読み込む
+                shared_string_list = [text.encode('utf-8')
+                                      for text in sheet_reader.read_shared_string_list(zip_file)]
+            digest_dict[sheet_name] = _cell_digest(data, shared_string_list)
+    return digest_dict
+
+def _cell_digest(data: bytes, shared_string_list: list) -> str:
+    """概要
+    シートのXMLのうち、sheetDataに含まれるセルの番地、型、値、数式のハッシュ値を求める。
+    値、数式を持たないセル（書式のみを設定したセル）は含めない。
+    sheetDataを見つけられない場合（名前空間の接頭辞を使用したXMLなど）は、XML全体のハッシュ値を求める。
+
+    Parameters
+    ----------
+    data: bytes
+        シートのXML。
+
+    shared_string_list: list
+        共有文字列をbytes型で格納したlist型。共有文字列を参照しない場合はNone。
+
+    Returns
+    ----------
+    digest: str
+        ハッシュ値を示すstr型。
+    """
+    start = data.find(b'<sheetData')
+    if start < 0:
+        return hashlib.sha256(data).hexdigest()
+    end = data.find(b'</sheetData>', start)
+    sheet_data = data[start:end] if end >= 0 else b''
+    part_list = []
+    for address, cell_type, content in _CELL_PATTERN.findall(sheet_data):
+        if content == b'':
+            continue
+        if cell_type == b's':
+            index = _VALUE_PATTERN.search(content)
+            content = b'' if index is None else _shared_string(shared_string_list or [], index.group(1))
+        elif cell_type == b'inlineStr':
+            if content.startswith(_PLAIN_INLINE_PREFIX) and content.endswith(_PLAIN_INLINE_SUFFIX) \
+                and content.count(b'<t') == 1:
+                content = content[len(_PLAIN_INLINE_PREFIX):-len(_PLAIN_INLINE_SUFFIX)]
+            else:
+                # 書式を設定した文字列は、ふりがなを除いた文字列を連結する
+                content = b''.join(_TEXT_PATTERN.findall(_PHONETIC_PATTERN.sub(b'', content)))
+            if b'&' in content:
+                content = html.unescape(content.decode('utf-8')).encode('utf-8')
+        if cell_type in _STRING_CELL_TYPE_SET:
+            cell_type = b's'
+        part_list.append(b'\0'.join((address, cell_type, content)))
+    return hashlib.sha256(b'\n'.join(part_list)).hexdigest()
+
+def _shared_string(shared_string_list: list, index: bytes) -> bytes:
+    """概要
+    共有文字列のindexを示すbytes型から、共有文字列を返す。範囲外のindexはそのまま返す。
+
+    Parameters
+    ----------
+    shared_string_list: list
+        共有文字列をbytes型で格納したlist型。
+
+    index: bytes
+        共有文字列のindexを示すbytes型。
+
+    Returns
+    ----------
+    text: bytes
+        共有文字列のbytes型。
+    """
+    i = int(index)
+    if i < len(shared_string_list):
+        return shared_string_list[i]
+    return index
+
+def identical_sheet_set(target_digest_dict: Dict[str, str],
+                        referred_digest_dict: Dict[str, str]) -> Set[str]:
+    """概要
+    2つのエクセルファイルのシートごとのハッシュ値を比較し、ハッシュ値が一致するシート名を返す。
+
+    Parameters
+    ----------
+    target_digest_dict, referred_digest_dict: Dict[str, str]
+        sheet_digest_dictにより求めた、シート名をkeyに、ハッシュ値をvalueに持つdict型。
+
+    Returns
+    ----------
+    sheet_name_set: Set[str]
+        内容が同一のシート名を格納したset型。
+    """
+    return {sheet_name for sheet_name, digest in target_digest_dict.items()
+            if referred_digest_dict.get(sheet_name) == digest}
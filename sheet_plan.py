@@ -0,0 +1,195 @@
+"""
+settingsに記載されたシートごとのセル番地の情報を、比較の処理に使用する形式に変換した
+シートの処理計画（SheetPlan）を定義する。
+作成した処理計画は処理の終了時（またはflushの呼び出し時）にまとめて利用者ごとのキャッシュのフォルダに保存し、
+settings.pyを含むこのフォルダのいずれかのモジュールが変更されるまで再利用する。
+"""
+import atexit
+import hashlib
+import os
+import pickle
+from typing import Dict, FrozenSet, List, Tuple
+import numpy as np
+from cell_ref import RangeRef
+from constants import KeikakuSheet
+import settings
+import user_cache
+
+# 処理計画の形式を変更した場合は値を更新し、保存済みの処理計画を無効にする
+_PLAN_FORMAT_VERSION = 2
+_CACHE_FILE_PATH = user_cache.user_cache_dir('sheet_plan.pickle')
+
+class SheetPlan:
+    """概要
+    1つのシートについて、比較するセル番地の座標、読み込む範囲、セルの種類を格納する。
+
+    Attributes
+    ----------
+    address_list: List[str]
+        比較するセル番地または範囲を示すstr型を格納したlist型。
+
+    range_list: List[RangeRef]
+        address_listの各範囲をRangeRefに変換したlist型。
+
+    loc_array: np.ndarray
+        各範囲の（左上の列番号、左上の行番号、右下の列番号、右下の行番号）を行ごとに格納した
+        2次元のnp.ndarray型。
+
+    read_address: str
+        比較するすべての範囲を含む最小の範囲を示すstr型。範囲がない場合は''。
+
+    relative_loc_array: np.ndarray
+        各範囲のread_addressの左上のセルに対する（左上の行、左上の列、右下の行、右下の列）の
+        相対座標を行ごとに格納した2次元のnp.ndarray型。
+
+    text_address_set: FrozenSet[str]
+        文字列の差分を確認するセル番地を格納したfrozenset型。
+
+    num_to_str_address_set: FrozenSet[str]
+        文字列であることを明記して書き写すセル番地を格納したfrozenset型。
+
+    is_text_array, is_num_to_str_array: np.ndarray
+        address_listの各範囲がtext_address_set、num_to_str_address_setに含まれるか否かを
+        格納したbool型のnp.ndarray型。
+    """
+    def __init__(self, sheet_name: KeikakuSheet, address_list: List[str]):
+        self.address_list = list(address_list)
+        self.range_list = [RangeRef.from_address(address) for address in self.address_list]
+        self.loc_array = np.array([(r.c1, r.r1, r.c2, r.r2) for r in self.range_list],
+                                  dtype=np.int64).reshape(-1, 4)
+        if len(self.range_list) == 0:
+            self.read_address = ''
+            self.relative_loc_array = np.zeros((0, 4), dtype=np.int64)
+        else:
+            read_range = RangeRef.bounding(self.range_list)
+            self.read_address = read_range.address
+            self.relative_loc_array = self.loc_array[:, [1, 0, 3, 2]] \
+                - np.array([read_range.r1, read_range.c1, read_range.r1, read_range.c1], dtype=np.int64)
+        self.text_address_set = frozenset(settings.CHECK_TEXT_CELL_DICT.get(sheet_name, []))
+        self.num_to_str_address_set = frozenset(settings.NUM_TO_STR_ADDRESS_DICT.get(sheet_name, []))
+        self.is_text_array = np.array([address in self.text_address_set
+                                       for address in self.address_list], dtype=bool)
+        self.is_num_to_str_array = np.array([address in self.num_to_str_address_set
+                                             for address in self.address_list], dtype=bool)
+
+def _settings_digest() -> str:
+    """概要
+    settings.pyを含むこのフォルダのすべてのモジュールの内容（user_cache.code_version）と処理計画の形式から、
+    保存済みの処理計画が有効か否かを判定するためのハッシュ値を返す。
+
+    Returns
+    ----------
+    digest: str
+        ハッシュ値を示すstr型。
+    """
+    return hashlib.sha256('{}\0{}'.format(
+        _PLAN_FORMAT_VERSION, user_cache.code_version()).encode()).hexdigest()
+
+def _load_plan_dict(digest: str) -> Dict[Tuple[KeikakuSheet, Tuple[str]], SheetPlan]:
+    """概要
+    保存済みの処理計画を読み込む。保存されていない場合、またはsettings.pyなどが変更されている場合は
+    空のdict型を返す。
+
+    Parameters
+    ----------
+    digest: str
+        _settings_digestの返り値。
+
+    Returns
+    ----------
+    plan_dict: Dict[Tuple[KeikakuSheet, Tuple[str]], SheetPlan]
+        （シート名、セル番地のtuple型）をkeyに、処理計画をvalueに持つdict型。
+    """
+    try:
+        with open(_CACHE_FILE_PATH, 'rb') as f:
+            cache = pickle.load(f)
+        if cache['digest'] == digest:
+            return cache['plan_dict']
+    except Exception:
+        # 保存されていない、または読み込めない場合は作成し直す
+        pass
+    return {}
+
+def _save_plan_dict(digest: str, plan_dict: Dict[Tuple[KeikakuSheet, Tuple[str]], SheetPlan]) -> None:
+    """概要
+    作成した処理計画を保存する。
+
+    Parameters
+    ----------
+    digest: str
+        _settings_digestの返り値。
+
+    plan_dict: Dict[Tuple[KeikakuSheet, Tuple[str]], SheetPlan]
+        （シート名、セル番地のtuple型）をkeyに、処理計画をvalueに持つdict型。
+
+    Returns
+    ----------
+    None
+    """
+    try:
+        os.makedirs(os.path.dirname(_CACHE_FILE_PATH), exist_ok=True)
+        # 書き込み途中のファイルを読み込まないよう、一時ファイルに書き込んでから置き換える
+        tmp_path = '{}.{}.tmp'.format(_CACHE_FILE_PATH, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'digest': digest, 'plan_dict': plan_dict}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _CACHE_FILE_PATH)
+    except OSError:
+        # 保存できない環境では、保存せずに使用する
+        pass
+    return
+
+_digest = None
+_plan_dict = None
+# 保存していない処理計画があるか否か
+_is_dirty = False
+
+def get_plan(sheet_name: KeikakuSheet, address_list: List[str]) -> SheetPlan:
+    """概要
+    シート名とセル番地のlist型に対応する処理計画を返す。
+    保存済みの処理計画があればそれを、なければ新たに作成して返す。
+    settingsのすべての表の処理計画を作成するのではなく、要求されたものだけを作成する。
+    新たに作成した処理計画は、flushの呼び出し時または処理の終了時にまとめて保存する。
+
+    Parameters
+    ----------
+    sheet_name: KeikakuSheet
+        ワークシートのシート名を示すKeikakuSheet型。
+
+    address_list: List[str]
+        比較するセル番地または範囲を示すstr型を格納したlist型。
+
+    Returns
+    ----------
+    plan: SheetPlan
+        処理計画。
+    """
+    global _digest, _plan_dict, _is_dirty
+    if _plan_dict is None:
+        _digest = _settings_digest()
+        _plan_dict = _load_plan_dict(_digest)
+    key = (sheet_name, tuple(address_list))
+    plan = _plan_dict.get(key)
+    if plan is None:
+        plan = SheetPlan(sheet_name, address_list)
+        _plan_dict[key] = plan
+        _is_dirty = True
+    return plan
+
+def flush() -> None:
+    """概要
+    新たに作成した処理計画があれば、保存済みのものとあわせて1度だけ保存する。
+    処理の終了時にも呼び出す。
+
+    Returns
+    ----------
+    None
+    """
+    global _is_dirty
+    if not _is_dirty:
+        return
+    _save_plan_dict(_digest, _plan_dict)
+    _is_dirty = False
+    return
+
+atexit.register(flush)
@@ -0,0 +1,386 @@
+"""
+エクセルファイルのシートのXMLを逐次的に読み込み、指定した範囲の値のみを取り出す
+読み取り専用のワークブックを定義する。
+書式の設定によってUsedRangeが大きくなっているシートであっても、
+使用するメモリが読み込む範囲の大きさにのみ依存するようにする。
+"""
+import posixpath
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from xml.etree.ElementTree import iterparse
+import zipfile
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils.datetime import from_excel
+import utils
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_DEFAULT_COLUMN_WIDTH = 13.0
+
+def _iter_elements(file, tag: str):
+    """概要
+    XMLを逐次的に読み込み、指定したタグの要素を順に返す。
+    返した要素は処理の終了後に親要素から取り除き、読み込み済みの要素がメモリに残らないようにする。
+
+    Parameters
+    ----------
+    file
+        読み込むXMLのファイルオブジェクト。
+
+    tag: str
+        返す要素のタグを示すstr型。
+
+    Returns
+    ----------
+    element
+        指定したタグの要素。
+    """
+    parent_list = []
+    for event, element in iterparse(file, events=('start', 'end')):
+        if event == 'start':
+            parent_list.append(element)
+            continue
+        parent_list.pop()
+        if element.tag == tag:
+            yield element
+            element.clear()
+            if len(parent_list) > 0:
+                parent_list[-1].remove(element)
+
+def _iter_start_elements_before_sheet_data(file):
+    """概要
+    シートのXMLのうち、sheetDataより前に記載されている要素を順に返す。
+    sheetDataに到達した時点で読み込みを終了する。
+
+    Parameters
+    ----------
+    file
+        読み込むXMLのファイルオブジェクト。
+
+    Returns
+    ----------
+    element
+        sheetDataより前に記載されている要素。
+    """
+    for _, element in iterparse(file, events=('start',)):
+        if element.tag == _MAIN_NS + 'sheetData':
+            break
+        yield element
+
+def _text_from_si(element) -> str:
+    """概要
+    共有文字列の要素から文字列を取り出す。ふりがな（rPh）の文字列は含めない。
+
+    Parameters
+    ----------
+    element
+        共有文字列の要素（si, is）。
+
+    Returns
+    ----------
+    text: str
+        要素に含まれる文字列。
+    """
+    t = element.find(_MAIN_NS + 't')
+    if t is not None:
+        return t.text or ''
+    return ''.join(r_t.text or '' for r_t in element.findall('{n}r/{n}t'.format(n=_MAIN_NS)))
+
+def read_sheet_path_dict(zip_file: zipfile.ZipFile) -> Dict[str, str]:
+    """概要
+    エクセルファイルに含まれるシートについて、シート名とシートのXMLのパスの対応を返す。
+
+    Parameters
+    ----------
+    zip_file: zipfile.ZipFile
+        エクセルファイルを開いたzipfile.ZipFile型。
+
+    Returns
+    ----------
+    sheet_path_dict: Dict[str, str]
+        シート名をkeyに、ファイル内のシートのXMLのパスをvalueに持つdict型。
+    """
+    rel_dict = {}
+    with zip_file.open('xl/_rels/workbook.xml.rels') as f:
+        for rel in _iter_elements(f, _PACKAGE_REL_NS + 'Relationship'):
+            target = rel.get('Target')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join('xl', target))
+            rel_dict[rel.get('Id')] = target
+    sheet_path_dict = {}
+    with zip_file.open('xl/workbook.xml') as f:
+        for sheet in _iter_elements(f, _MAIN_NS + 'sheet'):
+            sheet_path_dict[sheet.get('name')] = rel_dict[sheet.get(_REL_NS + 'id')]
+    return sheet_path_dict
+
+def read_shared_string_list(zip_file: zipfile.ZipFile) -> List[str]:
+    """概要
+    エクセルファイルに含まれるすべての共有文字列を、indexの順に返す。
+
+    Parameters
+    ----------
+    zip_file: zipfile.ZipFile
+        エクセルファイルを開いたzipfile.ZipFile型。
+
+    Returns
+    ----------
+    shared_string_list: List[str]
+        共有文字列を格納したlist型。共有文字列がない場合は空のlist型。
+    """
+    if 'xl/sharedStrings.xml' not in zip_file.namelist():
+        return []
+    with zip_file.open('xl/sharedStrings.xml') as f:
+        return [_text_from_si(si) for si in _iter_elements(f, _MAIN_NS + 'si')]
+
+class StreamingWorkbook:
+    """概要
+    シートのXMLを逐次的に読み込む読み取り専用のワークブック。
+    Excel.Workbookのうち、値の参照に必要な操作のみを提供する。
+    """
+    def __init__(self, file_path: str, close_callback: Optional[Callable] = None):
+        self.FullName = file_path
+        self.ReadOnly = True
+        self._close_callback = close_callback
+        self._zip = zipfile.ZipFile(file_path)
+        self._sheet_path_dict = read_sheet_path_dict(self._zip)
+        self._date_style_set: Optional[Set[int]] = None
+        self._sheets: Dict[str, StreamingWorksheet] = {}
+
+    def Sheets(self, sheet_name: str) -> 'StreamingWorksheet':
+        if sheet_name not in self._sheets:
+            self._sheets[sheet_name] = StreamingWorksheet(
+                self, self._sheet_path_dict[sheet_name])
+        return self._sheets[sheet_name]
+
+    def _shared_strings(self, index_set: Set[int]) -> Dict[int, str]:
+        # 必要な共有文字列のみを取り出す
+        d = {}
+        if len(index_set) == 0 or 'xl/sharedStrings.xml' not in self._zip.namelist():
+            return d
+        max_index = max(index_set)
+        with self._zip.open('xl/sharedStrings.xml') as f:
+            for i, si in enumerate(_iter_elements(f, _MAIN_NS + 'si')):
+                if i in index_set:
+                    d[i] = _text_from_si(si)
+                if i >= max_index:
+                    break
+        return d
+
+    def _is_date_style(self, style_id: int) -> bool:
+        if self._date_style_set is None:
+            self._date_style_set = self._read_date_style_set()
+        return style_id in self._date_style_set
+
+    def _read_date_style_set(self) -> Set[int]:
+        s = set()
+        if 'xl/styles.xml' not in self._zip.namelist():
+            return s
+        num_fmt_dict = dict(BUILTIN_FORMATS)
+        with self._zip.open('xl/styles.xml') as f:
+            for _, element in iterparse(f, events=('end',)):
+                if element.tag == _MAIN_NS + 'numFmt':
+                    num_fmt_dict[int(element.get('numFmtId'))] = element.get('formatCode')
+                elif element.tag == _MAIN_NS + 'cellXfs':
+                    for i, xf in enumerate(element.findall(_MAIN_NS + 'xf')):
+                        fmt = num_fmt_dict.get(int(xf.get('numFmtId', 0)))
+                        if fmt is not None and is_date_format(fmt):
+                            s.add(i)
+                    break
+        return s
+
+    def Close(self, SaveChanges: bool = False) -> None:
+        self._zip.close()
+        self._sheets = {}
+        if self._close_callback is not None:
+            self._close_callback(self)
+        return
+
+class StreamingWorksheet:
+    """概要
+    シートのXMLを逐次的に読み込む読み取り専用のワークシート。
+    """
+    def __init__(self, workbook: StreamingWorkbook, sheet_path: str):
+        self._workbook = workbook
+        self._sheet_path = sheet_path
+        self._column_width_list: Optional[List[Tuple[int, int, float]]] = None
+        self._row_height_dict: Optional[Dict[int, float]] = None
+
+    @property
+    def UsedRange(self) -> '_StreamingRange':
+        with self._workbook._zip.open(self._sheet_path) as f:
+            for element in _iter_start_elements_before_sheet_data(f):
+                if element.tag == _MAIN_NS + 'dimension':
+                    return _StreamingRange(self, element.get('ref'))
+        # dimensionが記載されていない場合はすべてのセルを確認する
+        c_min, r_min, c_max, r_max = None, None, 1, 1
+        with self._workbook._zip.open(self._sheet_path) as f:
+            for c in _iter_elements(f, _MAIN_NS + 'c'):
+                col_num, row_num = utils.from_cell_address_to_column_row_int(c.get('r'))
+                c_min = col_num if c_min is None else min(c_min, col_num)
+                r_min = row_num if r_min is None else min(r_min, row_num)
+                c_max = max(c_max, col_num)
+                r_max = max(r_max, row_num)
+        return _StreamingRange(self, '{}:{}'.format(
+            utils.from_column_row_int_to_cell_address(c_min or 1, r_min or 1),
+            utils.from_column_row_int_to_cell_address(c_max, r_max)))
+
+    def Range(self, address: str) -> '_StreamingRange':
+        return _StreamingRange(self, address)
+
+    def Columns(self, col: str) -> '_StreamingDimension':
+        if self._column_width_list is None:
+            self._column_width_list = []
+            with self._workbook._zip.open(self._sheet_path) as f:
+                for element in _iter_start_elements_before_sheet_data(f):
+                    if element.tag == _MAIN_NS + 'col' and element.get('width') is not None:
+                        self._column_width_list.append((int(element.get('min')),
+                                                        int(element.get('max')),
+                                                        float(element.get('width'))))
+        col_num = utils.from_alpha_to_num(col)
+        for c_min, c_max, width in self._column_width_list:
+            if c_min <= col_num <= c_max:
+                return _StreamingDimension(ColumnWidth = width)
+        return _StreamingDimension(ColumnWidth = _DEFAULT_COLUMN_WIDTH)
+
+    def Rows(self, row: str) -> '_StreamingDimension':
+        if self._row_height_dict is None:
+            self._row_height_dict = {}
+            with self._workbook._zip.open(self._sheet_path) as f:
+                for row_element in _iter_elements(f, _MAIN_NS + 'row'):
+                    if row_element.get('ht') is not None:
+                        self._row_height_dict[int(row_element.get('r'))] = \
+                            float(row_element.get('ht'))
+        return _StreamingDimension(RowHeight = self._row_height_dict.get(int(row)))
+
+    def _read_region(self, first_cell_loc: Tuple[int], last_cell_loc: Tuple[int],
+                     formula: bool = False) -> Dict[Tuple[int, int], object]:
+        """概要
+        シートのXMLを逐次的に読み込み、指定した範囲に含まれるセルの値のみを辞書型に格納して返す。
+        範囲より下の行に到達した時点で読み込みを終了する。
+
+        Parameters
+        ----------
+        first_cell_loc, last_cell_loc: Tuple[int]
+            読み込む範囲の左上、右下のセルの（列番号、行番号）を格納するtuple型。
+
+        formula: bool
+            Trueの場合は数式を、Falseの場合は値を読み込む。
+
+        Returns
+        ----------
+        d: Dict[Tuple[int, int], object]
+            （列番号、行番号）をkeyに、セルの値または数式をvalueに持つ辞書型。
+        """
+        (c1, r1), (c2, r2) = first_cell_loc, last_cell_loc
+        d = {}
+        shared_string_index_dict = {}
+        shared_formula_dict = {}
+        with self._workbook._zip.open(self._sheet_path) as f:
+            for row_element in _iter_elements(f, _MAIN_NS + 'row'):
+                row_num = int(row_element.get('r'))
+                if row_num > r2:
+                    break
+                for c in row_element.iter(_MAIN_NS + 'c'):
+                    f_element = c.find(_MAIN_NS + 'f')
+                    # 共有数式は範囲外のセルに定義されていることがあるため、常に記録する
+                    if formula and f_element is not None and f_element.get('t') == 'shared' \
+                        and f_element.text:
+                        shared_formula_dict[f_element.get('si')] = (f_element.text, c.get('r'))
+                    if row_num < r1:
+                        continue
+                    col_num = utils.from_cell_address_to_column_row_int(c.get('r'))[0]
+                    if col_num < c1 or col_num > c2:
+                        continue
+                    if formula and f_element is not None:
+                        d[(col_num, row_num)] = self._formula(f_element, c.get('r'),
+                                                              shared_formula_dict)
+                        continue
+                    value = self._value(c)
+                    if c.get('t') == 's' and value is not None:
+                        shared_string_index_dict[(col_num, row_num)] = value
+                        continue
+                    if formula:
+                        value = '' if value is None else str(value)
+                    d[(col_num, row_num)] = value
+        shared_strings = self._workbook._shared_strings(set(shared_string_index_dict.values()))
+        for loc, index in shared_string_index_dict.items():
+            d[loc] = shared_strings.get(index)
+        return d
+
+    def _value(self, c):
+        t = c.get('t', 'n')
+        if t == 'inlineStr':
+            is_element = c.find(_MAIN_NS + 'is')
+            return None if is_element is None else _text_from_si(is_element)
+        v = c.find(_MAIN_NS + 'v')
+        if v is None or v.text is None:
+            return None
+        if t == 's':
+            return int(v.text)
+        elif t == 'b':
+            return v.text == '1'
+        elif t in ('str', 'e'):
+            return v.text
+        value = float(v.text)
+        if value.is_integer() and 'E' not in v.text and '.' not in v.text:
+            value = int(v.text)
+        if c.get('s') is not None and self._workbook._is_date_style(int(c.get('s'))):
+            return from_excel(value)
+        return value
+
+    @staticmethod
+    def _formula(f_element, address: str, shared_formula_dict: Dict[str, Tuple[str, str]]) -> str:
+        if f_element.get('t') == 'shared' and not f_element.text:
+            master_formula, master_address = shared_formula_dict[f_element.get('si')]
+            return Translator('=' + master_formula, origin=master_address)\
+                .translate_formula(address)
+        return '=' + (f_element.text or '')
+
+class _StreamingDimension:
+    """概要
+    Worksheet.Columns(...), Worksheet.Rows(...)の代わりに使用する、読み取り専用の列または行。
+    """
+    def __init__(self, ColumnWidth: Optional[float] = None, RowHeight: Optional[float] = None):
+        self.ColumnWidth = ColumnWidth
+        self.RowHeight = RowHeight
+
+class _StreamingRange:
+    """概要
+    Excel.Rangeの代わりに使用する、読み取り専用のセル範囲。
+    """
+    def __init__(self, worksheet: StreamingWorksheet, address: str):
+        self._worksheet = worksheet
+        self._first_cell_loc, self._last_cell_loc = \
+            utils.from_range_address_to_column_row_int(address)
+
+    @property
+    def Address(self) -> str:
+        (c1, r1), (c2, r2) = self._first_cell_loc, self._last_cell_loc
+        first_cell = '${}${}'.format(utils.toAlpha3(c1), r1)
+        if (c1, r1) == (c2, r2):
+            return first_cell
+        return '{}:${}${}'.format(first_cell, utils.toAlpha3(c2), r2)
+
+    def _read(self, formula: bool):
+        # COMと同様に、1つのセルの場合は値を、複数のセルの場合はtupleのtupleを返す
+        (c1, r1), (c2, r2) = self._first_cell_loc, self._last_cell_loc
+        d = self._worksheet._read_region(self._first_cell_loc, self._last_cell_loc, formula)
+        default = '' if formula else None
+        if (c1, r1) == (c2, r2):
+            return d.get((c1, r1), default)
+        return tuple(tuple(d.get((c, r), default) for c in range(c1, c2 + 1))
+                     for r in range(r1, r2 + 1))
+
+    @property
+    def Value(self):
+        return self._read(formula=False)
+
+    # COMのプロパティ名は大文字・小文字を区別しないため、小文字でも参照できるようにする
+    value = Value
+
+    @property
+    def Formula(self):
+        return self._read(formula=True)
@@ -0,0 +1,159 @@
+"""
+ワークシートの使用範囲の値（必要に応じて数式）を一度に読み込んで保持し、
+読み込んだ値に対してワークシートと同じ操作（UsedRange.Address, Range(...).Value, Formula）を
+行えるようにするための、値のみを持つワークシートを定義する。
+読み込んだ後はエクセルを操作せずに差分を確認でき、別のプロセスに渡すこともできる。
+"""
+from typing import Optional
+import numpy as np
+import address_codec
+
+class SheetValues:
+    """概要
+    ワークシートの範囲（デフォルトは使用範囲）の値と数式を格納する。範囲の外側のセルは空白として扱う。
+
+    Parameters
+    ----------
+    used_address: str
+        ワークシートのUsedRange.Addressを示すstr型。
+
+    value: Optional[np.ndarray]
+        範囲の値を格納した2次元のnp.ndarray型（dtype=object）。
+        Noneの場合は値を参照できない。
+
+    formula: Optional[np.ndarray]
+        範囲の数式を格納した2次元のnp.ndarray型（dtype=object）。
+        Noneの場合は数式を参照できない。デフォルトはNone。
+
+    value_address: str
+        value、formulaに格納した範囲を示すstr型。''の場合はused_addressとする。デフォルトは''。
+    """
+    def __init__(self, used_address: str, value: Optional[np.ndarray], formula: Optional[np.ndarray] = None,
+                 value_address: str = ''):
+        self.used_address = used_address
+        self.value_address = value_address if value_address != '' else used_address
+        (self.first_col, self.first_row), _ = address_codec.parse_range(self.value_address)
+        self.value = value
+        self.formula = formula
+
+    @property
+    def UsedRange(self) -> '_ValuesRange':
+        return _ValuesRange(self, self.used_address)
+
+    def Range(self, address: str) -> '_ValuesRange':
+        return _ValuesRange(self, address)
+
+    def _read(self, array: np.ndarray, address: str, empty_value):
+        """概要
+        範囲の値を、COMと同様に1つのセルの場合は値を、複数のセルの場合はtupleのtupleにして返す。
+
+        Parameters
+        ----------
+        array: np.ndarray
+            値または数式を格納した2次元のnp.ndarray型。
+
+        address: str
+            読み込む範囲を示すstr型。カンマで区切られている場合は先頭の範囲のみを対象とする。
+
+        empty_value
+            格納した範囲の外側のセルの値。
+
+        Returns
+        ----------
+        value
+            セルの値、またはtupleのtuple。
+        """
+        (c1, r1), (c2, r2) = address_codec.parse_range(address.split(',')[0])
+        # 格納した範囲の左上のセルを起点とする位置に変換
+        i1, j1 = r1 - self.first_row, c1 - self.first_col
+        i2, j2 = r2 - self.first_row + 1, c2 - self.first_col + 1
+        if 0 <= i1 and 0 <= j1 and i2 <= array.shape[0] and j2 <= array.shape[1]:
+            block = array[i1:i2, j1:j2]
+        else:
+            # 格納した範囲の外側を含む場合は、空白で埋めたうえで重なる部分を写す
+            block = np.full((r2 - r1 + 1, c2 - c1 + 1), empty_value, dtype=object)
+            oi1, oj1 = max(i1, 0), max(j1, 0)
+            oi2, oj2 = min(i2, array.shape[0]), min(j2, array.shape[1])
+            if oi1 < oi2 and oj1 < oj2:
+                block[oi1 - i1:oi2 - i1, oj1 - j1:oj2 - j1] = array[oi1:oi2, oj1:oj2]
+        if block.shape == (1, 1):
+            return block[0, 0]
+        return tuple(map(tuple, block.tolist()))
+
+class _ValuesRange:
+    """概要
+    SheetValuesのRange、UsedRangeが返すセル範囲。値の参照のみを行える。
+    """
+    def __init__(self, sheet_values: SheetValues, address: str):
+        self._sheet_values = sheet_values
+        self.Address = address
+
+    @property
+    def Value(self):
+        if self._sheet_values.value is None:
+            raise ValueError('値を読み込まずに作成したため、値を参照できません。')
+        return self._sheet_values._read(self._sheet_values.value, self.Address, None)
+
+    # COMのプロパティ名は大文字・小文字を区別しないため、小文字でも参照できるようにする
+    value = Value
+
+    @property
+    def Formula(self):
+        if self._sheet_values.formula is None:
+            raise ValueError('数式を読み込まずに作成したため、数式を参照できません。')
+        return self._sheet_values._read(self._sheet_values.formula, self.Address, '')
+
+def _to_2d_array(value) -> np.ndarray:
+    """概要
+    Range(...).Valueの返り値を2次元のnp.ndarray型に変換する。
+
+    Parameters
+    ----------
+    value
+        セルの値、またはtupleのtuple。
+
+    Returns
+    ----------
+    array: np.ndarray
+        2次元のnp.ndarray型（dtype=object）。
+    """
+    if not isinstance(value, tuple):
+        array = np.empty((1, 1), dtype=object)
+        array[0, 0] = value
+        return array
+    array = np.empty((len(value), len(value[0]) if len(value) > 0 else 0), dtype=object)
+    for i, row in enumerate(value):
+        array[i, :] = row
+    return array
+
+def read_sheet_values(ws, with_formula: bool = False, read_address: str = '',
+                      with_value: bool = True) -> SheetValues:
+    """概要
+    ワークシートの範囲の値（および数式）を一度に読み込み、SheetValuesにして返す。
+
+    Parameters
+    ----------
+    ws
+        読み込むワークシート。
+
+    with_formula: bool
+        数式も読み込むか否かを示すbool型。デフォルトはFalse。
+
+    read_address: str
+        読み込む範囲を示すstr型。''の場合は使用範囲全体を読み込む。
+        範囲の外側のセルを参照しない場合に、読み込む量を減らすために指定する。デフォルトは''。
+
+    with_value: bool
+        値を読み込むか否かを示すbool型。数式のみを参照する場合はFalseとする。デフォルトはTrue。
+
+    Returns
+    ----------
+    sheet_values: SheetValues
+        読み込んだ値を格納したSheetValues。
+    """
+    used_range = ws.UsedRange
+    used_address = used_range.Address
+    read_range = used_range if read_address == '' else ws.Range(read_address)
+    value = _to_2d_array(read_range.Value) if with_value else None
+    formula = _to_2d_array(read_range.Formula) if with_formula else None
+    return SheetValues(used_address, value, formula, read_address)
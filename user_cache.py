@@ -0,0 +1,60 @@
+"""
+保存した確認の結果、処理計画などのキャッシュを格納する、利用者ごとのフォルダと、
+保存済みのキャッシュが有効か否かを判定するためのモジュールの版を定義する。
+キャッシュはこのフォルダ（ソースコードのフォルダ）ではなく、WindowsではLOCALAPPDATA、
+それ以外ではXDG_CACHE_HOME（未設定の場合は~/.cache）の下に保存する。
+"""
+import glob
+import hashlib
+import os
+
+# 利用者ごとのキャッシュのフォルダの下に作成するフォルダ名
+_APP_DIR_NAME = 'fcs_keikaku'
+# 内容が変更された場合に、保存済みのキャッシュを無効にするモジュール（このフォルダのすべてのモジュール）
+_VERSION_MODULE_PATTERN = '*.py'
+
+_code_version = None
+
+def user_cache_dir(name: str = '') -> str:
+    """概要
+    利用者ごとのキャッシュのフォルダのパスを返す。フォルダは作成しない。
+
+    Parameters
+    ----------
+    name: str
+        キャッシュの種類ごとのフォルダ名またはファイル名。''の場合はこのパッケージのフォルダを返す。
+        デフォルトは''。
+
+    Returns
+    ----------
+    path: str
+        フォルダまたはファイルのパスを示すstr型。
+    """
+    if os.name == 'nt':
+        base_dir = os.environ.get('LOCALAPPDATA') \
+            or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    app_dir = os.path.join(base_dir, _APP_DIR_NAME)
+    return app_dir if name == '' else os.path.join(app_dir, name)
+
+def code_version() -> str:
+    """概要
+    settings.pyを含むこのフォルダのすべてのモジュールのファイル名と内容から求めたハッシュ値を返す。
+    いずれかが変更、追加、削除された場合は異なる値となる。
+
+    Returns
+    ----------
+    version: str
+        ハッシュ値を示すstr型。
+    """
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha256()
+        module_dir = os.path.dirname(os.path.abspath(__file__))
+        for module_path in sorted(glob.glob(os.path.join(module_dir, _VERSION_MODULE_PATTERN))):
+            h.update(os.path.basename(module_path).encode('utf-8'))
+            with open(module_path, 'rb') as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
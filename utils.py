@@ -2,8 +2,10 @@
 win32comを用いたエクセル操作に用いる便利ツールを定義する。
 """
 
-from typing import List, Tuple
+from typing import List, Tuple, Union
 import warnings
+import address_codec
+import cell_ref
 
 ALPHABET = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 
             'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
@@ -12,6 +14,7 @@ def toAlpha3(num: int) -> str:
     """概要
     列番号をアルファベットの文字列に変換する。
     openpyxlのライブラリを使うのが一般的だが、そのためだけにimportするのが面倒なので自作。
+    A～XFD列の対応表を参照する（address_codec.column_letter）。
 
     Parameters
     ----------
@@ -23,14 +26,7 @@ def toAlpha3(num: int) -> str:
     Alpha: str
         変換された列名を表すstr型。
     """
-    h = int((num - 1 - 26) / (26 * 26))
-    i = int((num - 1 - (h * 26 * 26)) / 26)
-    j = num - (i * 26) - (h * 26 * 26)
-    Alpha = ''
-    for k in h, i, j:
-        if k != 0:
-            Alpha += chr(k + 64)
-    return Alpha
+    return address_codec.column_letter(num)
 
 def from_alpha_to_num(alpha: str) -> int:
     """概要
@@ -46,15 +42,7 @@ def from_alpha_to_num(alpha: str) -> int:
     num: int
         列番号を表すint型。
     """
-    n = 0
-    length = 0
-    for s in reversed(alpha):
-        if s in ALPHABET:
-            n += (ord(s) - 64) * (26 ** length)
-            length += 1
-        else:
-            raise ValueError('次の文字を列番号に変更できません。:{}'.format(alpha))
-    return n
+    return address_codec.column_num(alpha)
 
 def from_cell_address_to_column_row_letter(address: str) -> Tuple[str, str]:
     """概要
@@ -71,17 +59,7 @@ def from_cell_address_to_column_row_letter(address: str) -> Tuple[str, str]:
     t: tuple
         ({列名}, {行名})からなるtuple型。
     """
-    address = address.replace('$', '')
-    column_letter = ''
-    for s in address:
-        if s in ALPHABET:
-            column_letter += s
-    row_letter = address.replace(column_letter, '')
-    try:
-        int(row_letter)
-    except ValueError:
-        raise ValueError('次のアドレスが不適です。:{}'.format(address))
-    return (column_letter, row_letter)
+    return address_codec.parse_cell_letter(address)
 
 def from_cell_address_to_column_row_int(address: str) -> Tuple[int, int]:
     """概要
@@ -98,9 +76,7 @@ def from_cell_address_to_column_row_int(address: str) -> Tuple[int, int]:
     t: tuple
         ({列番号}, {行番号})からなるtuple型。
     """
-    address = address.replace('$', '')
-    address_tuple = from_cell_address_to_column_row_letter(address)
-    return (from_alpha_to_num(address_tuple[0]), int(address_tuple[1]))
+    return address_codec.parse_cell(address)
 
 def from_range_address_to_column_row_int(address: str) -> Tuple[Tuple[int]]:
     """概要
@@ -118,18 +94,7 @@ def from_range_address_to_column_row_int(address: str) -> Tuple[Tuple[int]]:
         (({左上のセルの列番号}, {左上のセルの行番号}), ({右下のセルの列番号}, {右下のセルの行番号}))
         からなるtuple型。
     """
-    address = address.replace('$', '')
-    if ':' in address:
-        address_list = address.split(':')
-        if len(address_list) != 2:
-            raise ValueError('次のセル範囲に:が2つ以上含まれます。{}'.format(address))
-        first_cell = address_list[0]
-        last_cell = address_list[1]
-    else:
-        first_cell = address
-        last_cell = address
-    return (from_cell_address_to_column_row_int(first_cell), 
-            from_cell_address_to_column_row_int(last_cell))
+    return address_codec.parse_range(address)
 
 def from_column_row_int_to_cell_address(col_num: int, row_num: int) -> str:
     """"概要
@@ -148,7 +113,7 @@ def from_column_row_int_to_cell_address(col_num: int, row_num: int) -> str:
     address: str
         セル番地を表すstr型。
     """
-    return toAlpha3(col_num) + str(row_num)
+    return address_codec.format_cell(col_num, row_num)
 
 def move_cell_address(address: str, right: int = 0, down: int = 0) -> str:
     address_tuple = from_cell_address_to_column_row_letter(address)
@@ -406,8 +371,59 @@ def from_range_address_list_to_range_address(range_address_list: List[str]) -> s
                 c_max = c_r_int[1][0] if c_max < c_r_int[1][0] else c_max
                 r_min = c_r_int[0][1] if r_min > c_r_int[0][1] else r_min
                 r_max = c_r_int[1][1] if r_max < c_r_int[1][1] else r_max
-        if c_min == r_min and c_max == r_max:
+        if c_min == c_max and r_min == r_max:
             return from_column_row_int_to_cell_address(c_min, r_min)
         else:
             return from_column_row_int_to_cell_address(c_min, r_min) + ':' \
-                + from_column_row_int_to_cell_address(c_max, r_max)
\ No newline at end of file
+                + from_column_row_int_to_cell_address(c_max, r_max)
+
+def from_address_list_to_rectangle_range_address_list(
+        address_list: List[Union[str, cell_ref.CellRef, cell_ref.RangeRef]]) -> List[str]:
+    """概要
+    セル番地またはセル範囲を表すstr型を格納したlist型を受け取り、含まれるセルを
+    長方形の範囲にまとめたうえで、範囲を表すstr型を格納したlist型を返す。
+    同じ列の範囲を持つ横方向の連続したセルを、縦方向に連続する行の間で結合する。
+
+    Parameters
+    ----------
+    address_list: List[Union[str, cell_ref.CellRef, cell_ref.RangeRef]]
+        セル番地またはセル範囲を表すstr型、CellRef、RangeRefを格納したlist型。
+
+    Returns
+    ----------
+    range_address_list: List[str]
+        address_listに含まれるすべてのセルを覆う長方形の範囲を表すstr型を格納したlist型。
+    """
+    return [range_ref.address for range_ref in cell_ref.merge_into_rectangles(address_list)]
+
+def join_range_address_list(range_address_list: List[str], max_length: int = 255) -> List[str]:
+    """概要
+    範囲を表すstr型をカンマ区切りで結合し、複数の範囲を表すstr型を格納したlist型を返す。
+    エクセルで指定できる範囲の文字数の上限を超えないように分割する。
+
+    Parameters
+    ----------
+    range_address_list: List[str]
+        範囲を表すstr型を格納したlist型。
+
+    max_length: int
+        結合した範囲を表すstr型の文字数の上限を示すint型。デフォルトは255。
+
+    Returns
+    ----------
+    joined_address_list: List[str]
+        カンマ区切りで結合した範囲を表すstr型を格納したlist型。
+    """
+    joined_address_list = []
+    joined_address = ''
+    for range_address in range_address_list:
+        if joined_address == '':
+            joined_address = range_address
+        elif len(joined_address) + 1 + len(range_address) <= max_length:
+            joined_address += ',' + range_address
+        else:
+            joined_address_list.append(joined_address)
+            joined_address = range_address
+    if joined_address != '':
+        joined_address_list.append(joined_address)
+    return joined_address_list
\ No newline at end of file
@@ -0,0 +1,485 @@
+"""
+エクセルの操作に使用するバックエンドを定義する。
+win32comのExcel.Applicationと同じ操作（UsedRange, Range(...).Value, Formula, Font.Color,
+GetCharacters等）をopenpyxlで再現し、Excelが起動できない環境でも処理を行えるようにする。
+"""
+import copy
+from typing import Dict, List, Optional, Tuple
+import openpyxl
+from openpyxl.cell.cell import MergedCell
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from openpyxl.styles.colors import Color as OpenpyxlColor
+import sheet_reader
+import utils
+
+ENGINE_COM = 'com'
+ENGINE_OPENPYXL = 'openpyxl'
+
+def dispatch(engine: str = ENGINE_COM, new_instance: bool = False):
+    """概要
+    エクセルを操作するアプリケーションを起動して返す。
+
+    Parameters
+    ----------
+    engine: str
+        使用するバックエンドを示すstr型。comが与えられればExcel.Applicationを、
+        openpyxlが与えられればOpenpyxlApplicationを返す。それ以外の値はValueErrorを返す。
+
+    new_instance: bool
+        comの場合に、起動済みのExcelを使用せずに新たなExcelを起動するか否かを示すbool型。
+        デフォルトはFalse。
+
+    Returns
+    ----------
+    app
+        Excel.ApplicationまたはOpenpyxlApplication。
+    """
+    if engine == ENGINE_COM:
+        import win32com.client
+        if new_instance:
+            return win32com.client.DispatchEx('Excel.Application')
+        return win32com.client.Dispatch('Excel.Application')
+    elif engine == ENGINE_OPENPYXL:
+        return OpenpyxlApplication()
+    else:
+        raise ValueError('engineにはcomまたはopenpyxlを指定してください。')
+
+def engine_of(app) -> str:
+    """概要
+    起動済みのアプリケーションが使用しているバックエンドを返す。
+
+    Parameters
+    ----------
+    app
+        Excel.ApplicationまたはOpenpyxlApplication。
+
+    Returns
+    ----------
+    engine: str
+        バックエンドを示すstr型（comまたはopenpyxl）。
+    """
+    if isinstance(app, OpenpyxlApplication):
+        return ENGINE_OPENPYXL
+    return ENGINE_COM
+
+def _from_bgr_to_argb(color: int) -> str:
+    """概要
+    Excel(COM)で使用されるBGR形式の色の値を、openpyxlで使用されるARGB形式の文字列に変換する。
+
+    Parameters
+    ----------
+    color: int
+        BGR形式の色の値を示すint型。
+
+    Returns
+    ----------
+    argb: str
+        ARGB形式の色を示すstr型。
+    """
+    r = color & 0xFF
+    g = (color >> 8) & 0xFF
+    b = (color >> 16) & 0xFF
+    return 'FF{:02X}{:02X}{:02X}'.format(r, g, b)
+
+def _from_argb_to_bgr(argb: str) -> int:
+    """概要
+    ARGB形式の色を示す文字列を、Excel(COM)で使用されるBGR形式の値に変換する。
+
+    Parameters
+    ----------
+    argb: str
+        ARGB形式の色を示すstr型。
+
+    Returns
+    ----------
+    color: int
+        BGR形式の色の値を示すint型。
+    """
+    rgb = int(argb[-6:], 16)
+    r = (rgb >> 16) & 0xFF
+    g = (rgb >> 8) & 0xFF
+    b = rgb & 0xFF
+    return r | (g << 8) | (b << 16)
+
+def _to_python_value(value):
+    """概要
+    書き込む値をopenpyxlに渡せる値に変換する。numpyのスカラーはPythonの値に変換し、
+    先頭に「'」が付いた文字列は文字列として書き込むために「'」を取り除く。
+
+    Parameters
+    ----------
+    value
+        書き込む値。
+
+    Returns
+    ----------
+    value
+        openpyxlに渡せる値。
+    """
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, str) and value.startswith("'"):
+        value = value[1:]
+    return value
+
+def _is_formula(value) -> bool:
+    """概要
+    openpyxlで読み込んだセルの値が数式であるか否かを返す。
+
+    Parameters
+    ----------
+    value
+        セルの値。
+
+    Returns
+    ----------
+    b: bool
+        値が数式であればTrue、そうでなければFalse。
+    """
+    if isinstance(value, str):
+        return value.startswith('=')
+    return hasattr(value, 'text') and hasattr(value, 'ref')
+
+class OpenpyxlApplication:
+    """概要
+    Excel.Applicationの代わりに使用するアプリケーション。
+    """
+    def __init__(self):
+        self.Visible = False
+        self.DisplayAlerts = True
+        self.Workbooks = OpenpyxlWorkbooks()
+
+    def Quit(self) -> None:
+        for wb in list(self.Workbooks._workbooks):
+            wb.Close()
+        return
+
+class OpenpyxlWorkbooks:
+    """概要
+    Excel.Application.Workbooksの代わりに使用するワークブックの集合。
+    """
+    def __init__(self):
+        self._workbooks: List[OpenpyxlWorkbook] = []
+
+    def Open(self, Filename: str, UpdateLinks: int = 0, ReadOnly: bool = False
+             ) -> 'OpenpyxlWorkbook':
+        # 引数の順序はCOMのWorkbooks.Openに合わせる
+        # 読み取り専用の場合は、シートのXMLを逐次的に読み込み、必要な範囲の値のみを取り出す
+        if ReadOnly:
+            wb = sheet_reader.StreamingWorkbook(Filename, close_callback=self._remove)
+        else:
+            wb = OpenpyxlWorkbook(self, Filename)
+        self._workbooks.append(wb)
+        return wb
+
+    def _remove(self, wb) -> None:
+        if wb in self._workbooks:
+            self._workbooks.remove(wb)
+        return
+
+    @property
+    def Count(self) -> int:
+        return len(self._workbooks)
+
+    def __call__(self, index: int) -> 'OpenpyxlWorkbook':
+        # COMに合わせて1始まりのindexで指定する
+        return self._workbooks[index - 1]
+
+class OpenpyxlWorkbook:
+    """概要
+    Excel.Workbookの代わりに使用するワークブック。
+    数式を保持したワークブックに対して読み書きを行い、数式の計算結果は
+    data_only=Trueで読み込んだワークブックから取得する。
+    """
+    def __init__(self, workbooks: OpenpyxlWorkbooks, file_path: str):
+        self._workbooks = workbooks
+        self.FullName = file_path
+        self._wb = openpyxl.load_workbook(file_path, rich_text=True)
+        self._value_wb = None
+        self._sheets: Dict[str, OpenpyxlWorksheet] = {}
+
+    def Sheets(self, sheet_name: str) -> 'OpenpyxlWorksheet':
+        if sheet_name not in self._sheets:
+            self._sheets[sheet_name] = OpenpyxlWorksheet(self, self._wb[sheet_name])
+        return self._sheets[sheet_name]
+
+    def _value_ws(self, sheet_name: str):
+        # 数式の計算結果が必要になった時点で読み込む
+        if self._value_wb is None:
+            self._value_wb = openpyxl.load_workbook(self.FullName, data_only=True)
+        return self._value_wb[sheet_name]
+
+    def Save(self) -> None:
+        self.SaveAs(self.FullName)
+        return
+
+    def SaveAs(self, file_path: str) -> None:
+        self._wb.save(file_path)
+        return
+
+    def Close(self, SaveChanges: bool = False) -> None:
+        if SaveChanges:
+            self.Save()
+        self._workbooks._remove(self)
+        self._wb = None
+        self._value_wb = None
+        self._sheets = {}
+        return
+
+class OpenpyxlWorksheet:
+    """概要
+    Excel.Worksheetの代わりに使用するワークシート。
+    """
+    def __init__(self, workbook: OpenpyxlWorkbook, ws):
+        self._workbook = workbook
+        self._ws = ws
+        self.Name = ws.title
+
+    @property
+    def UsedRange(self) -> 'OpenpyxlRange':
+        ws = self._ws
+        if len(ws._cells) == 0:
+            return OpenpyxlRange(self, 'A1')
+        return OpenpyxlRange(self, '{}:{}'.format(
+            utils.from_column_row_int_to_cell_address(ws.min_column, ws.min_row),
+            utils.from_column_row_int_to_cell_address(ws.max_column, ws.max_row)))
+
+    def Range(self, address: str) -> 'OpenpyxlRange':
+        return OpenpyxlRange(self, address)
+
+    def Columns(self, col: str) -> '_ColumnDimension':
+        return _ColumnDimension(self._ws, col)
+
+    def Rows(self, row: str) -> '_RowDimension':
+        return _RowDimension(self._ws, int(row))
+
+    def _cell_value(self, col_num: int, row_num: int):
+        # 存在しないセルを生成しないように、_cellsから直接参照する
+        cell = self._ws._cells.get((row_num, col_num))
+        if cell is None:
+            return None
+        value = cell.value
+        if _is_formula(value):
+            return self._workbook._value_ws(self.Name).cell(row_num, col_num).value
+        if isinstance(value, CellRichText):
+            return str(value)
+        return value
+
+    def _cell_formula(self, col_num: int, row_num: int) -> str:
+        cell = self._ws._cells.get((row_num, col_num))
+        if cell is None or cell.value is None:
+            return ''
+        value = cell.value
+        if hasattr(value, 'text') and hasattr(value, 'ref'):
+            return value.text
+        return str(value)
+
+class _ColumnDimension:
+    """概要
+    Worksheet.Columns(...)の代わりに使用する列。
+    """
+    def __init__(self, ws, col: str):
+        self._dimension = ws.column_dimensions[col]
+
+    @property
+    def ColumnWidth(self) -> float:
+        return self._dimension.width
+
+    @ColumnWidth.setter
+    def ColumnWidth(self, width: float) -> None:
+        self._dimension.width = width
+
+class _RowDimension:
+    """概要
+    Worksheet.Rows(...)の代わりに使用する行。
+    """
+    def __init__(self, ws, row: int):
+        self._dimension = ws.row_dimensions[row]
+
+    @property
+    def RowHeight(self) -> float:
+        return self._dimension.height
+
+    @RowHeight.setter
+    def RowHeight(self, height: float) -> None:
+        self._dimension.height = height
+
+class OpenpyxlRange:
+    """概要
+    Excel.Rangeの代わりに使用するセル範囲。
+    「A1:B2,C3」のようにカンマで区切られた複数の範囲を指定できる。
+    Value, Formulaは、COMと同様に先頭の範囲のみを対象とする。
+    """
+    def __init__(self, worksheet: OpenpyxlWorksheet, address: str):
+        self._worksheet = worksheet
+        self._areas: List[Tuple[Tuple[int]]] = [
+            utils.from_range_address_to_column_row_int(area) for area in address.split(',')]
+
+    @property
+    def Address(self) -> str:
+        area_address_list = []
+        for (c1, r1), (c2, r2) in self._areas:
+            first_cell = '${}${}'.format(utils.toAlpha3(c1), r1)
+            if (c1, r1) == (c2, r2):
+                area_address_list.append(first_cell)
+            else:
+                area_address_list.append('{}:${}${}'.format(first_cell, utils.toAlpha3(c2), r2))
+        return ','.join(area_address_list)
+
+    def _read(self, read_cell) -> object:
+        # COMと同様に、1つのセルの場合は値を、複数のセルの場合はtupleのtupleを返す
+        (c1, r1), (c2, r2) = self._areas[0]
+        if (c1, r1) == (c2, r2):
+            return read_cell(c1, r1)
+        return tuple(tuple(read_cell(c, r) for c in range(c1, c2 + 1))
+                     for r in range(r1, r2 + 1))
+
+    @property
+    def Value(self):
+        return self._read(self._worksheet._cell_value)
+
+    @Value.setter
+    def Value(self, value) -> None:
+        (c1, r1), (c2, r2) = self._areas[0]
+        ws = self._worksheet._ws
+        is_array = hasattr(value, '__len__') and not isinstance(value, (str, bytes))
+        for i, r in enumerate(range(r1, r2 + 1)):
+            for j, c in enumerate(range(c1, c2 + 1)):
+                cell_value = value[i][j] if is_array else value
+                cell = ws.cell(r, c)
+                if isinstance(cell, MergedCell):
+                    continue
+                # 先頭に「'」が付いた文字列は、COMと同様に文字列として書き込む
+                if isinstance(cell_value, str) and cell_value.startswith("'"):
+                    cell.quotePrefix = True
+                cell.value = _to_python_value(cell_value)
+        return
+
+    # COMのプロパティ名は大文字・小文字を区別しないため、小文字でも参照できるようにする
+    value = Value
+
+    @property
+    def Formula(self):
+        return self._read(self._worksheet._cell_formula)
+
+    @property
+    def Font(self) -> '_RangeFont':
+        return _RangeFont(self)
+
+    def GetCharacters(self, Start: int, Length: int) -> '_Characters':
+        (c1, r1), _ = self._areas[0]
+        return _Characters(self._worksheet._ws.cell(r1, c1), Start, Length)
+
+    def _cells(self):
+        ws = self._worksheet._ws
+        for (c1, r1), (c2, r2) in self._areas:
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    yield ws.cell(r, c)
+
+class _RangeFont:
+    """概要
+    Range.Fontの代わりに使用するフォント。
+    """
+    def __init__(self, range_: OpenpyxlRange):
+        self._range = range_
+
+    @property
+    def Color(self) -> Optional[int]:
+        for cell in self._range._cells():
+            color = cell.font.color
+            if color is None or color.type != 'rgb':
+                return None
+            return _from_argb_to_bgr(color.rgb)
+        return None
+
+    @Color.setter
+    def Color(self, color: int) -> None:
+        argb = _from_bgr_to_argb(color)
+        for cell in self._range._cells():
+            font = copy.copy(cell.font)
+            font.color = OpenpyxlColor(rgb=argb)
+            cell.font = font
+        return
+
+class _Characters:
+    """概要
+    Range.GetCharacters(...)の代わりに使用する、セル内の文字列の一部分。
+    """
+    def __init__(self, cell, start: int, length: int):
+        self._cell = cell
+        self._start = start
+        self._length = length
+        self.Font = _CharactersFont(self)
+
+    def _set_color(self, color: int) -> None:
+        cell = self._cell
+        if isinstance(cell.value, CellRichText):
+            blocks = list(cell.value)
+        elif isinstance(cell.value, str) and not _is_formula(cell.value):
+            blocks = [cell.value]
+        else:
+            # 文字列以外のセルは部分的に書式を変更できない
+            return
+        # 1文字ごとのフォントに展開し、指定した範囲のフォントの色を変更した上で再度まとめる
+        char_list = []
+        for block in blocks:
+            if isinstance(block, TextBlock):
+                char_list += [(s, block.font) for s in block.text]
+            else:
+                char_list += [(s, None) for s in block]
+        argb = _from_bgr_to_argb(color)
+        colored_font_dict = {}
+        for i in range(self._start - 1, min(self._start - 1 + self._length, len(char_list))):
+            s, font = char_list[i]
+            if id(font) not in colored_font_dict:
+                colored_font = _inline_font(cell.font) if font is None else copy.copy(font)
+                colored_font.color = OpenpyxlColor(rgb=argb)
+                colored_font_dict[id(font)] = colored_font
+            char_list[i] = (s, colored_font_dict[id(font)])
+        rich_text = CellRichText()
+        text = ''
+        current_font = None
+        for s, font in char_list + [(None, object())]:
+            if font is not current_font and text != '':
+                rich_text.append(text if current_font is None else TextBlock(current_font, text))
+                text = ''
+            current_font = font
+            text += s or ''
+        cell.value = rich_text
+        return
+
+class _CharactersFont:
+    """概要
+    Characters.Fontの代わりに使用するフォント。
+    """
+    def __init__(self, characters: _Characters):
+        self._characters = characters
+
+    @property
+    def Color(self) -> None:
+        return None
+
+    @Color.setter
+    def Color(self, color: int) -> None:
+        self._characters._set_color(color)
+
+def _inline_font(font) -> InlineFont:
+    """概要
+    セルのフォントから、文字列の一部分に適用するフォントを作成する。
+
+    Parameters
+    ----------
+    font
+        セルのフォント。
+
+    Returns
+    ----------
+    inline_font: InlineFont
+        セルのフォントと同じ書式を持つInlineFont型。
+    """
+    return InlineFont(rFont=font.name, charset=font.charset, family=font.family, b=font.b,
+                      i=font.i, strike=font.strike, outline=font.outline, shadow=font.shadow,
+                      condense=font.condense, extend=font.extend, sz=font.sz, u=font.u,
+                      vertAlign=font.vertAlign, scheme=font.scheme)